@@ -0,0 +1,102 @@
+"""
+Console throughput: how many lines per second a server can print while the
+GUI stays responsive, delivering each line on its own vs. batched by
+ServerProcess (one block per flush).
+
+A 10 ms probe timer measures event loop lag, i.e. how late a click or
+keypress would be handled. A rate counts as sustained when p99 lag stays
+under 50 ms.
+
+    python benchmarks/bench_log_delivery.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer, QEventLoop
+from gui.console import ConsoleTab
+from core.server_process import ServerProcess
+
+RATES = (1000, 5000, 20000, 50000, 100000)
+DURATION = 2.0
+TICK_MS = 10
+LAG_LIMIT = 0.050
+
+LINE = "[12:34:56] [Server thread/INFO]: Preparing spawn area: {}% ({} chunks, Overworld)"
+
+
+def run(app, rate, batched):
+    console = ConsoleTab()
+    console.resize(1000, 700)
+    console.show()
+    server = ServerProcess(tempfile.mkdtemp())
+
+    if batched:
+        server.log_output.connect(console.append_log)
+        deliver = server.log
+    else:
+        # Every line goes to the widget the moment it is read
+        def deliver(line):
+            server.log_history.append(line)
+            console.append_log(line)
+
+    produced = 0
+    lags = []
+    last_probe = [time.perf_counter()]
+    start = time.perf_counter()
+
+    def produce():
+        nonlocal produced
+        # Catch up to where the rate says we should be, like a pipe that kept
+        # filling, but at most 100 ms worth per read so a stalled run still ends
+        due = min(int((time.perf_counter() - start) * rate), produced + rate // 10)
+        for i in range(produced, due):
+            deliver(LINE.format(i % 100, i))
+        produced = max(produced, due)
+
+    def probe():
+        now = time.perf_counter()
+        lags.append(max(0.0, now - last_probe[0] - TICK_MS / 1000))
+        last_probe[0] = now
+
+    producer = QTimer(); producer.timeout.connect(produce); producer.start(TICK_MS)
+    prober = QTimer(); prober.timeout.connect(probe); prober.start(TICK_MS)
+
+    loop = QEventLoop()
+    QTimer.singleShot(int(DURATION * 1000), loop.quit)
+    loop.exec()
+    producer.stop(); prober.stop()
+    server.flush_log()
+    elapsed = time.perf_counter() - start
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    console.close()
+    console.deleteLater()
+    server.deleteLater()
+    app.processEvents()
+    return produced / elapsed, p99, lags[-1] if lags else 0.0
+
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    for batched in (False, True):
+        label = "batched" if batched else "per line"
+        best = 0
+        for rate in RATES:
+            achieved, p99, worst = run(app, rate, batched)
+            ok = p99 < LAG_LIMIT
+            if ok:
+                best = max(best, achieved)
+            print(f"{label:9} target {rate:7}/s  achieved {achieved:9.0f}/s  "
+                  f"lag p99 {p99 * 1000:7.1f} ms  max {worst * 1000:7.1f} ms  {'ok' if ok else 'LAGGING'}")
+        print(f"{label:9} sustained without input lag: {best:,.0f} lines/s\n")
+
+
+if __name__ == "__main__":
+    main()
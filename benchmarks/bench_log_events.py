@@ -0,0 +1,84 @@
+"""
+Log event parsing throughput: lines per second through LogEventParser on a
+realistic mix (chat, logins, plugin startup, warnings, stack traces), with
+one subscriber on every event. The parser has to keep up with 50k lines/s.
+
+    python benchmarks/bench_log_events.py [--lines 500000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_events import LogEventParser
+
+TARGET = 50000
+
+
+def make_lines(n):
+    random.seed(3)
+    names = [f"Player{i}" for i in range(300)]
+    lines = [
+        "[12:00:00] [ServerMain/INFO]: Environment: Environment[sessionHost=https://sessionserver.mojang.com]",
+        "[12:00:01] [Server thread/INFO]: Starting minecraft server version 1.20.4",
+        "[12:00:01] [Server thread/INFO]: [LuckPerms] Loading LuckPerms v5.4.102",
+        "[12:00:02] [Server thread/INFO]: [LuckPerms] Loading configuration...",
+        "[12:00:02] [Server thread/INFO]: [WorldEdit] Loading WorldEdit v7.2.15",
+        "[12:00:02] [Server thread/INFO]: [Essentials] Loading server plugin Essentials v2.20.1",
+        '[12:00:03] [Server thread/INFO]: Preparing level "world"',
+        "[12:00:04] [Worker-Main-1/INFO]: Preparing spawn area: 42%",
+        "[12:00:05] [Server thread/INFO]: Time elapsed: 3456 ms",
+        '[12:00:05] [Server thread/INFO]: Done (5.123s)! For help, type "help"',
+    ]
+    while len(lines) < n:
+        hh = f"{len(lines) // 3600 % 24:02d}:{len(lines) // 60 % 60:02d}:{len(lines) % 60:02d}"
+        r = random.random()
+        if r < 0.45:
+            lines.append(f"[{hh}] [Async Chat Thread - #0/INFO]: <{random.choice(names)}> hello there {random.randint(0, 999)}")
+        elif r < 0.6:
+            lines.append(f"[{hh}] [User Authenticator #1/INFO]: UUID of player {random.choice(names)} is {random.getrandbits(128):032x}")
+        elif r < 0.7:
+            lines.append(f"[{hh}] [Server thread/INFO]: {random.choice(names)} {random.choice(['joined', 'left'])} the game")
+        elif r < 0.95:
+            lines.append(f"[{hh}] [Server thread/WARN]: Mob {random.randint(0, 99999)} moved wrongly!")
+        elif r < 0.98:
+            lines.append(f"[{hh}] [Server thread/WARN]: Can't keep up! Is the server overloaded? Running "
+                         f"{random.randint(2000, 9000)}ms or {random.randint(40, 180)} ticks behind")
+        else:
+            lines.append(f"[{hh}] [Server thread/ERROR]: Encountered an unexpected exception")
+            lines.append("java.lang.NullPointerException: Cannot invoke \"Object.hashCode()\" because \"key\" is null")
+            lines.extend(f"\tat net.minecraft.server.Level.tick(Level.java:{random.randint(1, 999)})" for _ in range(12))
+            lines.append("\t... 4 more")
+    return lines[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=500000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    events = LogEventParser()
+    counts = Counter()
+    events.subscribe(lambda event: counts.update((type(event).__name__,)))
+
+    ts = time.time()
+    start = time.perf_counter()
+    for line in lines:
+        events.feed(line, ts)
+    events.flush(ts)
+    elapsed = time.perf_counter() - start
+
+    rate = len(lines) / elapsed
+    print(f"{len(lines):,} lines in {elapsed:.2f} s: {rate:,.0f} lines/s "
+          f"({'ok' if rate >= TARGET else 'BELOW'} target {TARGET:,}/s), {elapsed / len(lines) * 1e6:.1f} us/line")
+    for name, count in counts.most_common():
+        print(f"  {name:16} {count:8,}")
+
+
+if __name__ == "__main__":
+    main()
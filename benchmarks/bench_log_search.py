@@ -0,0 +1,144 @@
+"""
+Console history search: time to the first hit and to the last one over a
+large spool, with the trigram filters vs. reading every block.
+
+Builds a spool of --mb megabytes of server-like output (chat, logins,
+warnings, a few rare lines to look for) in a temp folder, waits for the
+background compression, then runs each query cold (new LogSearch, filters
+loaded from disk) and warm.
+
+    python benchmarks/bench_log_search.py [--mb 1024]
+"""
+import argparse
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.log_spool import LogSpool
+from core.log_search import LogSearch
+
+QUERIES = [
+    ("Notch_42 joined the game", False),
+    (r"Can't keep up! .* Running [5-9]\d{3}ms", True),
+    ("lost connection: Timed out", False),
+    ("no such line anywhere", False),
+]
+
+
+def make_pool(n=50000):
+    random.seed(7)
+    names = [f"Player{i}" for i in range(500)]
+    words = "the a stone diamond creeper hello lol build farm nether portal base trade villager iron".split()
+    pool = []
+    for i in range(n):
+        hh = f"{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+        r = random.random()
+        if r < 0.5:
+            pool.append(f"[{hh}] [Server thread/INFO]: <{random.choice(names)}> " + " ".join(random.choice(words) for _ in range(6)))
+        elif r < 0.7:
+            pool.append(f"[{hh}] [User Authenticator #{random.randint(1, 9)}/INFO]: UUID of player {random.choice(names)} is "
+                        f"{random.getrandbits(128):032x}")
+        elif r < 0.85:
+            pool.append(f"[{hh}] [Server thread/INFO]: {random.choice(names)}[/10.0.{random.randint(0, 255)}.{random.randint(0, 255)}:"
+                        f"{random.randint(1000, 65000)}] logged in with entity id {i} at ({random.uniform(-1e4, 1e4):.2f}, 64.0, "
+                        f"{random.uniform(-1e4, 1e4):.2f})")
+        elif r < 0.999:
+            pool.append(f"[{hh}] [Server thread/WARN]: Mob {random.randint(0, 99999)} moved wrongly at {random.random():.6f}")
+        else:
+            pool.append(f"[{hh}] [Server thread/WARN]: Can't keep up! Is the server overloaded? Running "
+                        f"{random.randint(2000, 9000)}ms or {random.randint(40, 180)} ticks behind")
+    return pool
+
+
+def build(folder, mb):
+    pool = make_pool()
+    # Keep every segment, the default retention would drop most of a GB
+    spool = LogSpool(folder, keep_segments=mb // 8 + 2)
+    target = mb * 1024 * 1024
+    written, i = 0, 0
+    start = time.time() - 30 * 86400
+    rare = {int(target / 100 * k): line for k, line in enumerate([
+        "[12:00:00] [Server thread/INFO]: Notch_42 joined the game",
+        "[12:00:01] [Server thread/INFO]: Notch_42 lost connection: Timed out",
+    ] * 50)}
+    for offset in sorted(rare):
+        while written < offset:
+            line = pool[i % len(pool)]
+            spool.write(line, start + i * 0.01)
+            written += len(line) + 16
+            i += 1
+        spool.write(rare[offset], start + i * 0.01)
+        i += 1
+    while written < target:
+        line = pool[i % len(pool)]
+        spool.write(line, start + i * 0.01)
+        written += len(line) + 16
+        i += 1
+    spool.close()
+    while spool._compressing:
+        time.sleep(0.1)
+    return spool, i
+
+
+def timed_search(searcher, spool, query, regex):
+    start = time.perf_counter()
+    first = []
+    hits = searcher.search(spool, query, regex=regex,
+                           on_hits=lambda batch: first or first.append(time.perf_counter() - start))
+    return len(hits), (first[0] if first else None), time.perf_counter() - start
+
+
+def full_scan(spool, query, regex):
+    """Every line, no filters: what search costs without the index."""
+    matcher = re.compile(query if regex else re.escape(query), re.IGNORECASE)
+    start = time.perf_counter()
+    first, count = None, 0
+    for _, line in spool.read_range():
+        if matcher.search(line):
+            count += 1
+            first = first or time.perf_counter() - start
+    return count, first, time.perf_counter() - start
+
+
+def ms(value):
+    return "       -" if value is None else f"{value * 1000:8.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=int, default=256)
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    try:
+        t = time.perf_counter()
+        spool, lines = build(folder, args.mb)
+        on_disk = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder))
+        print(f"spool: {lines:,} lines, {args.mb} MB raw, {on_disk / 1e6:.0f} MB on disk, "
+              f"built in {time.perf_counter() - t:.0f} s\n")
+
+        print(f"{'query':52} {'hits':>5} {'first ms':>9} {'total ms':>9}")
+        cold = LogSearch()
+        warm = LogSearch()
+        for query, regex in QUERIES:
+            warm.search(spool, query, regex=regex)
+            for label, searcher in (("cold", cold), ("warm", warm)):
+                count, first, total = timed_search(searcher, spool, query, regex)
+                print(f"{label} {query[:47]:47} {count:5} {ms(first)}  {ms(total)}")
+            cold = LogSearch()
+
+        query, regex = QUERIES[0]
+        count, first, total = full_scan(spool, query, regex)
+        print(f"\nfull scan without filters: {query!r} {count} hits, first {ms(first).strip()} ms, total {ms(total).strip()} ms")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Metrics store: write rate, range query latency and size on disk. Fills a
+series with --days of 1 Hz samples (every write also updates the minute and
+hour rollups), then queries the last hour raw, the last week by minute and
+the whole span by hour. A week query has to come back in milliseconds.
+
+    python benchmarks/bench_metrics_store.py [--days 7]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics_store import MetricsStore, FILE_SIZE
+
+TARGET_MS = 50
+METRICS = ("cpu", "rss", "threads", "players", "startup")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        store = MetricsStore(root)
+        now = int(time.time())
+        span = args.days * 86400
+        start = time.perf_counter()
+        for ts in range(now - span, now):
+            store.record(1, "cpu", ts % 400 / 4, ts)
+        elapsed = time.perf_counter() - start
+        print(f"{span:,} samples in {elapsed:.2f} s: {span / elapsed:,.0f} samples/s")
+
+        store.close()
+        store = MetricsStore(root) # Cold: reopen and map the file again
+        for name, since, step in (("last hour, 1 s", 3600, 1), ("last week, 1 min", 7 * 86400, 60),
+                                  (f"all {args.days} days, 1 h", span, 3600)):
+            start = time.perf_counter()
+            points = store.query(1, "cpu", now - since, now, step)
+            ms = (time.perf_counter() - start) * 1000
+            print(f"  {name:18} {len(points):6,} points in {ms:6.2f} ms ({'ok' if ms < TARGET_MS else 'SLOW'})")
+
+        path = os.path.join(root, "1", "cpu.ts")
+        used = getattr(os.stat(path), "st_blocks", 0) * 512 or os.path.getsize(path)
+        print(f"Series file: {FILE_SIZE / 1024:.0f} KB ({used / 1024:.0f} KB allocated), "
+              f"{len(METRICS) * FILE_SIZE / 1024 / 1024:.1f} MB per server for {len(METRICS)} metrics, any number of years")
+        store.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
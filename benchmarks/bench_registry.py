@@ -0,0 +1,81 @@
+"""
+Compares the JSON and SQLite server registry backends.
+
+    python benchmarks/bench_registry.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import JsonBackend
+from core.sqlite_backend import SqliteBackend
+
+SIZES = (10, 1000, 10000)
+TYPES = ("Vanilla", "Paper", "Purpur", "Fabric", "Forge")
+VERSIONS = ("1.21.4", "1.21.1", "1.20.4", "1.20.1", "1.19.4")
+
+
+def make_record(i, root):
+    return {
+        "id": i + 1,
+        "name": f"Server {i}",
+        "path": os.path.join(root, f"server{i}"),
+        "jar_type": TYPES[i % len(TYPES)],
+        "version": VERSIONS[(i // len(TYPES)) % len(VERSIONS)],
+        "java_path": "java",
+        "ram_min": "2048M",
+        "ram_max": "4096M",
+        "created_at": 1700000000.0 + i,
+    }
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(name, open_backend, n):
+    root = tempfile.mkdtemp()
+    try:
+        backend = open_backend(root)
+        backend.load_if_changed()
+        records = [make_record(i, root) for i in range(n)]
+
+        def populate():
+            with backend.batch():
+                for r in records:
+                    backend.insert(r)
+            backend.flush()
+
+        results = {"populate": timed(populate)}
+        backend.close()
+
+        # Cold: fresh instance has to read everything from disk
+        backend = open_backend(root)
+        results["cold get"] = timed(lambda: (backend.load_if_changed(), backend.get(n // 2)))
+        results["warm get"] = timed(lambda: (backend.load_if_changed(), backend.get(n // 2)), 1000)
+        results["list all"] = timed(lambda: (backend.load_if_changed(), backend.all()), 20)
+        results["list by name"] = timed(lambda: backend.all(order_by="name"), 20)
+        results["Paper 1.20.4"] = timed(lambda: (backend.load_if_changed(), backend.find(jar_type="Paper", version="1.20.4")), 100)
+        results["update"] = timed(lambda: backend.update(1, {"ram_max": "8G"}), 50)
+        backend.close()
+
+        print(f"{name:7} n={n:<6} " + "  ".join(f"{k}: {v:8.3f}ms" for k, v in results.items()))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    for n in SIZES:
+        bench("json", lambda root: JsonBackend(os.path.join(root, "servers.json")), n)
+        bench("sqlite", lambda root: SqliteBackend(os.path.join(root, "servers.db")), n)
+
+
+if __name__ == "__main__":
+    main()
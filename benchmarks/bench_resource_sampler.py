@@ -0,0 +1,76 @@
+"""
+Resource sampler overhead: CPU time one sampling round takes with N
+watched processes (sleeping children standing in for server JVMs). At
+1 Hz that is the sampler's share of a core; 100 servers should cost well
+under 1%. Also shows what opening the /proc files on every round would
+cost instead of re-reading the open ones.
+
+    python benchmarks/bench_resource_sampler.py [--servers 100] [--rounds 200]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.resource_sampler import ResourceSampler
+
+TARGET = 1.0 # Percent of one core at 1 Hz
+
+
+def reopening_round(pids):
+    for pid in pids:
+        for name in ("stat", "status", "io"):
+            try:
+                with open(f"/proc/{pid}/{name}", "rb") as f:
+                    f.read()
+            except OSError:
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--servers", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    sampler = ResourceSampler()
+    if not sampler.available:
+        print("No /proc here, nothing to measure")
+        return
+
+    children = [subprocess.Popen(["sleep", "600"]) for _ in range(args.servers)]
+    try:
+        for i, child in enumerate(children):
+            sampler.watch(f"server-{i}", child.pid)
+        sampler.stop() # Rounds are driven below, not by the thread
+
+        sampler.sample_once()
+        start = time.thread_time()
+        for _ in range(args.rounds):
+            sampler.sample_once()
+        per_round = (time.thread_time() - start) / args.rounds
+
+        start = time.thread_time()
+        for _ in range(args.rounds):
+            reopening_round([child.pid for child in children])
+        per_reopen = (time.thread_time() - start) / args.rounds
+
+        share = per_round * 100 # CPU seconds per second at 1 Hz, as percent
+        print(f"{args.servers} processes: {per_round * 1000:.2f} ms CPU per round = {share:.2f}% of a core at 1 Hz "
+              f"({'ok' if share < TARGET else 'ABOVE'} target {TARGET}%), {per_round / args.servers * 1e6:.0f} us/process")
+        print(f"Opening the files every round instead: {per_reopen * 1000:.2f} ms per round")
+        sample = sampler.latest("server-0")
+        print(f"Sample: cpu {sample['cpu']:.1f}%, rss {sample['rss'] / 1024:.0f} KB, threads {sample['threads']:.0f}")
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+        for i in range(args.servers):
+            sampler.unwatch(f"server-{i}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Single-stream vs segmented downloads against a local HTTP server that
+throttles every connection, the way a busy mirror does.
+
+    python benchmarks/bench_segmented_download.py
+"""
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.downloader import Downloader
+from core.meta_cache import MetadataCache
+
+SIZE = 24 * 1024 * 1024
+PER_CONNECTION = 4 * 1024 * 1024 # bytes/second
+PAYLOAD = os.urandom(SIZE)
+SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _range(self):
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if not m:
+            return 0, SIZE - 1, False
+        end = int(m.group(2)) if m.group(2) else SIZE - 1
+        return int(m.group(1)), min(end, SIZE - 1), True
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(SIZE))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+    def do_GET(self):
+        start, end, partial = self._range()
+        self.send_response(206 if partial else 200)
+        if partial:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{SIZE}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        tick = 0.05
+        step = int(PER_CONNECTION * tick)
+        pos = start
+        try:
+            while pos <= end:
+                began = time.perf_counter()
+                self.wfile.write(PAYLOAD[pos:min(pos + step, end + 1)])
+                pos += step
+                time.sleep(max(0, tick - (time.perf_counter() - began)))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/modpack.zip"
+    tmp = tempfile.mkdtemp()
+
+    try:
+        baseline = None
+        for segments in (1, 2, 4, 8):
+            dl = Downloader(segments=segments, segment_threshold=0, pool_size=8, cache=MetadataCache(tmp))
+            rates = []
+            target = os.path.join(tmp, f"out-{segments}.bin")
+            start = time.perf_counter()
+            ok = dl.download_jar(url, target, lambda p, rate: rates.append(rate), hashes={"sha256": SHA256})
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"segments={segments}: {elapsed:6.2f}s  {SIZE / elapsed / 1e6:6.1f} MB/s  "
+                  f"speedup x{baseline / elapsed:4.1f}  verified={ok}  last reported {rates[-1] / 1e6 if rates else 0:.1f} MB/s")
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Create-wizard open latency: every loader's version list, cold and warm,
+fetched one by one vs prefetched concurrently. Upstream APIs are replaced by
+a local stand-in that adds a fixed delay per request, reached through the
+mirror settings.
+
+    python benchmarks/bench_wizard_open.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.downloader import Downloader, LOADERS, UPSTREAMS
+from core.meta_cache import MetadataCache
+
+LATENCY = 0.08
+VERSIONS = [f"1.{minor}.{patch}" for minor in range(16, 22) for patch in range(0, 5)]
+
+DOCS = {
+    "/mc/game/version_manifest.json": {"versions": [
+        {"id": v, "type": "release", "url": f"https://launchermeta.mojang.com/v1/packages/{v}.json"} for v in VERSIONS]},
+    "/v2/projects/paper": {"versions": VERSIONS},
+    "/v2/purpur": {"versions": VERSIONS},
+    "/v2/versions/game": [{"version": v, "stable": True} for v in VERSIONS],
+    "/net/minecraftforge/forge/promotions_slim.json": {"promos": {f"{v}-recommended": "1.0.0" for v in VERSIONS}},
+}
+for v in VERSIONS:
+    DOCS[f"/v1/packages/{v}.json"] = {"downloads": {"server": {"url": f"https://example.invalid/{v}.jar", "sha1": "0" * 40}}}
+
+hits = []
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        hits.append(self.path)
+        time.sleep(LATENCY)
+        doc = DOCS.get(urlsplit(self.path).path)
+        body = json.dumps(doc).encode() if doc is not None else b"{}"
+        self.send_response(200 if doc is not None else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_downloader(port, cache_dir):
+    # The stand-in serves every upstream's paths at its root
+    mirrors = {name: f"http://127.0.0.1:{port}" for name in UPSTREAMS}
+    return Downloader(cache=MetadataCache(cache_dir), mirrors=mirrors)
+
+
+def timed(label, fn):
+    hits.clear()
+    start = time.perf_counter()
+    fn()
+    print(f"{label:42} {(time.perf_counter() - start) * 1000:8.1f} ms  {len(hits):3} requests")
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    try:
+        for label, concurrent in (("sequential", False), ("prefetch", True)):
+            cache_dir = tempfile.mkdtemp()
+            dl = make_downloader(port, cache_dir)
+            open_wizard = dl.prefetch_versions if concurrent else (lambda: [dl.get_versions(l) for l in LOADERS])
+            timed(f"cold open, {label}", open_wizard)
+            timed(f"warm open, {label}", open_wizard)
+            # A restart: new process, metadata comes from the disk cache
+            dl = make_downloader(port, cache_dir)
+            open_wizard = dl.prefetch_versions if concurrent else (lambda: [dl.get_versions(l) for l in LOADERS])
+            timed(f"after restart, {label}", open_wizard)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+        # Ten pages resolving the same vanilla jar at once share one fetch
+        cache_dir = tempfile.mkdtemp()
+        dl = make_downloader(port, cache_dir)
+        with ThreadPoolExecutor(10) as pool:
+            timed("10 concurrent get_download_url (vanilla)",
+                  lambda: list(pool.map(lambda _: dl.get_download_url("vanilla", "1.20.4"), range(10))))
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
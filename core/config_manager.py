@@ -47,6 +47,75 @@ class ConfigManager:
         # Ensure directory exists
         os.makedirs(path, exist_ok=True)
 
+    def get_db_backend(self):
+        # "json" (servers.json, default) or "sqlite" (servers.db)
+        if "GENERAL" in self.config:
+            return self.config["GENERAL"].get("db_backend", "json").strip().lower()
+        return "json"
+
+    def get_console_options(self):
+        """
+        [CONSOLE] flush_ms: how often new server output is handed to the GUI.
+        max_lines_per_frame: lines shown per flush; a flood beyond that is
+        skipped in the view (it is still kept in the history).
+        spool_segment_mb / spool_keep_segments: size of each on-disk console
+        segment before it is rotated and compressed, and how many are kept.
+        """
+        section = self.config["CONSOLE"] if "CONSOLE" in self.config else {}
+        return {
+            "flush_ms": int(section.get("flush_ms", 50)),
+            "max_lines_per_frame": int(section.get("max_lines_per_frame", 1000)),
+            "spool_segment_mb": int(section.get("spool_segment_mb", 8)),
+            "spool_keep_segments": int(section.get("spool_keep_segments", 32)),
+        }
+
+    def get_shutdown_options(self):
+        """
+        [SHUTDOWN] save_timeout: seconds a server may go without any sign of
+        saving progress after "stop" before it is terminated (SIGTERM).
+        terminate_timeout: seconds after that before it is killed.
+        """
+        section = self.config["SHUTDOWN"] if "SHUTDOWN" in self.config else {}
+        return {
+            "save_timeout": float(section.get("save_timeout", 60)),
+            "terminate_timeout": float(section.get("terminate_timeout", 15)),
+        }
+
+    def get_mirrors(self):
+        """
+        {upstream: base URL} from [MIRRORS]. Upstreams are mojang, paper,
+        purpur, fabric and forge; "all = http://host:port" points every one of
+        them at a mirror server from this app (served as <base>/<upstream host>,
+        "{host}" in a base URL is replaced by that host).
+        """
+        if "MIRRORS" not in self.config:
+            return {}
+        section = self.config["MIRRORS"]
+        mirrors = {}
+        if section.get("all"):
+            for name in ("mojang", "paper", "purpur", "fabric", "forge"):
+                mirrors[name] = section["all"].rstrip("/") + "/{host}"
+        for name in ("mojang", "paper", "purpur", "fabric", "forge"):
+            if section.get(name):
+                mirrors[name] = section[name].rstrip("/")
+        return mirrors
+
+    def is_offline(self):
+        # Never contact upstream directly; only mirrors and cached metadata
+        return "MIRRORS" in self.config and self.config["MIRRORS"].getboolean("offline", False)
+
+    def get_mirror_serve_port(self):
+        # Port for this instance's own LAN mirror server, None when disabled
+        if "MIRRORS" in self.config and self.config["MIRRORS"].get("serve_port"):
+            return int(self.config["MIRRORS"]["serve_port"])
+        return None
+
+    def get_mirror_serve_host(self):
+        # Address the mirror server binds; only this machine unless set (0.0.0.0 for the LAN)
+        if "MIRRORS" in self.config and self.config["MIRRORS"].get("serve_host"):
+            return self.config["MIRRORS"]["serve_host"]
+        return "127.0.0.1"
+
     def get_db_path(self):
         # Deprecated but kept for compatibility logic if needed
         return None
@@ -1,89 +1,289 @@
-import json
+import atexit
 import os
 import time
+from contextlib import contextmanager
 from core.config_manager import config_manager
+from core.json_store import JsonStore
+from core.sqlite_backend import SORTABLE
+
+class JsonBackend:
+    """
+    Server registry backed by servers.json.
+    Servers are kept in a dict keyed by id plus secondary indexes, and only
+    reloaded when servers.json (or its journal) changes on disk.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.store = JsonStore(file_path)
+        self.lock = self.store.lock
+
+        self._cache = []
+        self._servers = {}
+        self._by_type = {}
+        self._by_version = {}
+        self._by_path = {}
+
+    def close(self):
+        self.store.flush()
+
+    def load_if_changed(self):
+        # Cheap when nothing changed: reads the sequence number and a stat().
+        if self.store.needs_reload():
+            with self.lock:
+                if self.store.needs_reload():
+                    self._rebuild(self.store.load())
+
+    def has_external_changes(self):
+        return self.store.needs_reload()
+
+    @contextmanager
+    def transaction(self):
+        """Holds the cross-process lock and makes sure we modify the latest data."""
+        with self.lock:
+            self.load_if_changed()
+            yield
+
+    def _rebuild(self, data):
+        self._cache = data
+        self._servers = {}
+        self._by_type = {}
+        self._by_version = {}
+        self._by_path = {}
+        for s in data:
+            self._index(s)
+
+    def _index(self, server):
+        self._servers[server['id']] = server
+        self._by_type.setdefault(self._type_key(server.get('jar_type')), {})[server['id']] = server
+        self._by_version.setdefault(server.get('version'), {})[server['id']] = server
+        self._by_path[self._path_key(server.get('path'))] = server
+
+    def _unindex(self, server):
+        self._servers.pop(server['id'], None)
+        self._by_type.get(self._type_key(server.get('jar_type')), {}).pop(server['id'], None)
+        self._by_version.get(server.get('version'), {}).pop(server['id'], None)
+        self._by_path.pop(self._path_key(server.get('path')), None)
+
+    @staticmethod
+    def _type_key(jar_type):
+        return (jar_type or "").lower()
+
+    @staticmethod
+    def _path_key(path):
+        if not path:
+            return None
+        return os.path.normcase(os.path.abspath(path))
+
+    # --- Reads ---
+
+    def all(self, order_by="id", descending=False):
+        if order_by == "id" and not descending:
+            return self._cache
+        return self._sorted(self._cache, order_by, descending)
+
+    def get(self, server_id):
+        return self._servers.get(server_id)
+
+    def find(self, jar_type=None, version=None, name=None, path=None, order_by="id", descending=False):
+        # Start from the narrowest index we have
+        if path is not None:
+            s = self._by_path.get(self._path_key(path))
+            candidates = [s] if s else []
+        elif jar_type is not None:
+            candidates = self._by_type.get(self._type_key(jar_type), {}).values()
+        elif version is not None:
+            candidates = self._by_version.get(version, {}).values()
+        else:
+            candidates = self._cache
+
+        result = [
+            s for s in candidates
+            if (jar_type is None or self._type_key(s.get('jar_type')) == self._type_key(jar_type))
+            and (version is None or s.get('version') == version)
+            and (name is None or s.get('name') == name)
+        ]
+        return self._sorted(result, order_by, descending)
+
+    @staticmethod
+    def _sorted(servers, order_by, descending):
+        # Same columns as the SQLite backend, so a bad key fails the same way on both
+        if order_by not in SORTABLE:
+            raise ValueError(f"Cannot sort servers by '{order_by}'")
+        return sorted(servers, key=lambda s: (s.get(order_by) is None, s.get(order_by)), reverse=descending)
+
+    def max_id(self):
+        return max(self._servers) if self._servers else None
+
+    # --- Writes ---
+
+    def insert(self, record):
+        with self.transaction():
+            self._cache.append(record)
+            self._index(record)
+            self.store.put(record)
+            self._schedule()
+
+    def update(self, server_id, fields):
+        with self.transaction():
+            s = self._servers.get(server_id)
+            if not s:
+                return None
+            self._unindex(s)
+            s.update(fields)
+            self._index(s)
+            self.store.put(s)
+            self._schedule()
+            return s
+
+    def delete(self, server_id):
+        with self.transaction():
+            s = self._servers.get(server_id)
+            if not s:
+                return
+            self._unindex(s)
+            self._cache = [x for x in self._cache if x['id'] != server_id]
+            self.store.delete(server_id)
+            self._schedule()
+
+    def _schedule(self):
+        self.store.schedule_snapshot(lambda: self._cache)
+
+    @contextmanager
+    def batch(self):
+        with self.transaction(), self.store.batch():
+            yield
+
+    def flush(self):
+        self.store.flush()
+
 
 class DatabaseManager:
     def __init__(self):
         self.servers_file = "servers.json"
-        self._cache = []
-        
+        self.sqlite_file = "servers.db"
+        self.backend = None
+        self._backend_key = None
+
+        # Pending debounced writes must reach disk before we exit
+        atexit.register(self.flush)
+
     def connect(self):
         """
-        Loads the servers from the JSON file.
+        Opens the configured backend ("json" or "sqlite" in config.ini) and
+        makes sure its view of the registry is current.
         """
         data_path = config_manager.get_data_path()
         if not data_path:
             raise Exception("Data path not configured.")
-            
-        self.file_path = os.path.join(data_path, self.servers_file)
-        
-        if not os.path.exists(self.file_path):
-            self._save([])
-        else:
-            try:
-                with open(self.file_path, "r") as f:
-                    self._cache = json.load(f)
-            except:
-                self._cache = []
-
-    def _save(self, data):
-        with open(self.file_path, "w") as f:
-            json.dump(data, f, indent=4)
-        self._cache = data
 
-    def get_all_servers(self):
-        # Refresh cache?
+        kind = config_manager.get_db_backend()
+        key = (str(data_path), kind)
+        if key != self._backend_key:
+            # Data path or backend changed, drop everything we knew
+            if self.backend:
+                self.backend.close()
+            self.backend = self._open_backend(data_path, kind)
+            self._backend_key = key
+
+        self.backend.load_if_changed()
+
+    def _open_backend(self, data_path, kind):
+        json_path = os.path.join(data_path, self.servers_file)
+        if kind == "sqlite":
+            from core.sqlite_backend import SqliteBackend
+            backend = SqliteBackend(os.path.join(data_path, self.sqlite_file))
+            imported = backend.import_json(json_path)
+            if imported:
+                print(f"Imported {imported} servers from {json_path}")
+            return backend
+        if kind != "json":
+            raise Exception(f"Unknown database backend '{kind}'.")
+        return JsonBackend(json_path)
+
+    def batch(self):
+        """
+        Groups several mutations into one write, e.g.
+            with db_manager.batch():
+                for s in servers: db_manager.update_server_options(...)
+        """
         self.connect()
-        return self._cache
+        return self.backend.batch()
+
+    def flush(self):
+        if self.backend:
+            self.backend.flush()
+
+    def has_external_changes(self):
+        """
+        True when another process (another GUI, scripted tooling) changed the
+        registry since we last looked. Cheap enough to poll from a timer.
+        """
+        if not self.backend:
+            return False
+        return self.backend.has_external_changes()
+
+    def get_all_servers(self, order_by="id", descending=False):
+        self.connect()
+        return self.backend.all(order_by, descending)
 
     def get_server(self, server_id):
         self.connect()
-        for s in self._cache:
-            if s['id'] == server_id:
-                return s
-        return None
+        return self.backend.get(server_id)
+
+    def find_servers(self, jar_type=None, version=None, name=None, order_by="id", descending=False):
+        """e.g. find_servers(jar_type="Paper", version="1.20.4", order_by="name")"""
+        self.connect()
+        return self.backend.find(jar_type=jar_type, version=version, name=name,
+                                 order_by=order_by, descending=descending)
+
+    def get_servers_by_type(self, jar_type):
+        return self.find_servers(jar_type=jar_type)
+
+    def get_servers_by_version(self, version):
+        return self.find_servers(version=version)
+
+    def get_server_by_path(self, path):
+        self.connect()
+        found = self.backend.find(path=path)
+        return found[0] if found else None
 
     def add_server(self, name, path, jar_type, version, java_path="java", ram_min="2048M", ram_max="4096M"):
         self.connect()
-        
-        # Generate ID (Simple auto-increment logic based on max id or timestamp)
-        new_id = int(time.time()) 
-        if self._cache:
-             max_id = max(s['id'] for s in self._cache)
-             new_id = max(new_id, max_id + 1)
-
-        new_server = {
-            "id": new_id,
-            "name": name,
-            "path": path,
-            "jar_type": jar_type,
-            "version": version,
-            "java_path": java_path,
-            "ram_min": ram_min,
-            "ram_max": ram_max,
-            "created_at": time.time()
-        }
-        
-        self._cache.append(new_server)
-        self._save(self._cache)
-        return new_id
-        
+        with self.backend.transaction():
+            # Generate ID (Simple auto-increment logic based on max id or timestamp)
+            new_id = int(time.time())
+            max_id = self.backend.max_id()
+            if max_id is not None:
+                 new_id = max(new_id, max_id + 1)
+
+            new_server = {
+                "id": new_id,
+                "name": name,
+                "path": path,
+                "jar_type": jar_type,
+                "version": version,
+                "java_path": java_path,
+                "ram_min": ram_min,
+                "ram_max": ram_max,
+                "created_at": time.time()
+            }
+
+            self.backend.insert(new_server)
+            return new_id
+
     def update_server_options(self, server_id, java_path, ram_min, ram_max):
         self.connect()
-        for s in self._cache:
-            if s['id'] == server_id:
-                s['java_path'] = java_path
-                s['ram_min'] = ram_min
-                s['ram_max'] = ram_max
-                self._save(self._cache)
-                return True
-        return False
-        
+        updated = self.backend.update(server_id, {
+            'java_path': java_path,
+            'ram_min': ram_min,
+            'ram_max': ram_max,
+        })
+        return updated is not None
+
     def delete_server(self, server_id):
         self.connect()
-        self._cache = [s for s in self._cache if s['id'] != server_id]
-        self._save(self._cache)
+        self.backend.delete(server_id)
 
     @property
     def conn(self):
@@ -93,4 +293,3 @@ class DatabaseManager:
         return None
 
 db_manager = DatabaseManager()
-
@@ -1,79 +1,299 @@
 import requests
 import os
 import json
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.exceptions import HTTPError as TransportError
+from core.config_manager import config_manager
+from core.meta_cache import MetadataCache
+from core.jar_store import JarStore, jar_store
+from core.segmented_download import SegmentedDownload
+from core.jobs import JobCancelled
+
+USER_AGENT = 'LocalMCManager/1.0'
+
+# How long metadata is trusted before revalidating with upstream
+META_TTL = 10 * 60
+# Per-version documents never change once published
+IMMUTABLE_TTL = 7 * 24 * 3600
+
+LOADERS = ("vanilla", "paper", "purpur", "fabric", "forge")
+
+# Hosts behind each upstream. A mirror for an upstream serves the same paths
+# under its own base URL, where "{host}" stands for the upstream host
+# (see ConfigManager.get_mirrors)
+UPSTREAMS = {
+    "mojang": ("launchermeta.mojang.com", "piston-meta.mojang.com", "piston-data.mojang.com", "launcher.mojang.com"),
+    "paper": ("api.papermc.io",),
+    "purpur": ("api.purpurmc.org",),
+    "fabric": ("meta.fabricmc.net", "maven.fabricmc.net"),
+    "forge": ("files.minecraftforge.net", "maven.minecraftforge.net"),
+}
+UPSTREAM_OF_HOST = {host: name for name, hosts in UPSTREAMS.items() for host in hosts}
 
 class Downloader:
+    def __init__(self, timeout=(5, 30), retries=3, backoff=0.5, pool_size=8, session=None, cache=None,
+                 segments=4, segment_threshold=16 * 1024 * 1024, mirrors=None, offline=None):
+        """
+        timeout: (connect, read) seconds for every request, so a stalled
+        mirror can't hang the caller forever.
+        retries/backoff: connection errors and 429/5xx are retried with
+        exponential backoff (backoff * 2^n seconds).
+        segments: parallel connections for files of at least segment_threshold
+        bytes on servers that accept Range requests.
+        mirrors/offline: {upstream: base URL} to fetch from instead of the
+        public hosts, and whether unmirrored hosts may be contacted at all.
+        Both default to the [MIRRORS] config.
+        """
+        self.timeout = timeout
+        self.mirrors = config_manager.get_mirrors() if mirrors is None else mirrors
+        self.offline = config_manager.is_offline() if offline is None else offline
+        self.session = session or self._make_session(retries, backoff, pool_size)
+        self.cache = cache or MetadataCache()
+        self.segments = segments
+        self.segment_threshold = segment_threshold
+
+        # Identical requests made while one is already in flight wait for it
+        self._inflight = {}
+        self._versions = {}
+        self._flight_lock = threading.Lock()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def _make_session(retries, backoff, pool_size):
+        # One keep-alive pool per host, shared by every call on this Downloader
+        session = requests.Session()
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        return session
+
+    def mirror_url(self, url):
+        """Where url is actually fetched from: its mirror, or itself."""
+        parts = urlsplit(url)
+        base = self.mirrors.get(UPSTREAM_OF_HOST.get(parts.netloc))
+        if base:
+            return base.replace("{host}", parts.netloc) + parts.path + (f"?{parts.query}" if parts.query else "")
+        if self.offline:
+            raise requests.ConnectionError(f"Offline mode: no mirror for {parts.netloc}")
+        return url
+
+    def _get(self, url, **kwargs):
+        # Cache keys and build URLs stay upstream URLs; only the wire goes to the mirror
+        url = self.mirror_url(url)
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            r = self.session.get(url, **kwargs)
+        except Exception:
+            self._record(url, time.perf_counter() - start, error=True)
+            raise
+        self._record(url, time.perf_counter() - start, error=r.status_code >= 400)
+        return r
+
+    def _get_head(self, url, **kwargs):
+        url = self.mirror_url(url)
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs.setdefault("allow_redirects", True)
+        start = time.perf_counter()
+        try:
+            r = self.session.head(url, **kwargs)
+        except Exception:
+            self._record(url, time.perf_counter() - start, error=True)
+            raise
+        self._record(url, time.perf_counter() - start, error=r.status_code >= 400)
+        return r
+
+    def _get_json(self, url, ttl=META_TTL):
+        # Parsed documents are shared through the cache, don't mutate them
+        return self._single_flight(("json", url), lambda: self.cache.get_json(url, self._get, ttl))
+
+    def _single_flight(self, key, fn):
+        """
+        Runs fn() once for concurrent callers with the same key; the others
+        block until it finishes and get the same result (or exception).
+        """
+        with self._flight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._flight_lock:
+                del self._inflight[key]
+
+    def _record(self, url, elapsed, error=False):
+        host = urlsplit(url).netloc
+        with self._stats_lock:
+            st = self._stats.setdefault(host, {"requests": 0, "errors": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+            st["requests"] += 1
+            st["errors"] += int(error)
+            st["total"] += elapsed
+            st["max"] = max(st["max"], elapsed)
+            st["last"] = elapsed
+
+    def get_stats(self):
+        """
+        Per-host latency (seconds, time to response headers):
+        {host: {"requests", "errors", "avg", "max", "last"}}
+        """
+        with self._stats_lock:
+            return {
+                host: {
+                    "requests": st["requests"],
+                    "errors": st["errors"],
+                    "avg": st["total"] / st["requests"] if st["requests"] else 0.0,
+                    "max": st["max"],
+                    "last": st["last"],
+                }
+                for host, st in self._stats.items()
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
     def get_versions(self, loader_type):
         loader_type = loader_type.lower()
         if loader_type == "spigot": loader_type = "paper" # Use Paper for Spigot as requested
-        
-        try:
-            if loader_type == "vanilla":
-                # Official Mojang Manifest
-                return [v["id"] for v in requests.get(
-                    "https://launchermeta.mojang.com/mc/game/version_manifest.json"
-                ).json()["versions"] if v["type"] == "release"]
-            
-            elif loader_type == "paper":
-                # PaperMC API
-                return requests.get(
-                    "https://api.papermc.io/v2/projects/paper"
-                ).json()["versions"][::-1] # Newest first
-            
-            elif loader_type == "purpur":
-                # Purpur API
-                versions = requests.get("https://api.purpurmc.org/v2/purpur").json()["versions"]
-                return sorted(versions, key=lambda v: tuple(map(int, v.split("."))), reverse=True)
 
-            elif loader_type == "fabric":
-                # Fabric Meta API
-                return [
-                    v["version"] for v in requests.get(
-                        "https://meta.fabricmc.net/v2/versions/game"
-                    ).json() if v["stable"]
-                ]
-            
-            elif loader_type == "forge":
-                # Forge Promotions
-                data = requests.get("https://files.minecraftforge.net/net/minecraftforge/forge/promotions_slim.json").json().get("promos", {})
-                versions = {
-                    k.split("-")[0] for k in data.keys() if k[0].isdigit()
-                }
-                return sorted(list(versions), key=lambda v: tuple(map(int, v.split('.'))), reverse=True)
+        cached = self.peek_versions(loader_type)
+        if cached is not None:
+            return cached
 
-            # Fallback
-            return ["1.21.4", "1.21.3", "1.21.1", "1.21", "1.20.4", "1.20.2", "1.20.1"]
-            
+        try:
+            versions = self._single_flight(("versions", loader_type), lambda: self._fetch_versions(loader_type))
+            with self._flight_lock:
+                self._versions[loader_type] = (time.time(), versions)
+            return versions
         except Exception as e:
             print(f"Error fetching versions for {loader_type}: {e}")
             return ["1.20.4", "1.20.2", "1.20.1"] # Fallback
 
-    def get_download_url(self, loader_type, version):
+    def peek_versions(self, loader_type):
+        """Version list if one was fetched recently, without touching the network."""
         loader_type = loader_type.lower()
         if loader_type == "spigot": loader_type = "paper"
+        with self._flight_lock:
+            entry = self._versions.get(loader_type)
+        if entry and time.time() - entry[0] < META_TTL:
+            return entry[1]
+        return None
+
+    def prefetch_versions(self, loaders=LOADERS):
+        """
+        Fetches every loader's version list concurrently (e.g. when the create
+        wizard opens) so switching loaders afterwards is instant.
+        Returns {loader: versions}.
+        """
+        with ThreadPoolExecutor(max_workers=len(loaders)) as pool:
+            return dict(zip(loaders, pool.map(self.get_versions, loaders)))
+
+    def _fetch_versions(self, loader_type):
+        if loader_type == "vanilla":
+            # Official Mojang Manifest
+            return [v["id"] for v in self._get_json(
+                "https://launchermeta.mojang.com/mc/game/version_manifest.json"
+            )["versions"] if v["type"] == "release"]
+        
+        elif loader_type == "paper":
+            # PaperMC API
+            return self._get_json(
+                "https://api.papermc.io/v2/projects/paper"
+            )["versions"][::-1] # Newest first
+        
+        elif loader_type == "purpur":
+            # Purpur API
+            versions = self._get_json("https://api.purpurmc.org/v2/purpur")["versions"]
+            return sorted(versions, key=lambda v: tuple(map(int, v.split("."))), reverse=True)
+
+        elif loader_type == "fabric":
+            # Fabric Meta API
+            return [
+                v["version"] for v in self._get_json(
+                    "https://meta.fabricmc.net/v2/versions/game"
+                ) if v["stable"]
+            ]
         
+        elif loader_type == "forge":
+            # Forge Promotions
+            data = self._get_json("https://files.minecraftforge.net/net/minecraftforge/forge/promotions_slim.json").get("promos", {})
+            versions = {
+                k.split("-")[0] for k in data.keys() if k[0].isdigit()
+            }
+            return sorted(list(versions), key=lambda v: tuple(map(int, v.split('.'))), reverse=True)
+
+        # Fallback
+        return ["1.21.4", "1.21.3", "1.21.1", "1.21", "1.20.4", "1.20.2", "1.20.1"]
+
+    def get_download_url(self, loader_type, version):
+        build = self.resolve_build(loader_type, version)
+        return build["url"] if build else None
+
+    def resolve_build(self, loader_type, version):
+        """
+        Latest build for a loader/version:
+        {"loader", "version", "build", "key", "url", "hashes"} or None.
+        """
+        loader_type = loader_type.lower()
+        if loader_type == "spigot": loader_type = "paper"
+        return self._single_flight(("build", loader_type, version),
+                                   lambda: self._resolve_build(loader_type, version))
+
+    def _resolve_build(self, loader_type, version):
         try:
             if loader_type == "vanilla":
                 # Official Mojang Manifest
-                r = requests.get("https://launchermeta.mojang.com/mc/game/version_manifest.json")
-                versions = r.json()["versions"]
+                versions = self._get_json("https://launchermeta.mojang.com/mc/game/version_manifest.json")["versions"]
                 target_url = next((v["url"] for v in versions if v["id"] == version), None)
                 if target_url:
-                    r2 = requests.get(target_url)
-                    return r2.json()["downloads"]["server"]["url"]
+                    server = self._get_json(target_url, ttl=IMMUTABLE_TTL)["downloads"]["server"]
+                    return self._build(loader_type, version, version, server["url"], sha1=server.get("sha1"))
             
             elif loader_type == "paper":
                 # PaperMC API
-                r = requests.get(f"https://api.papermc.io/v2/projects/paper/versions/{version}")
-                builds = r.json().get("builds", [])
+                # The builds listing carries each build's jar name and sha256
+                builds = self._get_json(f"https://api.papermc.io/v2/projects/paper/versions/{version}/builds").get("builds", [])
                 if not builds: return None
-                latest_build = builds[-1]
-                return f"https://api.papermc.io/v2/projects/paper/versions/{version}/builds/{latest_build}/downloads/paper-{version}-{latest_build}.jar"
+                latest = builds[-1]
+                latest_build = latest["build"]
+                app = latest.get("downloads", {}).get("application", {})
+                jar_name = app.get("name", f"paper-{version}-{latest_build}.jar")
+                return self._build(loader_type, version, latest_build,
+                    f"https://api.papermc.io/v2/projects/paper/versions/{version}/builds/{latest_build}/downloads/{jar_name}",
+                    sha256=app.get("sha256"))
             
             elif loader_type == "purpur":
                 # Purpur API
-                r = requests.get(f"https://api.purpurmc.org/v2/purpur/{version}")
-                data = r.json()
+                data = self._get_json(f"https://api.purpurmc.org/v2/purpur/{version}")
                 
                 # Check inside 'builds' for 'all' list
                 builds_data = data.get("builds", {})
@@ -86,27 +306,32 @@ class Downloader:
                 
                 if not all_builds: return None
                 latest_build = all_builds[-1]
-                return f"https://api.purpurmc.org/v2/purpur/{version}/{latest_build}/download"
+                info = self._get_json(f"https://api.purpurmc.org/v2/purpur/{version}/{latest_build}", ttl=IMMUTABLE_TTL)
+                return self._build(loader_type, version, latest_build,
+                    f"https://api.purpurmc.org/v2/purpur/{version}/{latest_build}/download",
+                    md5=info.get("md5"))
 
             elif loader_type == "fabric":
                 # Fabric Meta API
                 # Get Loader
-                r = requests.get("https://meta.fabricmc.net/v2/versions/loader")
                 # Assuming first is stable/newest
-                loaders = r.json()
+                loaders = self._get_json("https://meta.fabricmc.net/v2/versions/loader")
                 loader_ver = next((l["version"] for l in loaders if l["stable"]), loaders[0]["version"])
                 
                 # Get Installer
-                r2 = requests.get("https://meta.fabricmc.net/v2/versions/installer")
-                installers = r2.json()
+                installers = self._get_json("https://meta.fabricmc.net/v2/versions/installer")
                 installer_ver = next((i["version"] for i in installers if i["stable"]), installers[0]["version"])
                 
-                return f"https://meta.fabricmc.net/v2/versions/loader/{version}/{loader_ver}/{installer_ver}/server/jar"
+                # The installer adds the loader on top of the vanilla jar (see LoaderInstaller)
+                installer_url = (f"https://maven.fabricmc.net/net/fabricmc/fabric-installer/{installer_ver}/"
+                                 f"fabric-installer-{installer_ver}.jar")
+                return self._build(loader_type, version, f"{loader_ver}-{installer_ver}", installer_url,
+                    extra={"installer_url": installer_url, "installer_key": f"fabric-installer/{installer_ver}",
+                           "loader_version": loader_ver})
 
             elif loader_type == "forge":
                 # Forge Promotions
-                r = requests.get("https://files.minecraftforge.net/net/minecraftforge/forge/promotions_slim.json")
-                promos = r.json().get("promos", {})
+                promos = self._get_json("https://files.minecraftforge.net/net/minecraftforge/forge/promotions_slim.json").get("promos", {})
                 
                 forge_ver = promos.get(f"{version}-recommended")
                 if not forge_ver:
@@ -115,37 +340,245 @@ class Downloader:
                 if not forge_ver:
                     return None
                  
-                return f"https://maven.minecraftforge.net/net/minecraftforge/forge/{version}-{forge_ver}/forge-{version}-{forge_ver}-installer.jar"
+                installer_url = f"https://maven.minecraftforge.net/net/minecraftforge/forge/{version}-{forge_ver}/forge-{version}-{forge_ver}-installer.jar"
+                return self._build(loader_type, version, forge_ver, installer_url,
+                    extra={"installer_url": installer_url,
+                           "installer_key": JarStore.make_key("forge-installer", version, forge_ver)})
 
         except Exception as e:
             print(f"Error getting URL for {loader_type} {version}: {e}")
         return None
 
-    def download_jar(self, url, save_path, progress_callback=None):
+    @staticmethod
+    def _build(loader_type, version, build, url, extra=None, **hashes):
+        return {
+            **(extra or {}),
+            "loader": loader_type,
+            "version": version,
+            "build": str(build),
+            "key": JarStore.make_key(loader_type, version, build),
+            "url": url,
+            # Checksums upstream publishes for this jar, verified after download
+            "hashes": {k: v for k, v in hashes.items() if v},
+        }
+
+    def install_jar(self, loader_type, version, target, progress_callback=None, build=None, log=None, java_path="java"):
+        """
+        Puts the latest (or the given, already resolved) build at target via
+        the shared jar store: each build is downloaded once and hardlinked
+        into every server that uses it. Returns the build dict or None.
+
+        Forge and Fabric builds run their installer in target's folder
+        instead and write launch.json; its output goes to log.
+        """
+        build = build or self.resolve_build(loader_type, version)
+        if not build:
+            return None
+
+        if build.get("installer_url"):
+            from core.loader_installer import loader_installer
+            launch = loader_installer.install(self, build, os.path.dirname(target), progress_callback, log, java_path)
+            return dict(build, launch=launch)
+
+        sha = self.fetch_build(build, progress_callback)
+        if not sha:
+            return None
+        jar_store.install(sha, target, os.path.dirname(target))
+        return dict(build, sha256=sha)
+
+    def fetch_build(self, build, progress_callback=None):
+        """Makes sure a resolved build's jar is in the jar store. Returns its hash or None."""
+        sha = jar_store.lookup(build["key"])
+        if not sha:
+            staging = jar_store.staging_path(build["key"].replace("/", "-") + ".jar")
+            hashes = build.get("hashes", {})
+            if not self.download_jar(build["url"], staging, progress_callback, hashes=hashes):
+                return None
+            sha = jar_store.add_file(staging, key=build["key"], url=build["url"], sha256=hashes.get("sha256"))
+        elif progress_callback:
+            progress_callback(100, 0)
+        return sha
+
+    def download_jar(self, url, save_path, progress_callback=None, hashes=None, attempts=3):
+        """
+        Downloads into save_path + ".part" and renames it into place only once
+        it is complete and matches `hashes` ({"sha1"/"sha256"/"md5": hexdigest}).
+        An existing .part (interrupted earlier, or a dropped connection within
+        this call) is resumed with a Range request instead of starting over,
+        as long as upstream still serves the same file (see _download_part).
+        Large files on Range-capable servers are fetched as parallel segments.
+
+        progress_callback(percent, bytes_per_second) is called as data arrives.
+        """
         if not url: return False
+        part_path = save_path + ".part"
+        hashes = {k: v.lower() for k, v in (hashes or {}).items() if v}
         try:
             # Create parent dir
             os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            
-            headers = {'User-Agent': 'LocalMCManager/1.0'}
-            r = requests.get(url, stream=True, headers=headers)
-            r.raise_for_status()
-            
-            total_len = int(r.headers.get('content-length', 0))
-            downloaded = 0
-            
-            with open(save_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192): 
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if progress_callback and total_len > 0:
-                            percent = int((downloaded / total_len) * 100)
-                            progress_callback(percent)
+
+            if not self._download_segmented(url, part_path, progress_callback, attempts):
+                self._download_stream(url, part_path, progress_callback, attempts, verified=bool(hashes))
+
+            if hashes and not self._verify(part_path, hashes):
+                os.remove(part_path)
+                self._drop_validator(part_path)
+                print(f"Download Error: checksum mismatch for {url}")
+                return False
+
+            os.replace(part_path, save_path)
+            self._drop_validator(part_path)
             return True
+        except JobCancelled:
+            raise # Not a download failure: the job is being cancelled, the .part stays for a resume
         except Exception as e:
             print(f"Download Error: {e}")
             return False
 
+    def _download_segmented(self, url, part_path, progress_callback, attempts):
+        """
+        True if the file was fetched as parallel segments. False means use a
+        single stream: small file, no Range support, or a single-stream .part
+        is already waiting to be resumed.
+        """
+        if self.segments <= 1:
+            return False
+        resuming = os.path.exists(part_path + ".segments")
+        if os.path.exists(part_path) and not resuming:
+            return False
+
+        size = SegmentedDownload.probe(self, url)
+        if not size or (size < self.segment_threshold and not resuming):
+            return False
+
+        job = SegmentedDownload(self, url, part_path, size, self.segments, progress_callback, attempts)
+        if not job.run():
+            raise Exception(f"Segmented download of {url} failed")
+        return True
+
+    def _download_stream(self, url, part_path, progress_callback, attempts, verified=False):
+        for attempt in range(attempts):
+            try:
+                if self._download_part(url, part_path, progress_callback, verified):
+                    return
+            except (requests.ConnectionError, requests.Timeout, TransportError) as e:
+                if attempt == attempts - 1:
+                    raise
+                print(f"Download interrupted ({e}), resuming...")
+
+    def _download_part(self, url, part_path, progress_callback, verified=False):
+        """
+        Appends the rest of url to part_path. True once the file is complete.
+
+        The ETag (or Last-Modified) of the response a .part was started from
+        is kept in <part>.validator and sent as If-Range when resuming, so a
+        file that changed upstream comes back whole (200) instead of being
+        spliced onto the old bytes. A .part without a validator is only
+        resumed when verified, i.e. a checksum will catch a bad splice.
+        """
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = self._load_validator(part_path, url) if offset else None
+        if offset and not validator and not verified:
+            offset = 0 # No way to tell it's still the same file: start over
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        if offset and validator:
+            headers["If-Range"] = validator
+
+        r = self._get(url, stream=True, headers=headers)
+        with r:
+            if r.status_code == 416 and offset:
+                # Nothing left past our offset: the .part is already complete
+                return True
+            r.raise_for_status()
+
+            if r.status_code == 206:
+                total_len = self._content_range_total(r) or offset + int(r.headers.get('content-length', 0))
+            else:
+                # Changed upstream (If-Range failed) or no Range support: start from scratch
+                offset = 0
+                total_len = int(r.headers.get('content-length', 0))
+                self._save_validator(part_path, url, r)
+
+            downloaded = offset
+            started = time.perf_counter()
+            chunk_size = 64 * 1024
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                while True:
+                    read_start = time.perf_counter()
+                    chunk = r.raw.read(chunk_size, decode_content=True)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    now = time.perf_counter()
+                    chunk_size = self._next_chunk_size(chunk_size, len(chunk), now - read_start)
+                    if progress_callback and total_len > 0:
+                        percent = int((downloaded / total_len) * 100)
+                        rate = (downloaded - offset) / (now - started) if now > started else 0
+                        progress_callback(percent, rate)
+
+            if total_len and downloaded < total_len:
+                raise requests.ConnectionError(f"Connection closed at {downloaded}/{total_len} bytes")
+            return True
+
+    @staticmethod
+    def _validator_path(part_path):
+        return part_path + ".validator"
+
+    def _load_validator(self, part_path, url):
+        try:
+            with open(self._validator_path(part_path), "r") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return saved.get("if_range") if saved.get("url") == url else None
+
+    def _save_validator(self, part_path, url, r):
+        # If-Range only takes a strong ETag; a weak one falls back to the date
+        etag = r.headers.get('etag', '')
+        if_range = etag if etag and not etag.startswith('W/') else r.headers.get('last-modified')
+        if not if_range:
+            self._drop_validator(part_path)
+            return
+        with open(self._validator_path(part_path), "w") as f:
+            json.dump({"url": url, "if_range": if_range}, f)
+
+    def _drop_validator(self, part_path):
+        try: os.remove(self._validator_path(part_path))
+        except OSError: pass
+
+    @staticmethod
+    def _content_range_total(r):
+        # "bytes 1000-4999/5000"
+        value = r.headers.get('content-range', '')
+        total = value.rpartition('/')[2]
+        return int(total) if total.isdigit() else 0
+
+    @staticmethod
+    def _next_chunk_size(size, got, elapsed):
+        # Grow while reads fill the buffer quickly, shrink when they stall,
+        # so fast links use big writes and slow ones still report progress.
+        if got == size and elapsed < 0.05:
+            return min(size * 2, 4 * 1024 * 1024)
+        if elapsed > 0.5:
+            return max(size // 2, 16 * 1024)
+        return size
+
+    @staticmethod
+    def _verify(path, hashes):
+        digests = {}
+        for algo in hashes:
+            try:
+                digests[algo] = hashlib.new(algo)
+            except ValueError:
+                continue # Unknown algorithm name from upstream, can't check it
+        if not digests:
+            return True
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                for d in digests.values():
+                    d.update(chunk)
+        return all(d.hexdigest() == hashes[algo] for algo, d in digests.items())
+
 downloader = Downloader()
 
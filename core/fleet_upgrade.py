@@ -0,0 +1,144 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core.downloader import downloader as default_downloader
+from core.jar_store import jar_store
+from core.jobs import JobCancelled
+from core.server_process import installed_build_key, launch_args
+
+class FleetUpgrader:
+    """
+    "Check for updates" across every server at once.
+
+    plan() resolves the latest build for each distinct loader/version pair
+    concurrently (twenty Paper 1.20.4 servers cost one lookup) and compares
+    it with the build each server has installed. apply() downloads every
+    distinct jar once into the jar store, then swaps it into the servers that
+    are offline; running servers are skipped and keep their current build.
+    """
+
+    def __init__(self, downloader=None, workers=8):
+        self.downloader = downloader or default_downloader
+        self.workers = workers
+
+    @staticmethod
+    def current_key(server):
+        """Build key installed in a server folder, or None if unknown."""
+        return installed_build_key(server["path"])
+
+    def plan(self, servers, progress_callback=None):
+        """
+        One entry per server: the server's fields plus "current" (build key
+        or None), "available" (resolved build or None) and "action", one of
+        "upgrade", "current", "not installed" or "unavailable".
+        """
+        pairs = {(s["jar_type"].lower(), s["version"]) for s in servers}
+        builds = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(pairs)))) as pool:
+            futures = {pool.submit(self.downloader.resolve_build, *pair): pair for pair in pairs}
+            for done, future in enumerate(as_completed(futures), 1):
+                builds[futures[future]] = future.result()
+                if progress_callback:
+                    progress_callback(done * 100 / len(futures), 0)
+
+        plan = []
+        for server in servers:
+            available = builds.get((server["jar_type"].lower(), server["version"]))
+            current = self.current_key(server)
+            if launch_args(server["path"]) is None:
+                action = "not installed"
+            elif not available:
+                action = "unavailable"
+            elif current == available["key"]:
+                action = "current"
+            elif current is None and self._adopt_if_current(server, available):
+                current, action = available["key"], "current"
+            else:
+                action = "upgrade"
+            plan.append(dict(server, current=current, available=available, action=action))
+        return plan
+
+    def _adopt_if_current(self, server, available):
+        """
+        A jar from before the store has no recorded build: if it matches the
+        checksums published for the available build it already is that build,
+        and moves into the store under its key instead of being re-downloaded.
+        """
+        hashes = {k: v.lower() for k, v in available.get("hashes", {}).items() if v}
+        target = os.path.join(server["path"], "server.jar")
+        if not hashes or available.get("installer_url") or not os.path.isfile(target):
+            return False
+        try:
+            if not self.downloader._verify(target, hashes):
+                return False
+            jar_store.adopt(target, server["path"], key=available["key"])
+        except OSError as e:
+            print(f"Could not check {target}: {e}")
+            return False
+        return True
+
+    def apply(self, plan, is_busy=None, progress_callback=None, log=print):
+        """
+        Upgrades every "upgrade" entry. is_busy(server_id) is asked right
+        before each swap, on the calling thread; busy (running) servers are
+        left alone.
+        Returns {server_id: "upgraded" | "skipped" | "failed: <reason>"}.
+        """
+        is_busy = is_busy or (lambda server_id: False)
+        report = progress_callback or (lambda percent, rate=0: None)
+        todo = [e for e in plan if e["action"] == "upgrade"]
+        results = {}
+        if not todo:
+            return results
+
+        # 0-60%: every distinct jar once, concurrently, straight into the store
+        jars = {e["available"]["key"]: e["available"] for e in todo if not e["available"].get("installer_url")}
+        percents = dict.fromkeys(jars, 0)
+        shas = {}
+
+        def fetch(build):
+            def on_progress(percent, rate=0):
+                percents[build["key"]] = percent
+                report(sum(percents.values()) * 0.6 / len(percents), rate)
+            return self.downloader.fetch_build(build, on_progress)
+
+        if jars:
+            log(f"Downloading {len(jars)} jar(s) for {len(todo)} server(s)...")
+            with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(jars)))) as pool:
+                futures = {pool.submit(fetch, build): key for key, build in jars.items()}
+                for future in as_completed(futures):
+                    try:
+                        shas[futures[future]] = future.result()
+                    except Exception as e:
+                        log(f"Download of {futures[future]} failed: {e}")
+
+        # 60-100%: swap jars one server at a time
+        for i, entry in enumerate(todo):
+            report(60 + i * 40 / len(todo), 0)
+            build = entry["available"]
+            name = entry["name"]
+            if is_busy(entry["id"]):
+                log(f"{name}: running, skipped.")
+                results[entry["id"]] = "skipped"
+                continue
+            try:
+                if build.get("installer_url"):
+                    self.downloader.install_jar(build["loader"], build["version"],
+                                                os.path.join(entry["path"], "server.jar"), build=build,
+                                                log=log, java_path=entry.get("java_path", "java"))
+                else:
+                    sha = shas.get(build["key"])
+                    if not sha:
+                        raise Exception("download failed")
+                    jar_store.install(sha, os.path.join(entry["path"], "server.jar"), entry["path"])
+                log(f"{name}: {entry['current'] or 'unknown'} -> {build['key']}")
+                results[entry["id"]] = "upgraded"
+            except JobCancelled:
+                raise
+            except Exception as e:
+                log(f"{name}: upgrade failed: {e}")
+                results[entry["id"]] = f"failed: {e}"
+
+        report(100, 0)
+        return results
+
+fleet_upgrader = FleetUpgrader()
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from core.config_manager import config_manager
+from core.file_lock import FileLock
+
+# Unreferenced builds are kept this long so a bad upgrade can be rolled back
+GC_GRACE = 7 * 24 * 3600
+
+def link_file(src, dst):
+    """Hardlinks src to dst, falling back to a reflink and then a plain copy."""
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass # Different volume, FAT, no permission...
+    if _reflink(src, dst):
+        return
+    shutil.copyfile(src, dst)
+
+def _reflink(src, dst):
+    # Copy-on-write clone (btrfs, XFS); Linux only
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    FICLONE = 0x40049409
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        try: os.remove(dst)
+        except OSError: pass
+        return False
+
+class JarStore:
+    """
+    Content-addressed store for server jars, shared by every server.
+
+    Jars live once under <data_path>/jars/objects/<sha256[:2]>/<sha256>.jar and
+    are installed into server folders as hardlinks (reflink or copy as a
+    fallback) and kept read-only (outside Windows), so anything replacing a server's jar has
+    to write a new file and os.replace() it rather than truncate the link. index.json maps build keys ("paper/1.20.4/496") to hashes and
+    records which server folder references which hash, so builds nobody uses
+    any more can be garbage collected.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+        self._lock = threading.RLock()
+
+    @property
+    def root(self):
+        if self._root:
+            return self._root
+        data_path = config_manager.get_data_path()
+        if not data_path:
+            raise Exception("Data path not configured.")
+        return os.path.join(data_path, "jars")
+
+    @property
+    def index_path(self):
+        return os.path.join(self.root, "index.json")
+
+    def _file_lock(self):
+        os.makedirs(self.root, exist_ok=True)
+        return FileLock(os.path.join(self.root, "index.lock"))
+
+    @staticmethod
+    def make_key(loader_type, version, build):
+        return f"{loader_type.lower()}/{version}/{build}"
+
+    @staticmethod
+    def _server_key(server_path):
+        return os.path.normcase(os.path.abspath(server_path))
+
+    def object_path(self, sha256):
+        return os.path.join(self.root, "objects", sha256[:2], f"{sha256}.jar")
+
+    def staging_path(self, name):
+        """Somewhere on the same volume to download into before add_file()."""
+        path = os.path.join(self.root, "staging", name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    # --- Index ---
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault("artifacts", {})
+        index.setdefault("objects", {})
+        index.setdefault("refs", {})
+        return index
+
+    def _save_index(self, index):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+
+    # --- Lookups ---
+
+    def lookup(self, key):
+        """Hash of an already stored build, or None."""
+        with self._lock:
+            sha = self._load_index()["artifacts"].get(key)
+        if sha and os.path.exists(self.object_path(sha)):
+            return sha
+        return None
+
+    def find_url(self, url):
+        """Hash of a stored jar originally downloaded from url, or None."""
+        with self._lock:
+            objects = self._load_index()["objects"]
+        for sha, meta in objects.items():
+            if meta.get("url") == url and os.path.exists(self.object_path(sha)):
+                return sha
+        return None
+
+    def current(self, server_path):
+        """{"sha256", "key"} of the jar installed in a server folder, or None."""
+        with self._lock:
+            return self._load_index()["refs"].get(self._server_key(server_path))
+
+    def refcount(self, sha256):
+        with self._lock:
+            refs = self._load_index()["refs"]
+        return sum(1 for r in refs.values() if r["sha256"] == sha256)
+
+    # --- Adding ---
+
+    @staticmethod
+    def hash_file(path):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def add_file(self, path, key=None, url=None, sha256=None, move=True):
+        """
+        Puts a file into the store (moved by default) and returns its hash.
+        Adding a jar that is already stored just drops the new copy.
+        """
+        sha = sha256 or self.hash_file(path)
+        obj = self.object_path(sha)
+        with self._lock, self._file_lock():
+            if os.path.exists(obj):
+                if move:
+                    os.remove(path)
+            else:
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                if move:
+                    os.replace(path, obj)
+                else:
+                    shutil.copyfile(path, obj)
+            # Server folders hold hardlinks to it: writing through one would change every server's jar.
+            # Not on Windows, where read-only would also stop server folders being deleted
+            if os.name != "nt":
+                os.chmod(obj, 0o444)
+
+            index = self._load_index()
+            if key:
+                index["artifacts"][key] = sha
+            meta = index["objects"].setdefault(sha, {"size": os.path.getsize(obj), "added_at": time.time()})
+            if key:
+                meta["key"] = key
+            if url:
+                meta["url"] = url
+            self._save_index(index)
+        return sha
+
+    # --- Installing ---
+
+    def install(self, sha256, target, server_path=None):
+        """
+        Places a stored jar at target, replacing whatever was there.
+        server_path (defaults to target's folder) is recorded as a reference.
+        """
+        obj = self.object_path(sha256)
+        if not os.path.exists(obj):
+            raise FileNotFoundError(f"{sha256} is not in the jar store")
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = target + ".installing"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        link_file(obj, tmp)
+        # Replacing only drops this folder's link; the old build stays in the store
+        os.replace(tmp, target)
+
+        server_path = server_path or os.path.dirname(target)
+        with self._lock, self._file_lock():
+            index = self._load_index()
+            key = index["objects"].get(sha256, {}).get("key")
+            previous = index["refs"].get(self._server_key(server_path))
+            index["refs"][self._server_key(server_path)] = {"sha256": sha256, "key": key}
+            index["objects"].get(sha256, {}).pop("released_at", None)
+            if previous and previous["sha256"] != sha256:
+                self._mark_released(index, previous["sha256"])
+            self._save_index(index)
+
+    def adopt(self, target, server_path=None, key=None):
+        """
+        Moves an existing per-server jar into the store and links it back,
+        so servers created before the store stop holding their own copy.
+        """
+        sha = self.add_file(target, key=key, move=False)
+        self.install(sha, target, server_path)
+        return sha
+
+    def release(self, server_path):
+        """Forget a server folder's reference (e.g. the server was deleted)."""
+        with self._lock, self._file_lock():
+            index = self._load_index()
+            ref = index["refs"].pop(self._server_key(server_path), None)
+            if ref:
+                self._mark_released(index, ref["sha256"])
+                self._save_index(index)
+
+    @staticmethod
+    def _mark_released(index, sha256):
+        if any(r["sha256"] == sha256 for r in index["refs"].values()):
+            return
+        meta = index["objects"].get(sha256)
+        if meta is not None:
+            meta.setdefault("released_at", time.time())
+
+    # --- Garbage collection ---
+
+    def gc(self, grace=GC_GRACE):
+        """
+        Deletes builds no server has referenced for `grace` seconds, plus
+        references to server folders that no longer exist. Returns bytes freed.
+        """
+        freed = 0
+        now = time.time()
+        with self._lock, self._file_lock():
+            index = self._load_index()
+
+            for server_key, ref in list(index["refs"].items()):
+                if not os.path.isdir(server_key):
+                    del index["refs"][server_key]
+                    self._mark_released(index, ref["sha256"])
+
+            referenced = {r["sha256"] for r in index["refs"].values()}
+            for sha, meta in list(index["objects"].items()):
+                if sha in referenced:
+                    continue
+                released_at = meta.setdefault("released_at", now)
+                if now - released_at < grace:
+                    continue
+                obj = self.object_path(sha)
+                try:
+                    freed += os.path.getsize(obj)
+                    os.remove(obj)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Could not remove {obj}: {e}")
+                    continue
+                del index["objects"][sha]
+                for key, value in list(index["artifacts"].items()):
+                    if value == sha:
+                        del index["artifacts"][key]
+
+            self._save_index(index)
+
+            staging = os.path.join(self.root, "staging")
+            if os.path.isdir(staging):
+                for name in os.listdir(staging):
+                    path = os.path.join(staging, name)
+                    try:
+                        if now - os.path.getmtime(path) > grace:
+                            os.remove(path)
+                    except OSError:
+                        pass
+        return freed
+
+jar_store = JarStore()
@@ -0,0 +1,175 @@
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, Signal, QTimer
+
+class JobCancelled(Exception):
+    pass
+
+class Job(QObject):
+    """
+    One unit of background work (a download, a metadata fetch...).
+    Signals are emitted from the worker thread and delivered queued on the
+    GUI thread, so slots can touch widgets directly.
+    """
+    progress = Signal(int, float)   # percent, bytes/second
+    message = Signal(str)
+    finished = Signal(object)       # return value of the job function
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, job_id, key, fn, args, kwargs):
+        super().__init__()
+        self.id = job_id
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.state = "QUEUED" # QUEUED, RUNNING, PAUSED, DONE, FAILED, CANCELLED
+        self.result = None # Return value once DONE, error text once FAILED
+        self._lock = threading.RLock() # Ending (state + signal) vs. attach()
+        self._cancel = threading.Event()
+        self._resume = threading.Event()
+        self._resume.set()
+
+    # --- Called from the GUI ---
+
+    def cancel(self):
+        self._cancel.set()
+        self._resume.set() # Wake it up so it can notice
+
+    def pause(self):
+        if self.state == "RUNNING":
+            self._resume.clear()
+            self.state = "PAUSED"
+
+    def resume(self):
+        if self.state == "PAUSED":
+            self.state = "RUNNING"
+        self._resume.set()
+
+    def is_active(self):
+        return self.state in ("QUEUED", "RUNNING", "PAUSED")
+
+    def attach(self, finished=None, failed=None, cancelled=None, progress=None, message=None):
+        """
+        Connects the given slots. A job shared through its key may already
+        have ended by the time a caller gets it; then the matching slot is
+        called with the stored result on the next event loop turn instead.
+        """
+        with self._lock:
+            for signal, slot in ((self.progress, progress), (self.message, message)):
+                if slot:
+                    signal.connect(slot)
+            ended = not self.is_active()
+            if not ended:
+                for signal, slot in ((self.finished, finished), (self.failed, failed), (self.cancelled, cancelled)):
+                    if slot:
+                        signal.connect(slot)
+        if ended:
+            slot, args = {"DONE": (finished, (self.result,)), "FAILED": (failed, (self.result,)),
+                          "CANCELLED": (cancelled, ())}[self.state]
+            if slot:
+                QTimer.singleShot(0, lambda: slot(*args))
+
+    # --- Called from the worker ---
+
+    def check(self):
+        """Blocks while paused, raises JobCancelled once cancelled."""
+        self._resume.wait()
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def report(self, percent, rate=0.0):
+        # Same shape as Downloader's progress_callback, so it can be passed straight in
+        self.check()
+        self.progress.emit(int(percent), float(rate or 0.0))
+
+    def log(self, text):
+        self.message.emit(text)
+
+
+class JobQueue(QObject):
+    """
+    Runs jobs on a small thread pool so the event loop never waits on the
+    network. Jobs with the same key are shared: asking to install the jar for
+    a server that is already downloading returns the running job.
+    """
+    job_started = Signal(object)
+    job_ended = Signal(object)
+
+    def __init__(self, max_workers=4):
+        super().__init__()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, key=None, **kwargs):
+        """
+        Runs fn(job, *args, **kwargs) in the background and returns the Job.
+        With a key, the job may be an earlier one that is already running (or
+        just ended): connect through job.attach() so its outcome isn't missed.
+        """
+        with self._lock:
+            if key is not None:
+                existing = self.find(key)
+                if existing:
+                    return existing
+            job = Job(next(self._ids), key, fn, args, kwargs)
+            self._jobs[job.id] = job
+        QTimer.singleShot(0, lambda: self._start(job))
+        return job
+
+    def find(self, key):
+        for job in list(self._jobs.values()):
+            if job.key == key and job.is_active():
+                return job
+        return None
+
+    def active_jobs(self):
+        return [j for j in list(self._jobs.values()) if j.is_active()]
+
+    def _start(self, job):
+        if job._cancel.is_set():
+            self._end(job, "CANCELLED")
+            return
+        self.job_started.emit(job)
+        self._pool.submit(self._run, job)
+
+    def _run(self, job):
+        job.state = "RUNNING"
+        try:
+            job.check()
+            result = job.fn(job, *job.args, **job.kwargs)
+            job.check()
+        except Exception as e:
+            # Work that swallows errors turns a cancel into a plain failure
+            if isinstance(e, JobCancelled) or job._cancel.is_set():
+                self._end(job, "CANCELLED")
+            else:
+                self._end(job, "FAILED", str(e))
+        else:
+            self._end(job, "DONE", result)
+
+    def _end(self, job, state, result=None):
+        # State and signal together, so attach() either gets the signal or sees the end
+        with job._lock:
+            job.state = state
+            job.result = result
+            if state == "DONE":
+                job.finished.emit(result)
+            elif state == "FAILED":
+                job.failed.emit(result)
+            else:
+                job.cancelled.emit()
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        self.job_ended.emit(job)
+
+    def shutdown(self):
+        for job in self.active_jobs():
+            job.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+job_queue = JobQueue()
@@ -0,0 +1,244 @@
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from core.file_lock import FileLock
+
+class JsonStore:
+    """
+    Crash-safe persistence for a JSON list of records (servers.json).
+
+    Every mutation is appended to a small journal file (one JSON line per op)
+    and fsynced, so a burst of edits costs one tiny append each. The full
+    snapshot is rewritten later, debounced, via temp file + fsync + atomic
+    rename, after which the journal is truncated. Loading replays the journal
+    on top of the snapshot, so a crash at any point loses nothing.
+
+    Several processes may share the files: every mutation happens under an
+    advisory file lock, and bumps a sequence number in <file>.seq so other
+    instances know to reload (and only then).
+    """
+
+    def __init__(self, file_path, flush_delay=0.5):
+        self.file_path = file_path
+        self.journal_path = file_path + ".journal"
+        self.tmp_path = file_path + ".tmp"
+        self.backup_path = file_path + ".bak"
+        self.seq_path = file_path + ".seq"
+        self.flush_delay = flush_delay
+        self.lock = FileLock(file_path + ".lock")
+
+        self._stamp = None
+        self._timer = None
+        self._provider = None
+        self._batch = None
+
+    # --- Change detection ---
+
+    def stamp(self):
+        # The sequence number catches other instances, the stat catches hand edits
+        return (self.read_seq(), self._stat(self.file_path))
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read_seq(self):
+        try:
+            with open(self.seq_path, "r") as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            # Missing, or caught mid-write; either way treat it as a change
+            return None
+
+    def _bump_seq(self):
+        seq = (self.read_seq() or 0) + 1
+        with open(self.seq_path, "w") as f:
+            f.write(str(seq))
+        return seq
+
+    def needs_reload(self):
+        """True if someone else changed the files since we last loaded or wrote them."""
+        return self._stamp is None or self.stamp() != self._stamp
+
+    # --- Loading ---
+
+    def load(self):
+        with self.lock:
+            if os.path.exists(self.tmp_path):
+                # Leftover from a snapshot write that never got renamed
+                try: os.remove(self.tmp_path)
+                except OSError: pass
+
+            data = []
+            if os.path.exists(self.file_path):
+                try:
+                    data = self._read(self.file_path)
+                except Exception as e:
+                    # Keep the broken file around instead of overwriting it with []
+                    corrupt = f"{self.file_path}.corrupt-{int(time.time())}"
+                    print(f"Could not read {self.file_path} ({e}), moved to {corrupt}")
+                    try: os.replace(self.file_path, corrupt)
+                    except OSError: pass
+                    data = self._read_backup()
+
+            replayed = self._replay(data)
+            if not os.path.exists(self.file_path) or replayed:
+                self.write_snapshot(data)
+            if self.read_seq() is None:
+                self._bump_seq()
+            self._stamp = self.stamp()
+            return data
+
+    @staticmethod
+    def _read(path):
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _read_backup(self):
+        # Previous good snapshot, written right before the last rewrite
+        try:
+            data = self._read(self.backup_path)
+            print(f"Restored from {self.backup_path}")
+            return data
+        except Exception:
+            return []
+
+    def _replay(self, data):
+        if not os.path.exists(self.journal_path):
+            return 0
+
+        count = 0
+        index = {s['id']: i for i, s in enumerate(data)}
+        with open(self.journal_path, "r") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break # Torn last line from a crash mid-append
+                self._apply(data, index, op)
+                count += 1
+        return count
+
+    @staticmethod
+    def _apply(data, index, op):
+        # Ops are idempotent so replaying a journal twice is harmless
+        if op["op"] == "put":
+            record = op["record"]
+            i = index.get(record['id'])
+            if i is None:
+                index[record['id']] = len(data)
+                data.append(record)
+            else:
+                data[i] = record
+        elif op["op"] == "delete":
+            i = index.pop(op["id"], None)
+            if i is not None:
+                del data[i]
+                for k, v in index.items():
+                    if v > i: index[k] = v - 1
+
+    # --- Writing ---
+
+    def put(self, record):
+        self._append({"op": "put", "record": record})
+
+    def delete(self, record_id):
+        self._append({"op": "delete", "id": record_id})
+
+    def _append(self, op):
+        with self.lock:
+            line = json.dumps(op) + "\n"
+            if self._batch is not None:
+                self._batch.append(line)
+                return
+            self._write_journal(line)
+
+    def _write_journal(self, text):
+        with self.lock:
+            with open(self.journal_path, "a") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            self._bump_seq()
+            self._stamp = self.stamp()
+
+    @contextmanager
+    def batch(self):
+        """Group several mutations into a single journal append."""
+        with self.lock:
+            if self._batch is not None:
+                yield
+                return
+            self._batch = []
+            try:
+                yield
+            finally:
+                lines, self._batch = self._batch, None
+                if lines:
+                    self._write_journal("".join(lines))
+
+    def schedule_snapshot(self, provider):
+        """
+        Rewrite the snapshot from provider() after flush_delay seconds.
+        Further calls inside the window push the deadline back, so a burst
+        of mutations produces one rewrite.
+        """
+        with self.lock:
+            self._provider = provider
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self.lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self._provider is None:
+                return
+            provider, self._provider = self._provider, None
+            if self.needs_reload():
+                # Another process appended since our last write; our in-memory
+                # list would drop their changes. Rebuild from disk instead and
+                # make our owner reload on its next access.
+                self.load()
+                self._stamp = None
+                return
+            self.write_snapshot(provider())
+
+    def write_snapshot(self, data):
+        with self.lock:
+            with open(self.tmp_path, "w") as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.file_path):
+                try: shutil.copyfile(self.file_path, self.backup_path)
+                except OSError: pass
+            os.replace(self.tmp_path, self.file_path)
+            self._fsync_dir()
+
+            # Snapshot now contains everything the journal had
+            if os.path.exists(self.journal_path):
+                open(self.journal_path, "w").close()
+            if self._stamp is not None:
+                self._stamp = self.stamp()
+
+    def _fsync_dir(self):
+        if os.name != "posix":
+            return
+        try:
+            fd = os.open(os.path.dirname(self.file_path) or ".", os.O_RDONLY)
+            try: os.fsync(fd)
+            finally: os.close(fd)
+        except OSError:
+            pass
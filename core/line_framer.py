@@ -0,0 +1,44 @@
+import codecs
+import time
+
+class LineFramer:
+    """
+    Turns the raw byte chunks a process writes into complete lines.
+
+    Chunks can end anywhere: in the middle of a line or of a multi-byte
+    UTF-8 character. The incremental decoder holds back incomplete
+    characters and the framer holds back the unfinished line until the
+    chunk that completes it arrives. Each line is stamped with the time
+    that chunk was received.
+    """
+
+    def __init__(self, encoding="utf-8", max_line=64 * 1024):
+        self.encoding = encoding
+        self.max_line = max_line
+        self.reset()
+
+    def reset(self):
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        self._partial = ""
+
+    def feed(self, data, ts=None):
+        """Returns [(ts, line), ...] for every line completed by data."""
+        ts = ts or time.time()
+        text = self._partial + self._decoder.decode(bytes(data))
+        lines = text.split("\n")
+        self._partial = lines.pop()
+
+        # A runaway line without a newline is cut rather than buffered forever
+        while len(self._partial) > self.max_line:
+            lines.append(self._partial[:self.max_line])
+            self._partial = self._partial[self.max_line:]
+
+        return [(ts, line[:-1] if line.endswith("\r") else line) for line in lines]
+
+    def flush(self, ts=None):
+        """Whatever is left once the stream has ended, as a final line."""
+        ts = ts or time.time()
+        text = self._partial + self._decoder.decode(b"", final=True)
+        self.reset()
+        text = text.rstrip("\r")
+        return [(ts, text)] if text else []
@@ -0,0 +1,205 @@
+import glob
+import json
+import os
+import subprocess
+import threading
+from core.config_manager import config_manager
+from core.file_lock import FileLock
+from core.jar_store import jar_store, link_file
+from core.server_process import LAUNCH_FILE
+
+class LibraryCache:
+    """
+    Maven-layout library folder shared by every Forge/Fabric server
+    (<data_path>/libraries). After an install, everything the installer put
+    into <server>/libraries is hardlinked in here, together with a manifest
+    of the files that build needed. The next install of the same build gets
+    those files linked into its libraries/ first, so the installer finds
+    them with valid checksums and downloads nothing.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+        self._lock = threading.Lock()
+
+    @property
+    def root(self):
+        if self._root:
+            return self._root
+        data_path = config_manager.get_data_path()
+        if not data_path:
+            raise Exception("Data path not configured.")
+        return os.path.join(data_path, "libraries")
+
+    def _manifest_path(self, key):
+        return os.path.join(self.root, ".manifests", key.replace("/", "-") + ".json")
+
+    def manifest(self, key):
+        """Relative library paths a build needed last time, or []."""
+        try:
+            with open(self._manifest_path(key), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def seed(self, key, server_dir):
+        """Links the libraries a build needs into server_dir. Returns the count."""
+        linked = 0
+        for rel in self.manifest(key):
+            src = os.path.join(self.root, rel)
+            dst = os.path.join(server_dir, "libraries", rel)
+            if os.path.exists(dst) or not os.path.exists(src):
+                continue
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            try:
+                link_file(src, dst)
+                linked += 1
+            except OSError as e:
+                print(f"Could not link library {rel}: {e}")
+        return linked
+
+    def harvest(self, key, server_dir):
+        """Takes in every library the install produced and records the manifest."""
+        libraries = os.path.join(server_dir, "libraries")
+        paths = []
+        with self._lock, FileLock(os.path.join(self._ensure_root(), ".lock")):
+            for folder, _, files in os.walk(libraries):
+                for name in files:
+                    src = os.path.join(folder, name)
+                    rel = os.path.relpath(src, libraries).replace(os.sep, "/")
+                    paths.append(rel)
+                    dst = os.path.join(self.root, rel)
+                    if os.path.exists(dst) or os.path.getsize(src) == 0:
+                        continue
+                    os.makedirs(os.path.dirname(dst), exist_ok=True)
+                    tmp = dst + ".tmp"
+                    try:
+                        link_file(src, tmp)
+                        os.replace(tmp, dst)
+                    except OSError as e:
+                        print(f"Could not cache library {rel}: {e}")
+
+            manifest = self._manifest_path(key)
+            os.makedirs(os.path.dirname(manifest), exist_ok=True)
+            with open(manifest + ".tmp", "w") as f:
+                json.dump(sorted(paths), f)
+            os.replace(manifest + ".tmp", manifest)
+        return len(paths)
+
+    def _ensure_root(self):
+        os.makedirs(self.root, exist_ok=True)
+        return self.root
+
+
+class LoaderInstaller:
+    """
+    Installs loaders that ship as an installer instead of a runnable jar.
+
+    Forge: the installer jar runs headlessly with --installServer in the
+    server folder. Fabric: the vanilla jar comes from the jar store and the
+    Fabric installer adds the loader on top. Either way the installer's
+    output is streamed to the log callback, libraries go through the shared
+    LibraryCache, and launch.json records what to start.
+    """
+
+    def __init__(self, library_cache=None):
+        self.libraries = library_cache or LibraryCache()
+
+    def install(self, downloader, build, server_dir, progress_callback=None, log=None, java_path="java"):
+        """Runs the installer for a resolved build. Returns the launch arguments."""
+        log = log or print
+        report = progress_callback or (lambda percent, rate=0: None)
+        os.makedirs(server_dir, exist_ok=True)
+
+        # 0-30%: the installer itself (and for Fabric the vanilla server jar)
+        installer = self.fetch_installer(downloader, build, lambda p, r=0: report(p * 0.2, r))
+        if build["loader"] == "fabric":
+            vanilla = downloader.install_jar("vanilla", build["version"], os.path.join(server_dir, "server.jar"),
+                                             lambda p, r=0: report(20 + p * 0.1, r))
+            if not vanilla:
+                raise Exception(f"Could not get the vanilla {build['version']} server jar")
+            args = ["server", "-dir", ".", "-mcversion", build["version"], "-loader", build["loader_version"]]
+        else:
+            args = ["--installServer", "."]
+
+        seeded = self.libraries.seed(build["key"], server_dir)
+        if seeded:
+            log(f"Reusing {seeded} cached libraries.")
+
+        # 30-99%: one step per library/processor line, sized from the last install
+        expected = max(len(self.libraries.manifest(build["key"])), 50)
+        self._run(java_path, installer, args, server_dir, expected,
+                  lambda p: report(30 + p * 0.69), log)
+
+        self.libraries.harvest(build["key"], server_dir)
+        launch = self._write_launch(build, server_dir)
+        report(100, 0)
+        return launch
+
+    def fetch_installer(self, downloader, build, progress_callback=None):
+        """Path of the build's installer jar in the jar store, downloading it if needed."""
+        sha = jar_store.lookup(build["installer_key"])
+        if not sha:
+            staging = jar_store.staging_path(build["installer_key"].replace("/", "-") + ".jar")
+            if not downloader.download_jar(build["installer_url"], staging, progress_callback):
+                raise Exception(f"Could not download the {build['loader']} installer")
+            sha = jar_store.add_file(staging, key=build["installer_key"], url=build["installer_url"])
+        # Run straight from the store, the server folder never needs a copy
+        return jar_store.object_path(sha)
+
+    @staticmethod
+    def _run(java_path, installer, args, cwd, expected, progress_callback, log):
+        proc = subprocess.Popen(
+            [java_path, "-Djava.awt.headless=true", "-jar", installer, *args],
+            cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+            text=True, encoding="utf-8", errors="replace")
+        steps = 0
+        tail = []
+        try:
+            for line in proc.stdout:
+                line = line.rstrip()
+                if not line:
+                    continue
+                log(line)
+                tail = (tail + [line])[-20:]
+                if line.lstrip().startswith(("Considering library", "Downloading library", "MainClass:", "Downloading ")):
+                    steps += 1
+                # Raises JobCancelled from a cancelled job; the finally kills java
+                progress_callback(min(steps * 100 / expected, 100))
+            proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        if proc.returncode != 0:
+            raise Exception(f"Installer exited with code {proc.returncode}: {tail[-1] if tail else 'no output'}")
+
+    @staticmethod
+    def _write_launch(build, server_dir):
+        version, loader_build = build["version"], build["build"]
+        if build["loader"] == "fabric":
+            requires = "fabric-server-launch.jar"
+            args = ["-jar", requires]
+        else:
+            # 1.17+: the JVM reads its arguments from files under libraries/
+            args_file = "win_args.txt" if os.name == "nt" else "unix_args.txt"
+            requires = f"libraries/net/minecraftforge/forge/{version}-{loader_build}/{args_file}"
+            if os.path.exists(os.path.join(server_dir, requires)):
+                args = ["@user_jvm_args.txt", f"@{requires}"]
+            else:
+                # Older Forge leaves a runnable forge-<version>-<build>[-universal].jar
+                jars = [j for j in glob.glob(os.path.join(server_dir, f"forge-{version}-{loader_build}*.jar"))
+                        if not j.endswith("-installer.jar")]
+                if not jars:
+                    raise Exception("Installer finished but left nothing to launch")
+                requires = os.path.basename(jars[0])
+                args = ["-jar", requires]
+
+        if not os.path.exists(os.path.join(server_dir, requires)):
+            raise Exception(f"Installer finished but {requires} is missing")
+
+        with open(os.path.join(server_dir, LAUNCH_FILE), "w") as f:
+            json.dump({"key": build["key"], "args": args, "requires": requires}, f, indent=4)
+        return args
+
+loader_installer = LoaderInstaller()
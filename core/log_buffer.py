@@ -0,0 +1,166 @@
+import bisect
+import threading
+import time
+from array import array
+from collections import deque
+
+class LogBuffer:
+    """
+    Bounded console history for one server.
+
+    Lines are kept UTF-8 encoded, packed into blocks of up to BLOCK_LINES
+    lines (one bytes object each), and only decoded when read. Once the
+    buffer holds more than max_lines lines or max_bytes bytes, the oldest
+    block is dropped, so memory stays flat however long the server runs
+    (ServerProcess keeps the full stream on disk in its LogSpool).
+
+    Lines keep a stable absolute index: total counts every line ever
+    appended and first is the index of the oldest one still in memory.
+    """
+
+    BLOCK_LINES = 256
+    BLOCK_BYTES = 64 * 1024
+
+    def __init__(self, max_lines=50000, max_bytes=8 * 1024 * 1024):
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+
+        # Sealed blocks: (first line index, b"line\nline\n...", timestamps)
+        self._blocks = deque()
+        self._starts = [] # First index of each sealed block, for bisect
+        self._open = []
+        self._open_times = array("d")
+        self._open_bytes = 0
+        self._bytes = 0
+        self._first = 0
+        self._total = 0
+        self._decoded = (None, None) # (block start, [str]) of the last block read
+        self._lock = threading.RLock()
+
+    @property
+    def total(self):
+        return self._total
+
+    @property
+    def first(self):
+        return self._first
+
+    @property
+    def nbytes(self):
+        """Encoded bytes held in memory."""
+        return self._bytes
+
+    def __len__(self):
+        return self._total - self._first
+
+    def __bool__(self):
+        return self._total > self._first
+
+    def __iter__(self):
+        return iter(self.lines())
+
+    # --- Writing ---
+
+    def append(self, line, ts=None):
+        if "\n" in line:
+            # Blocks are newline-separated, so a line must not contain one
+            for part in line.split("\n"):
+                self.append(part, ts)
+            return
+        data = line.encode("utf-8", errors="replace")
+        with self._lock:
+            self._open.append(data)
+            self._open_times.append(ts or time.time())
+            self._open_bytes += len(data) + 1
+            self._bytes += len(data) + 1
+            self._total += 1
+            if len(self._open) >= self.BLOCK_LINES or self._open_bytes >= self.BLOCK_BYTES:
+                self._seal()
+            self._evict()
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+            self._starts.clear()
+            self._open = []
+            self._open_times = array("d")
+            self._open_bytes = self._bytes = 0
+            self._first = self._total
+            self._decoded = (None, None)
+
+    def _seal(self):
+        if not self._open:
+            return
+        start = self._total - len(self._open)
+        self._blocks.append((start, b"\n".join(self._open), self._open_times))
+        self._starts.append(start)
+        self._open = []
+        self._open_times = array("d")
+        self._open_bytes = 0
+
+    def _evict(self):
+        while self._blocks and (len(self) > self.max_lines or self._bytes > self.max_bytes):
+            start, data, _ = self._blocks.popleft()
+            self._starts.pop(0)
+            self._bytes -= len(data) + 1
+            self._first = self._starts[0] if self._starts else self._total - len(self._open)
+            if self._decoded[0] == start:
+                self._decoded = (None, None)
+
+    # --- Reading ---
+
+    def _block_lines(self, block):
+        start, data, _ = block
+        if self._decoded[0] != start:
+            self._decoded = (start, data.decode("utf-8", errors="replace").split("\n"))
+        return self._decoded[1]
+
+    def get(self, index):
+        """Line at an absolute index (first <= index < total)."""
+        with self._lock:
+            if not self._first <= index < self._total:
+                raise IndexError(index)
+            open_start = self._total - len(self._open)
+            if index >= open_start:
+                return self._open[index - open_start].decode("utf-8", errors="replace")
+            i = bisect.bisect_right(self._starts, index) - 1
+            return self._block_lines(self._blocks[i])[index - self._starts[i]]
+
+    def timestamp(self, index):
+        with self._lock:
+            if not self._first <= index < self._total:
+                raise IndexError(index)
+            open_start = self._total - len(self._open)
+            if index >= open_start:
+                return self._open_times[index - open_start]
+            i = bisect.bisect_right(self._starts, index) - 1
+            return self._blocks[i][2][index - self._starts[i]]
+
+    def lines(self, start=None, end=None):
+        """Decoded lines with absolute indexes in [start, end)."""
+        with self._lock:
+            start = self._first if start is None else max(start, self._first)
+            end = self._total if end is None else min(end, self._total)
+            out = []
+            if start >= end:
+                return out
+            open_start = self._total - len(self._open)
+            i = max(0, bisect.bisect_right(self._starts, start) - 1)
+            while i < len(self._blocks) and self._starts[i] < min(end, open_start):
+                block_start = self._starts[i]
+                block = self._block_lines(self._blocks[i])
+                out.extend(block[max(0, start - block_start):end - block_start])
+                i += 1
+            if end > open_start:
+                out.extend(d.decode("utf-8", errors="replace") for d in self._open[max(0, start - open_start):end - open_start])
+            return out
+
+    def tail(self, n):
+        return self.lines(max(self._first, self._total - n), self._total)
+
+    def text(self):
+        return "\n".join(self.lines())
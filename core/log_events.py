@@ -0,0 +1,166 @@
+import re
+import time
+from collections import namedtuple
+from core.log_search import required_literals
+
+# "[12:34:56] [Server thread/INFO]: msg", Forge's "[12:34:56] [Server thread/INFO] [minecraft/DedicatedServer]: msg"
+# and Paper's "[12:34:56 INFO]: msg"
+LAYOUT = re.compile(r"\[(\d\d:\d\d:\d\d)(?:\.\d+)?(?: ([A-Z]+))?\](?: \[([^\]]+)/([A-Z]+)\])?(?: \[[^\]]*\])?: ")
+STACK_LINE = ("\tat ", "    at ", "\t... ", "Caused by: ", "\tSuppressed: ")
+
+# Every event starts with ts: when the line was received
+PlayerJoined = namedtuple("PlayerJoined", "ts player")
+PlayerLeft = namedtuple("PlayerLeft", "ts player")
+ChatMessage = namedtuple("ChatMessage", "ts player message")
+ServerStarting = namedtuple("ServerStarting", "ts version")
+PreparingLevel = namedtuple("PreparingLevel", "ts level")
+SpawnProgress = namedtuple("SpawnProgress", "ts percent")
+SpawnPrepared = namedtuple("SpawnPrepared", "ts millis")
+PluginLoaded = namedtuple("PluginLoaded", "ts plugin version phase seconds")
+ServerDone = namedtuple("ServerDone", "ts seconds")
+Overloaded = namedtuple("Overloaded", "ts millis ticks")
+ServerStopping = namedtuple("ServerStopping", "ts")
+SavingChunks = namedtuple("SavingChunks", "ts level")
+ChunksSaved = namedtuple("ChunksSaved", "ts")
+ServerException = namedtuple("ServerException", "ts thread level message stack")
+
+# Plugins announce themselves ("Loading X v1", Paper: "Loading server plugin X v1");
+# the time until the next line like it is what loading one took
+PLUGIN_STEP = re.compile(r"\[([^\]]+)\] (Loading|Enabling) (?:server plugin )?\S+ v(\S+)$")
+
+RULES = [
+    (PlayerJoined, r"(\w{1,16}) joined the game", lambda m, ts: PlayerJoined(ts, m.group(1))),
+    (PlayerLeft, r"(\w{1,16}) left the game", lambda m, ts: PlayerLeft(ts, m.group(1))),
+    (ChatMessage, r"(?:\[Not Secure\] )?<([^>]+)> (.*)", lambda m, ts: ChatMessage(ts, m.group(1), m.group(2))),
+    (ServerStarting, r"Starting minecraft server version (\S+)", lambda m, ts: ServerStarting(ts, m.group(1))),
+    (PreparingLevel, r'Preparing level "(.+)"', lambda m, ts: PreparingLevel(ts, m.group(1))),
+    (SpawnProgress, r"Preparing spawn area: (\d+)%", lambda m, ts: SpawnProgress(ts, int(m.group(1)))),
+    (SpawnPrepared, r"Time elapsed: (\d+) ms", lambda m, ts: SpawnPrepared(ts, int(m.group(1)))),
+    (ServerDone, r"Done \(([\d.,]+)s\)!", lambda m, ts: ServerDone(ts, float(m.group(1).replace(",", ".")))),
+    (Overloaded, r"Can't keep up! Is the server overloaded\? Running (\d+)ms or (\d+) ticks behind",
+     lambda m, ts: Overloaded(ts, int(m.group(1)), int(m.group(2)))),
+    (ServerStopping, r"Stopping server", lambda m, ts: ServerStopping(ts)),
+    (SavingChunks, r"Saving chunks for level '(.+?)'", lambda m, ts: SavingChunks(ts, m.group(1))),
+    (ChunksSaved, r".*All (?:dimensions|chunks) are saved", lambda m, ts: ChunksSaved(ts)),
+]
+
+class LogEventParser:
+    """
+    Turns server output into typed events (the namedtuples above) for
+    whoever subscribed to them, so nobody has to re-match the text.
+
+    Each line's "[time] [thread/LEVEL]: " layout is matched once, then the
+    message only goes through the rules whose required literal it contains
+    (a plain substring check), so most lines cost one regex match. Stack
+    traces are collected into a single ServerException, sent once the trace
+    ends. More rules can be added with add_rule().
+    """
+
+    def __init__(self):
+        self._rules = []
+        self._subscribers = []
+        for kind, pattern, build in RULES:
+            self.add_rule(kind, pattern, build)
+        self.reset()
+
+    def add_rule(self, kind, pattern, build):
+        """
+        build(match, ts) returns the event (or None) for a message that
+        matches pattern from its start. Rules are tried in the order added.
+        """
+        compiled = re.compile(pattern)
+        literals = required_literals(pattern)
+        needle = max(literals, key=len) if literals else ""
+        self._rules.append((kind, needle, compiled.match, build))
+
+    def subscribe(self, callback, *kinds):
+        """callback(event) for events of the given kinds, or all of them."""
+        self._subscribers.append((callback, kinds))
+
+    def unsubscribe(self, callback):
+        self._subscribers = [s for s in self._subscribers if s[0] != callback]
+
+    def reset(self):
+        # Per run: a new server start begins with no trace or plugin in progress
+        self._header = None # (thread, level, message) of the last line with a layout
+        self._last = None # Line without a layout since then, e.g. "java.lang.Foo: ..."
+        self._exception = None
+        self._plugin = None
+
+    def _emit(self, event):
+        for callback, kinds in self._subscribers:
+            if not kinds or type(event) in kinds:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Log event subscriber failed on {type(event).__name__}: {e}")
+
+    def feed(self, line, ts=None):
+        """One line of output. Returns the events it completed."""
+        ts = ts or time.time()
+        events = []
+
+        if line.startswith(STACK_LINE):
+            if self._exception is None:
+                thread, level, message = self._header or (None, None, "")
+                # The exception line itself, if it came on its own after the header
+                stack = [self._last] if self._last is not None else []
+                self._exception = ServerException(ts, thread, level, message, stack)
+            self._exception.stack.append(line)
+            return events
+        if self._exception is not None:
+            events.append(self._exception)
+            self._exception = None
+
+        header = LAYOUT.match(line)
+        if header:
+            message = line[header.end():]
+            level = header.group(2) or header.group(4)
+            self._header = (header.group(3), level, message)
+            self._last = None
+            events.extend(self._match(message, ts))
+        else:
+            self._last = line
+
+        for event in events:
+            self._emit(event)
+        return events
+
+    def _match(self, message, ts):
+        events = []
+        if message.startswith("["):
+            step = PLUGIN_STEP.match(message)
+            if step:
+                events.extend(self._end_plugin(ts))
+                self._plugin = (ts, step.group(1), step.group(3), step.group(2))
+                return events
+        elif self._plugin is not None:
+            # Lines from the plugin itself start with [Name]; anything else means it is done
+            events.extend(self._end_plugin(ts))
+        for kind, needle, match, build in self._rules:
+            if needle in message:
+                found = match(message)
+                if found:
+                    event = build(found, ts)
+                    if event is not None:
+                        events.append(event)
+                    break
+        return events
+
+    def _end_plugin(self, ts):
+        if self._plugin is None:
+            return []
+        started, plugin, version, phase = self._plugin
+        self._plugin = None
+        return [PluginLoaded(ts, plugin, version, phase, ts - started)]
+
+    def flush(self, ts=None):
+        """Sends whatever is still open (a trace, a plugin load), e.g. when the process ends."""
+        ts = ts or time.time()
+        events = self._end_plugin(ts)
+        if self._exception is not None:
+            events.append(self._exception)
+            self._exception = None
+        for event in events:
+            self._emit(event)
+        return events
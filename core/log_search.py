@@ -0,0 +1,359 @@
+import bisect
+import datetime
+import glob
+import gzip
+import os
+import re
+import threading
+import time
+import zlib
+
+try:
+    import re._parser as sre_parse
+    from re._constants import LITERAL, SUBPATTERN, MAX_REPEAT, MIN_REPEAT
+except ImportError: # Python < 3.11
+    import sre_parse
+    from sre_constants import LITERAL, SUBPATTERN, MAX_REPEAT, MIN_REPEAT
+
+# "[12:34:56] [Server thread/INFO]: ..." (vanilla, Forge, Fabric) or "[12:34:56 INFO]: ..." (Paper)
+HEADER = re.compile(r"\[(\d\d):(\d\d):(\d\d)(?:\.\d+)?(?: ([A-Z]+))?\](?: \[([^\]/]+)/([A-Z]+)\])?")
+WORD = re.compile(r"\w+")
+LINE_TIME = re.compile(r"^\[(\d\d):(\d\d):(\d\d)", re.MULTILINE)
+STAMP = re.compile(r"^[\d.]+ ", re.MULTILINE)
+# Rotated server logs are named 2024-01-31-1.log.gz
+LOG_DATE = re.compile(r"(\d{4})-(\d\d)-(\d\d)")
+
+FILTER_BYTES = 4096
+FILTER_MASK = FILTER_BYTES * 8 - 1
+FILE_BLOCK = 64 * 1024
+
+
+def _bits(token, cache):
+    """Two bit positions per trigram of token, cached since log tokens repeat endlessly."""
+    bits = cache.get(token)
+    if bits is None:
+        bits = []
+        for i in range(len(token) - 2):
+            h = zlib.crc32(token[i:i + 3].encode("utf-8"))
+            bits.append(h & FILTER_MASK)
+            bits.append((h >> 15) & FILTER_MASK)
+        if len(cache) > 500000:
+            cache.clear()
+        cache[token] = bits
+    return bits
+
+def block_filter(text, cache=None, stamped=False):
+    """
+    Bloom filter over the trigrams of every word in a block of text, case
+    folded. A query can only match inside the block if all of its own
+    trigrams are set, so most blocks are ruled out without reading them.
+    stamped: lines start with a spool timestamp, which is left out.
+    """
+    cache = {} if cache is None else cache
+    if stamped:
+        text = STAMP.sub("", text)
+    bits = set()
+    for token in set(WORD.findall(text.lower())):
+        bits.update(cache.get(token) or _bits(token, cache))
+    bloom = bytearray(FILTER_BYTES)
+    for bit in bits:
+        bloom[bit >> 3] |= 1 << (bit & 7)
+    return bytes(bloom)
+
+def required_literals(pattern, flags=0):
+    """
+    Plain strings every match of pattern must contain, e.g. "Can't keep up"
+    for r"Can't keep up!.*behind". Alternations and optional parts are left
+    out, so this can come back empty; it never asks for too much.
+    """
+    literals = []
+
+    def walk(items):
+        run = []
+        for op, av in items:
+            if op == LITERAL:
+                run.append(chr(av))
+                continue
+            if run:
+                literals.append("".join(run))
+                run = []
+            if op == SUBPATTERN:
+                walk(av[-1])
+            elif op in (MAX_REPEAT, MIN_REPEAT) and av[0] >= 1:
+                walk(av[2])
+        if run:
+            literals.append("".join(run))
+
+    try:
+        walk(sre_parse.parse(pattern, flags))
+    except Exception:
+        return []
+    return literals
+
+def query_bits(literals, cache):
+    bits = set()
+    for literal in literals:
+        for token in WORD.findall(literal.lower()):
+            bits.update(_bits(token, cache))
+    return bits
+
+def might_match(bloom, bits):
+    for bit in bits:
+        if not bloom[bit >> 3] & (1 << (bit & 7)):
+            return False
+    return True
+
+
+class LogSearch:
+    """
+    Search over a server's console history (its LogSpool, which holds
+    everything the in-memory buffer does and more) or its logs/ folder.
+
+    Every block that is read gets a trigram filter; closed spool segments
+    get theirs when they are compressed, and keep them next to the segment.
+    Later queries only open the blocks whose filter allows a match, so a
+    search over a GB of history reads a handful of blocks. Hits are handed to
+    on_hits in batches as they are found, oldest first.
+    """
+
+    def __init__(self):
+        # ("segment", path) -> [bloom per block], ("active", path) -> {offset: bloom},
+        # ("file", path) -> ((size, mtime), [bloom per chunk])
+        self._filters = {}
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    # --- Queries ---
+
+    def search(self, source, query, regex=False, ignore_case=True, level=None, thread=None,
+               start=None, end=None, on_hits=None, check=None, max_results=10000):
+        """
+        source is a LogSpool or the path of a logs/ folder. level ("INFO",
+        "WARN", "ERROR"...) and thread (substring) are matched against the line
+        header; start/end are unix times. Returns the hits as
+        "YYYY-MM-DD HH:MM:SS  line" strings (also passed to on_hits in batches).
+        check() is called between blocks and may raise to stop.
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        pattern = query if regex else re.escape(query)
+        matcher = re.compile(pattern, flags)
+        literals = required_literals(pattern, flags)
+        # An inline (?i) counts too, or the literal check below would be case sensitive
+        ignore_case = bool(matcher.flags & re.IGNORECASE)
+        with self._lock:
+            bits = query_bits(literals, self._tokens)
+        if ignore_case:
+            literals = [l.lower() for l in literals]
+        thread = thread.lower() if thread else None
+
+        hits, batch = [], []
+        last_emit = time.monotonic()
+        blocks = self._spool_blocks(source, start, end) if hasattr(source, "read_range") else self._file_blocks(source, start, end)
+
+        for read, bloom, remember, stamped, day in blocks:
+            if check:
+                check()
+            if bloom is not None and not might_match(bloom, bits):
+                continue
+            text = read()
+            if text is None:
+                continue
+            if bloom is None:
+                with self._lock:
+                    remember(block_filter(text, self._tokens, stamped))
+            folded = text.lower() if ignore_case else text
+            if any(l not in folded for l in literals):
+                continue
+
+            headers = None
+            for pos, line in self._candidate_lines(text, folded, literals):
+                if stamped:
+                    stamp, _, line = line.partition(" ")
+                    try:
+                        ts = float(stamp)
+                    except ValueError:
+                        continue
+                else:
+                    # Lines without a header (stack traces) take the time of the last one above
+                    if headers is None:
+                        headers = [(m.start(), day + int(m.group(1)) * 3600 + int(m.group(2)) * 60 + int(m.group(3)))
+                                   for m in LINE_TIME.finditer(text)]
+                    i = bisect.bisect_right(headers, (pos, float("inf"))) - 1
+                    ts = headers[i][1] if i >= 0 else None
+                if not matcher.search(line):
+                    continue
+                header = HEADER.match(line)
+                if level and not (header and level in (header.group(4), header.group(6))):
+                    continue
+                if thread and not (header and header.group(5) and thread in header.group(5).lower()):
+                    continue
+                if ts is not None and ((start is not None and ts < start) or (end is not None and ts > end)):
+                    continue
+                when = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts is not None else "????-??-?? ??:??:??"
+                batch.append(f"{when}  {line}")
+
+            # The first hits go out right away, later ones in batches
+            if batch and (not hits or len(batch) >= 500 or time.monotonic() - last_emit > 0.1):
+                hits.extend(batch)
+                if on_hits:
+                    on_hits(batch)
+                batch, last_emit = [], time.monotonic()
+            if len(hits) + len(batch) >= max_results:
+                break
+
+        hits.extend(batch)
+        if batch and on_hits:
+            on_hits(batch)
+        return hits[:max_results]
+
+    @staticmethod
+    def _candidate_lines(text, folded, literals):
+        """
+        (offset, line) for the lines that can match: the ones holding the
+        block's rarest required literal, found with str.find instead of
+        running the regex on every line. All lines when there is no literal.
+        """
+        if not literals or len(folded) != len(text):
+            pos = 0
+            for line in text.split("\n"):
+                yield pos, line
+                pos += len(line) + 1
+            return
+        literal = min(literals, key=folded.count)
+        found = folded.find(literal)
+        while found >= 0:
+            line_start = text.rfind("\n", 0, found) + 1
+            line_end = text.find("\n", found)
+            if line_end < 0:
+                line_end = len(text)
+            yield line_start, text[line_start:line_end]
+            found = folded.find(literal, line_end)
+
+    # --- Sources: each block is (read, bloom or None, remember(bloom), stamped, day) ---
+
+    def _spool_blocks(self, spool, start, end):
+        blocks = spool.blocks()
+        # Active segments that have since been compressed
+        active = {("active", b[1]) for b in blocks if not b[2]}
+        # _filters is shared with searches running on other workers; never held across a yield
+        with self._lock:
+            for key in [k for k in self._filters if k[0] == "active" and k not in active and k[1].startswith(spool.directory)]:
+                del self._filters[key]
+        for i, (segment, path, compressed, index, count, ts, offset, stop) in enumerate(blocks):
+            # A block runs until the next one starts
+            upper = blocks[i + 1][5] if i + 1 < len(blocks) else None
+            if end is not None and ts > end:
+                return
+            if start is not None and upper is not None and upper < start:
+                continue
+
+            read = lambda p=path, c=compressed, o=offset, s=stop: spool.read_block(p, c, o, s)
+            if compressed:
+                with self._lock:
+                    filters = self._segment_filters(spool, segment, count)
+                    bloom = filters[index]
+                remember = lambda bloom, s=segment, n=count, j=index: self._remember_segment(spool, s, n, j, bloom)
+                yield read, bloom, remember, True, None
+            elif stop is not None:
+                # Finished block of the active segment: its content won't change
+                with self._lock:
+                    filters = self._filters.setdefault(("active", path), {})
+                    bloom = filters.get(offset)
+                yield read, bloom, lambda bloom, f=filters, o=offset: f.__setitem__(o, bloom), True, None
+            else:
+                yield read, None, lambda bloom: None, True, None
+
+    def _segment_filters(self, spool, segment, count):
+        # Called with self._lock held
+        key = ("segment", spool.filter_path(segment))
+        filters = self._filters.get(key)
+        if filters is None or len(filters) != count:
+            filters = [None] * count
+            try:
+                with open(spool.filter_path(segment), "rb") as f:
+                    data = f.read()
+                if len(data) == count * FILTER_BYTES:
+                    filters = [data[i:i + FILTER_BYTES] for i in range(0, len(data), FILTER_BYTES)]
+            except OSError:
+                pass
+            self._filters[key] = filters
+        return filters
+
+    def _remember_segment(self, spool, segment, count, index, bloom):
+        # remember() callbacks run with self._lock held
+        key = ("segment", spool.filter_path(segment))
+        filters = self._filters.setdefault(key, [None] * count)
+        filters[index] = bloom
+        if all(f is not None for f in filters):
+            # Compressed before filters existed: keep them now that they are built
+            try:
+                with open(spool.filter_path(segment), "wb") as f:
+                    f.write(b"".join(filters))
+            except OSError as e:
+                print(f"Could not save search filters for {segment}: {e}")
+
+    def _file_blocks(self, folder, start, end):
+        paths = sorted(glob.glob(os.path.join(folder, "*.log.gz")))
+        latest = os.path.join(folder, "latest.log")
+        if os.path.exists(latest):
+            paths.append(latest)
+
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            match = LOG_DATE.search(os.path.basename(path))
+            if match:
+                day = datetime.datetime(*map(int, match.groups())).timestamp()
+            else:
+                day = datetime.datetime.fromtimestamp(st.st_mtime).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+            # One file is one day of logs
+            if (start is not None and day + 86400 < start) or (end is not None and day > end):
+                continue
+
+            # Read (and decompress) the file once, and only if some block needs it
+            loaded = {}
+            def chunks(p=path, loaded=loaded):
+                if "chunks" not in loaded:
+                    loaded["chunks"] = self._file_chunks(p)
+                return loaded["chunks"]
+
+            # latest.log keeps growing: its filters only hold while it is unchanged
+            stamp = (st.st_size, st.st_mtime)
+            with self._lock:
+                cached = self._filters.get(("file", path))
+            if cached and cached[0] == stamp:
+                filters = cached[1]
+            else:
+                filters = [None] * len(chunks()) # Reads the file: outside the lock
+                with self._lock:
+                    self._filters[("file", path)] = (stamp, filters)
+            for i in range(len(filters)):
+                read = lambda j=i, c=chunks: c()[j] if j < len(c()) else None
+                with self._lock:
+                    bloom = filters[i]
+                yield read, bloom, (lambda bloom, f=filters, j=i: f.__setitem__(j, bloom)), False, day
+
+    @staticmethod
+    def _file_chunks(path):
+        """The file's text cut into ~FILE_BLOCK pieces at line ends."""
+        try:
+            if path.endswith(".gz"):
+                with gzip.open(path, "rb") as f:
+                    data = f.read()
+            else:
+                with open(path, "rb") as f:
+                    data = f.read()
+        except (OSError, EOFError) as e:
+            print(f"Could not read {path}: {e}")
+            return []
+        chunks, pos = [], 0
+        while pos < len(data):
+            cut = data.find(b"\n", pos + FILE_BLOCK)
+            cut = len(data) if cut < 0 else cut + 1
+            chunks.append(data[pos:cut].decode("utf-8", errors="replace").rstrip("\n"))
+            pos = cut
+        return chunks
+
+log_search = LogSearch()
@@ -0,0 +1,299 @@
+import bisect
+import glob
+import gzip
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+# Sparse index entry: first timestamp in the block, offset in the plain
+# segment, offset of the block's gzip member once compressed
+INDEX_ENTRY = struct.Struct("<dQQ")
+SEGMENT_NAME = re.compile(r"seg-(\d+)\.log(\.gz)?$")
+
+class LogSpool:
+    """
+    Everything a server printed, plus the manager's own notes, on disk.
+
+    Lines are written as "<unix time> <text>" to seg-NNNNNN.log in the
+    spool folder. Past segment_bytes the segment is closed and compressed on
+    a background thread, one gzip member per index block, so any block can
+    be decompressed on its own. Each segment's .idx file holds a sparse
+    timestamp -> offset entry every index_every bytes: a time range query
+    bisects to the block it starts in and reads from there, it never scans
+    from the top. Only the newest keep_segments segments are kept.
+    """
+
+    def __init__(self, directory, segment_bytes=8 * 1024 * 1024, index_every=64 * 1024, keep_segments=32):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.index_every = index_every
+        self.keep_segments = keep_segments
+
+        self._lock = threading.RLock()
+        self._file = None
+        self._index_file = None
+        self._segment = 0
+        self._size = 0
+        self._last_indexed = None
+        self._compressing = set()
+        self._failed = False
+
+    # --- Segments ---
+
+    def _path(self, segment, compressed=False):
+        return os.path.join(self.directory, f"seg-{segment:06d}.log" + (".gz" if compressed else ""))
+
+    def _index_path(self, segment):
+        return os.path.join(self.directory, f"seg-{segment:06d}.idx")
+
+    def filter_path(self, segment):
+        # Search filters for a compressed segment, one per index block (see core.log_search)
+        return os.path.join(self.directory, f"seg-{segment:06d}.bloom")
+
+    def segments(self):
+        """[(number, path, compressed)] oldest first."""
+        found = {}
+        for path in glob.glob(os.path.join(self.directory, "seg-*.log*")):
+            match = SEGMENT_NAME.search(os.path.basename(path))
+            if match:
+                number, compressed = int(match.group(1)), bool(match.group(2))
+                # Mid-compression both exist; the plain one is complete
+                if number not in found or not compressed:
+                    found[number] = (number, path, compressed)
+        return [found[n] for n in sorted(found)]
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.segments()
+        plain = [s for s in existing if not s[2]]
+        # Continue the newest plain segment; older plain ones were never compressed
+        for number, _, _ in plain[:-1]:
+            self._compress_async(number)
+        if plain and plain[-1][0] == existing[-1][0]:
+            self._segment = plain[-1][0]
+        else:
+            self._segment = existing[-1][0] + 1 if existing else 1
+        self._start_segment()
+
+    def _start_segment(self):
+        path = self._path(self._segment)
+        self._file = open(path, "ab", buffering=64 * 1024)
+        self._index_file = open(self._index_path(self._segment), "ab")
+        self._size = self._file.tell()
+        # Resuming a segment: the next line starts a new block
+        self._last_indexed = None
+
+    def _rotate(self):
+        self._close_files()
+        finished = self._segment
+        self._segment += 1
+        self._start_segment()
+        self._compress_async(finished)
+        self._prune()
+
+    def _close_files(self):
+        if self._file:
+            self._file.close()
+            self._index_file.close()
+            self._file = self._index_file = None
+
+    # --- Writing ---
+
+    def write(self, line, ts=None):
+        if "\n" in line:
+            # One line per record, or the timestamp prefix would be lost
+            for part in line.split("\n"):
+                self.write(part, ts)
+            return
+        ts = ts or time.time()
+        data = f"{ts:.3f} {line}\n".encode("utf-8", errors="replace")
+        with self._lock:
+            if self._failed:
+                return
+            try:
+                if self._file is None:
+                    self._open()
+                if self._size >= self.segment_bytes:
+                    self._rotate()
+                if self._last_indexed is None or self._size - self._last_indexed >= self.index_every:
+                    self._index_file.write(INDEX_ENTRY.pack(ts, self._size, self._size))
+                    self._last_indexed = self._size
+                self._file.write(data)
+                self._size += len(data)
+            except OSError as e:
+                # The console keeps working; only the on-disk copy stops
+                print(f"Could not write console spool in {self.directory}: {e}")
+                self._failed = True
+
+    def flush(self):
+        with self._lock:
+            if self._file:
+                try:
+                    self._file.flush()
+                    self._index_file.flush()
+                except OSError as e:
+                    print(f"Could not flush console spool in {self.directory}: {e}")
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+
+    # --- Compression / retention ---
+
+    def _compress_async(self, segment):
+        with self._lock:
+            if segment in self._compressing:
+                return
+            self._compressing.add(segment)
+        threading.Thread(target=self._compress, args=(segment,), name="spool-gzip", daemon=True).start()
+
+    def _compress(self, segment):
+        from core.log_search import block_filter
+        tokens = {}
+        try:
+            entries = self._read_index(segment)
+            with open(self._path(segment), "rb") as f:
+                raw = f.read()
+            offsets = [e[1] for e in entries] or [0]
+            tmp = self._path(segment, compressed=True) + ".tmp"
+            new_entries, filters = [], []
+            with open(tmp, "wb") as out:
+                for i, start in enumerate(offsets):
+                    end = offsets[i + 1] if i + 1 < len(offsets) else len(raw)
+                    ts = entries[i][0] if entries else 0.0
+                    new_entries.append(INDEX_ENTRY.pack(ts, start, out.tell()))
+                    out.write(gzip.compress(raw[start:end], compresslevel=6))
+                    filters.append(block_filter(raw[start:end].decode("utf-8", errors="replace"), tokens, stamped=True))
+            with open(self._index_path(segment) + ".tmp", "wb") as f:
+                f.write(b"".join(new_entries))
+            with open(self.filter_path(segment), "wb") as f:
+                f.write(b"".join(filters))
+            # The .gz only counts once complete; the plain file goes last
+            os.replace(tmp, self._path(segment, compressed=True))
+            os.replace(self._index_path(segment) + ".tmp", self._index_path(segment))
+            os.remove(self._path(segment))
+        except OSError as e:
+            print(f"Could not compress log segment {segment}: {e}")
+        finally:
+            with self._lock:
+                self._compressing.discard(segment)
+
+    def _prune(self):
+        for number, path, _ in self.segments()[:-self.keep_segments]:
+            if number in self._compressing:
+                continue
+            for p in (path, self._index_path(number), self.filter_path(number)):
+                try: os.remove(p)
+                except OSError: pass
+
+    # --- Reading ---
+
+    def _read_index(self, segment):
+        try:
+            with open(self._index_path(segment), "rb") as f:
+                data = f.read()
+        except OSError:
+            return []
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return [INDEX_ENTRY.unpack_from(data, i) for i in range(0, usable, INDEX_ENTRY.size)]
+
+    def read_range(self, start=None, end=None):
+        """
+        Yields (ts, line) for lines received between start and end (unix
+        times, either may be None), oldest first.
+        """
+        self.flush()
+        segments = self.segments()
+        indexes = [self._read_index(number) for number, _, _ in segments]
+
+        # Skip whole segments that end before start: the next one's first entry says so
+        first = 0
+        if start is not None:
+            for i in range(len(segments) - 1):
+                if indexes[i + 1] and indexes[i + 1][0][0] <= start:
+                    first = i + 1
+
+        for (number, path, compressed), index in zip(segments[first:], indexes[first:]):
+            if end is not None and index and index[0][0] > end:
+                return
+            # Last block starting at or before start
+            block = 0
+            if start is not None and index:
+                block = max(0, bisect.bisect_right([e[0] for e in index], start) - 1)
+            offset = index[block][2 if compressed else 1] if index else 0
+            for ts, line in self._read_segment(path, compressed, offset):
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts > end:
+                    return
+                yield ts, line
+
+    def blocks(self):
+        """
+        Every index block, oldest first, as (segment, path, compressed,
+        index in segment, blocks in segment, first ts, offset, end offset).
+        End is None for the block still being written.
+        """
+        self.flush()
+        out = []
+        for number, path, compressed in self.segments():
+            index = self._read_index(number)
+            column = 2 if compressed else 1
+            for i, entry in enumerate(index):
+                stop = index[i + 1][column] if i + 1 < len(index) else None
+                if stop is None and (compressed or number != self._segment):
+                    stop = -1 # Up to the end of a finished file
+                out.append((number, path, compressed, i, len(index), entry[0], entry[column], stop))
+        return out
+
+    @staticmethod
+    def read_block(path, compressed, offset, end):
+        """Text of one block (whole lines, without the trailing newline), or None if it is gone."""
+        try:
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read() if end is None or end < 0 else f.read(end - offset)
+        except OSError:
+            return None
+        if compressed:
+            try:
+                data = gzip.decompress(data)
+            except (OSError, EOFError, zlib.error):
+                return None
+        else:
+            # The active segment may end in a half-written line
+            data = data[:data.rfind(b"\n") + 1]
+        return data.decode("utf-8", errors="replace").rstrip("\n")
+
+    @staticmethod
+    def _read_segment(path, compressed, offset):
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return
+        with f:
+            f.seek(offset)
+            stream = gzip.GzipFile(fileobj=f) if compressed else f
+            for raw in stream:
+                if not raw.endswith(b"\n"):
+                    return # Still being written
+                stamp, _, text = raw.rstrip(b"\n").partition(b" ")
+                try:
+                    ts = float(stamp)
+                except ValueError:
+                    continue
+                yield ts, text.decode("utf-8", errors="replace")
+
+    def tail(self, n):
+        """Last n lines as (ts, line), reading only the newest segments."""
+        self.flush()
+        out = []
+        for number, path, compressed in reversed(self.segments()):
+            lines = list(self._read_segment(path, compressed, 0))
+            out = lines[-(n - len(out)):] + out if len(out) < n else out
+            if len(out) >= n:
+                break
+        return out[-n:]
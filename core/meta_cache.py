@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from core.config_manager import config_manager
+
+class MetadataCache:
+    """
+    TTL cache for upstream JSON documents (version manifests, build lists).
+
+    Entries live in memory (parsed, shared between callers) and on disk under
+    <data_path>/cache/meta so they survive restarts. Once an entry is older
+    than its TTL it is revalidated with If-None-Match / If-Modified-Since;
+    if upstream can't be reached the stale copy is served instead.
+    """
+
+    def __init__(self, cache_dir=None):
+        self._cache_dir = cache_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self):
+        if self._cache_dir:
+            return self._cache_dir
+        data_path = config_manager.get_data_path()
+        if not data_path:
+            return None # Memory only until a data path is configured
+        return os.path.join(data_path, "cache", "meta")
+
+    def _entry_path(self, url):
+        cache_dir = self.cache_dir
+        if not cache_dir:
+            return None
+        return os.path.join(cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _lookup(self, url):
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is not None:
+            return entry
+
+        path = self._entry_path(url)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except Exception:
+            return None
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def _store(self, url, entry):
+        with self._lock:
+            self._entries[url] = entry
+        path = self._entry_path(url)
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Could not write metadata cache for {url}: {e}")
+
+    def peek(self, url):
+        """Cached body regardless of age, or None."""
+        entry = self._lookup(url)
+        return entry["body"] if entry else None
+
+    def get_json(self, url, fetch, ttl):
+        """
+        fetch(url, headers) -> requests.Response. Returns the parsed body.
+        """
+        entry = self._lookup(url)
+        now = time.time()
+        if entry and now - entry["fetched_at"] < ttl:
+            return entry["body"]
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            r = fetch(url, headers=headers)
+            if r.status_code == 304 and entry:
+                entry = dict(entry, fetched_at=now)
+                self._store(url, entry)
+                return entry["body"]
+            r.raise_for_status()
+            body = r.json()
+        except Exception as e:
+            if entry:
+                print(f"Using cached copy of {url} ({e})")
+                return entry["body"]
+            raise
+
+        self._store(url, {
+            "url": url,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "fetched_at": now,
+            "body": body,
+        })
+        return body
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
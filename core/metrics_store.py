@@ -0,0 +1,197 @@
+import mmap
+import os
+import shutil
+import struct
+import threading
+import time
+from core.config_manager import config_manager
+
+MAGIC = b"MCTS"
+VERSION = 2 # 1 had float32 sums, which drift at RSS-sized values
+HEADER = struct.Struct("<4sHxxq") # magic, version, newest second written
+HEADER_SIZE = 64
+RECORD = struct.Struct("<IIddd") # bucket start (epoch seconds), count, sum, min, max
+
+# (seconds per bucket, buckets kept): 1 s for an hour, 1 min for a week, 1 h for a year
+RESOLUTIONS = ((1, 3600), (60, 7 * 24 * 60), (3600, 366 * 24))
+
+def _ring_offsets():
+    offsets, offset = [], HEADER_SIZE
+    for step, slots in RESOLUTIONS:
+        offsets.append(offset)
+        offset += slots * RECORD.size
+    return offsets, offset
+
+RING_OFFSETS, FILE_SIZE = _ring_offsets()
+
+class Series:
+    """
+    One metric of one server in a fixed-size file: a header, then one ring
+    of RECORDs per resolution. A bucket's slot is (start // step) % slots,
+    so writing and reading need no head pointers; a slot whose start isn't
+    the bucket asked for is an old lap and counts as empty. Every sample
+    updates all three rings, so the rollups are always current. The file
+    is memory-mapped, so reads only touch the pages of the range asked for.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        try:
+            header = self.file.read(HEADER.size)
+            magic, version, _ = HEADER.unpack(header.ljust(HEADER.size, b"\0"))
+            if not header or (magic == MAGIC and version != VERSION):
+                # Earlier layout: its records can't be reused, start the series over
+                self.file.truncate(0)
+                self.file.seek(0)
+                self.file.write(HEADER.pack(MAGIC, VERSION, 0))
+            elif magic != MAGIC:
+                raise ValueError(f"{path} is not a metrics series")
+            if os.fstat(self.file.fileno()).st_size < FILE_SIZE:
+                self.file.truncate(FILE_SIZE) # Sparse where the OS allows: unused slots cost nothing
+            self.map = mmap.mmap(self.file.fileno(), FILE_SIZE)
+        except Exception:
+            self.file.close()
+            raise
+        self.last_ts = HEADER.unpack_from(self.map, 0)[2]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def add(self, ts, value):
+        """One sample at ts (whole seconds). Samples not newer than the last are ignored."""
+        ts = int(ts)
+        if ts <= self.last_ts:
+            return False
+        value = float(value)
+        for (step, slots), base in zip(RESOLUTIONS, RING_OFFSETS):
+            bucket = ts - ts % step
+            offset = base + (bucket // step) % slots * RECORD.size
+            start, count, total, low, high = RECORD.unpack_from(self.map, offset)
+            if start != bucket:
+                RECORD.pack_into(self.map, offset, bucket, 1, value, value, value)
+            else:
+                RECORD.pack_into(self.map, offset, bucket, count + 1, total + value, min(low, value), max(high, value))
+        self.last_ts = ts
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, ts)
+        return True
+
+    def resolution(self, start, now=None):
+        """Finest step whose ring still reaches back to start."""
+        now = max(now or time.time(), self.last_ts)
+        for step, slots in RESOLUTIONS:
+            if now - step * slots < start:
+                return step
+        return RESOLUTIONS[-1][0]
+
+    def query(self, start, end, step=None):
+        """[(bucket start, avg, min, max)] of the buckets overlapping start..end, oldest first."""
+        step = step or self.resolution(start)
+        index = [s for s, _ in RESOLUTIONS].index(step)
+        slots, base = RESOLUTIONS[index][1], RING_OFFSETS[index]
+        first = int(start) // step
+        last = min(int(end), self.last_ts) // step
+        if last < first:
+            return []
+        first = max(first, last - slots + 1) # Older buckets have been overwritten
+        # The slots from first to last, in time order: at most two slices of the ring
+        begin = first % slots
+        count = last - first + 1
+        head = min(count, slots - begin)
+        chunks = [self.map[base + begin * RECORD.size:base + (begin + head) * RECORD.size]]
+        if count > head:
+            chunks.append(self.map[base:base + (count - head) * RECORD.size])
+        lo, hi = first * step, last * step
+        return [(bucket, total / n, low, high)
+                for chunk in chunks
+                for bucket, n, total, low, high in RECORD.iter_unpack(chunk)
+                if n and lo <= bucket <= hi]
+
+
+class MetricsStore:
+    """
+    Server metrics that outlive the app: <data_path>/metrics/<server id>/<metric>.ts,
+    one Series per metric (cpu, rss, threads, players, startup...). About
+    700 KB per metric however long it runs.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+        self._series = {} # path -> Series
+        self._lock = threading.Lock()
+
+    @property
+    def root(self):
+        if self._root:
+            return self._root
+        data_path = config_manager.get_data_path()
+        if not data_path:
+            return None # Nothing is kept until a data path is configured
+        return os.path.join(data_path, "metrics")
+
+    def _path(self, server_id, metric):
+        root = self.root
+        return os.path.join(root, str(server_id), f"{metric}.ts") if root else None
+
+    def _get(self, server_id, metric, create):
+        path = self._path(server_id, metric)
+        if not path:
+            return None
+        series = self._series.get(path)
+        if series is None:
+            if not create and not os.path.exists(path):
+                return None
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            series = self._series[path] = Series(path)
+        return series
+
+    def record(self, server_id, metric, value, ts=None):
+        with self._lock:
+            try:
+                series = self._get(server_id, metric, create=True)
+                return series.add(ts or time.time(), value) if series else False
+            except (OSError, ValueError) as e:
+                print(f"Could not record {metric} for server {server_id}: {e}")
+                return False
+
+    def query(self, server_id, metric, start, end=None, step=None):
+        """
+        [(ts, avg, min, max)] between start and end (epoch seconds), at the
+        finest resolution that still covers start unless step (1, 60 or
+        3600) is given.
+        """
+        with self._lock:
+            try:
+                series = self._get(server_id, metric, create=False)
+            except (OSError, ValueError) as e:
+                print(f"Could not read {metric} for server {server_id}: {e}")
+                return []
+            return series.query(start, end or time.time(), step) if series else []
+
+    def metrics(self, server_id):
+        root = self.root
+        try:
+            names = os.listdir(os.path.join(root, str(server_id))) if root else []
+        except OSError:
+            return []
+        return sorted(name[:-3] for name in names if name.endswith(".ts"))
+
+    def delete(self, server_id):
+        """Drops a server's metrics (ids can be reused after a delete)."""
+        root = self.root
+        if not root:
+            return
+        folder = os.path.join(root, str(server_id))
+        with self._lock:
+            for path in [p for p in self._series if os.path.dirname(p) == folder]:
+                self._series.pop(path).close()
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def close(self):
+        with self._lock:
+            for series in self._series.values():
+                series.close()
+            self._series.clear()
+
+metrics_store = MetricsStore()
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+from core.downloader import UPSTREAM_OF_HOST, downloader as default_downloader
+from core.jar_store import jar_store
+
+# Paths that are jars rather than JSON documents
+BINARY_PATH = re.compile(r"(\.jar|/download|/server/jar)$")
+
+class MirrorServer:
+    """
+    Serves upstream metadata and jars to other instances on the LAN.
+
+    Every upstream host is mirrored under /<host> (/api.papermc.io/v2/projects/paper,
+    /piston-meta.mojang.com/mc/game/version_manifest.json, ...), so a client
+    only needs "[MIRRORS] all = http://<this host>:<port>" and each path
+    maps back to exactly one upstream URL. Hosts not in UPSTREAMS get a 404.
+    Answers come from this instance's metadata cache and jar store; misses
+    are fetched upstream once and kept (unless passthrough is off, e.g. on
+    an air-gapped node that was seeded beforehand). Since passthrough
+    fetches on the caller's behalf, it binds localhost unless told
+    otherwise (0.0.0.0 to serve the LAN). Jars support HEAD and Range, so
+    clients still use resumable and segmented downloads against it.
+    """
+
+    def __init__(self, downloader=None, host="127.0.0.1", port=8765, passthrough=True):
+        self.downloader = downloader or default_downloader
+        self.host = host
+        self.port = port
+        self.passthrough = passthrough
+        self._server = None
+
+    def start(self):
+        """Starts serving on a background thread. Returns the bound port."""
+        mirror = self
+
+        class Handler(MirrorRequestHandler):
+            server_mirror = mirror
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_port
+        threading.Thread(target=self._server.serve_forever, name="mirror", daemon=True).start()
+        print(f"Mirror serving on {self.host}:{self.port}")
+        return self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # --- Seeding ---
+
+    def seed(self, pairs, log=print):
+        """
+        Pulls everything needed to install the given (loader, version) pairs
+        into the caches, e.g. before a node is taken offline.
+        """
+        self.downloader.prefetch_versions()
+        for loader_type, version in pairs:
+            build = self.downloader.resolve_build(loader_type, version)
+            if not build:
+                log(f"Could not resolve {loader_type} {version}")
+                continue
+            if build.get("installer_url"):
+                from core.loader_installer import loader_installer
+                loader_installer.fetch_installer(self.downloader, build)
+                if build["loader"] == "fabric":
+                    self.seed([("vanilla", version)], log)
+            elif not self.downloader.fetch_build(build):
+                log(f"Could not download {build['key']}")
+                continue
+            log(f"Seeded {build['key']}")
+
+    # --- Lookups ---
+
+    @staticmethod
+    def upstream_url(path, query=""):
+        """The upstream URL a mirror path stands for, or None if it isn't a mirrored host."""
+        host, _, rest = path.lstrip("/").partition("/")
+        if host not in UPSTREAM_OF_HOST:
+            return None
+        query = f"?{query}" if query else ""
+        return f"https://{host}/{rest}{query}"
+
+    def find_jar(self, url):
+        sha = jar_store.find_url(url)
+        if sha:
+            return jar_store.object_path(sha)
+        if not self.passthrough:
+            return None
+        # Concurrent requests for the same jar wait for one download
+        return self.downloader._single_flight(("mirror", url), lambda: self._fetch_jar(url))
+
+    def _fetch_jar(self, url):
+        sha = jar_store.find_url(url)
+        if not sha:
+            staging = jar_store.staging_path("mirror-" + hashlib.sha1(url.encode("utf-8")).hexdigest() + ".jar")
+            if not self.downloader.download_jar(url, staging):
+                return None
+            sha = jar_store.add_file(staging, url=url)
+        return jar_store.object_path(sha)
+
+    def find_json(self, url):
+        if not self.passthrough:
+            return self.downloader.cache.peek(url)
+        try:
+            # Revalidates once past its TTL, serves the stale copy if upstream is down
+            return self.downloader._get_json(url)
+        except Exception:
+            return None
+
+
+class MirrorRequestHandler(BaseHTTPRequestHandler):
+    server_mirror = None
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.handle_request(head=True)
+
+    def do_GET(self):
+        self.handle_request(head=False)
+
+    def handle_request(self, head):
+        mirror = self.server_mirror
+        parts = urlsplit(self.path)
+        path = parts.path
+        if path in ("", "/"):
+            return self.send_json({"hosts": sorted(UPSTREAM_OF_HOST)}, head)
+
+        url = mirror.upstream_url(path, parts.query)
+        if not url:
+            return self.send_error(404, "Unknown upstream")
+        try:
+            if BINARY_PATH.search(path):
+                jar = mirror.find_jar(url)
+                if jar:
+                    return self.send_file(jar, head)
+            else:
+                body = mirror.find_json(url)
+                if body is not None:
+                    return self.send_json(body, head)
+        except Exception as e:
+            print(f"Mirror error for {path}: {e}")
+            return self.send_error(502, str(e))
+        self.send_error(404, "Not in mirror")
+
+    def send_json(self, body, head):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    def send_file(self, path, head):
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        match = re.match(r"bytes=(\d*)-(\d*)$", self.headers.get("Range", ""))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(0, size - int(match.group(2))) # Suffix range: last N bytes
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "application/java-archive")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if head:
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining:
+                chunk = f.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    # python -m core.mirror_server [--host 0.0.0.0] [--port 8765] [--offline] [--seed paper:1.20.4 ...]
+    import argparse
+    parser = argparse.ArgumentParser(description="Serve upstream metadata and jars over the LAN.")
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 to serve the LAN")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--offline", action="store_true", help="only serve what is already cached")
+    parser.add_argument("--seed", nargs="*", default=[], metavar="LOADER:VERSION")
+    args = parser.parse_args()
+
+    server = MirrorServer(host=args.host, port=args.port, passthrough=not args.offline)
+    if args.seed:
+        server.seed([tuple(s.split(":", 1)) for s in args.seed])
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,223 @@
+import os
+import threading
+import time
+from array import array
+from PySide6.QtCore import QObject, Signal
+
+FIELDS = ("ts", "cpu", "rss", "swap", "threads", "read_bytes", "write_bytes", "read_rate", "write_rate")
+
+class SampleRing:
+    """The last capacity samples of one process, one array('d') column per field."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = {name: array("d", bytes(8 * capacity)) for name in FIELDS}
+        self.count = 0 # Samples ever written; the next one goes to count % capacity
+
+    def append(self, values):
+        i = self.count % self.capacity
+        for name, value in zip(FIELDS, values):
+            self.columns[name][i] = value
+        self.count += 1
+
+    def latest(self):
+        if not self.count:
+            return None
+        i = (self.count - 1) % self.capacity
+        return {name: column[i] for name, column in self.columns.items()}
+
+    def history(self, field, n=None):
+        """Up to n newest values of field, oldest first."""
+        n = min(self.count, self.capacity, n or self.capacity)
+        column = self.columns[field]
+        end = self.count % self.capacity
+        if n <= end:
+            return column[end - n:end].tolist()
+        return column[self.capacity - (n - end):].tolist() + column[:end].tolist()
+
+
+class _Watched:
+    """Open /proc files of one pid, re-read in place with pread."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        base = f"/proc/{pid}/"
+        self.stat = os.open(base + "stat", os.O_RDONLY)
+        self.status = os.open(base + "status", os.O_RDONLY)
+        try:
+            self.io = os.open(base + "io", os.O_RDONLY)
+        except OSError:
+            self.io = None # Not ours to read (or no task I/O accounting): no I/O figures
+        self.last = None # (monotonic, cpu ticks, read_bytes, write_bytes)
+
+    def close(self):
+        for fd in (self.stat, self.status, self.io):
+            if fd is not None:
+                try: os.close(fd)
+                except OSError: pass
+
+
+class ResourceSampler(QObject):
+    """
+    CPU, memory, thread count and disk I/O of every running server's JVM,
+    read from /proc on one background thread every interval seconds.
+
+    Each server gets a SampleRing holding the last capacity samples, so
+    memory is fixed however long it runs. The /proc files are opened once
+    per process and re-read with pread, which keeps a sample to three reads.
+    sampled is emitted (queued to the GUI thread) after each round; with
+    nothing to watch the thread sleeps until watch() is called. Where
+    there is no /proc (Windows, macOS) nothing is sampled.
+    """
+    sampled = Signal()
+
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def __init__(self, interval=1.0, capacity=300):
+        super().__init__()
+        self.interval = interval
+        self.capacity = capacity
+        self.available = os.path.exists("/proc/self/stat")
+        self._watched = {} # key -> _Watched
+        self._rings = {} # key -> SampleRing
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event() # Set by watch() and stop()
+        self._thread = None
+
+    # --- Called from the GUI ---
+
+    def watch(self, key, pid):
+        """Samples pid under key (e.g. a server folder) until unwatch(key)."""
+        if not self.available or not pid:
+            return
+        try:
+            watched = _Watched(pid)
+        except OSError as e:
+            print(f"Cannot sample process {pid}: {e}")
+            return
+        with self._lock:
+            old = self._watched.pop(key, None)
+            self._watched[key] = watched
+            self._rings[key] = SampleRing(self.capacity)
+        if old:
+            old.close()
+        self.start()
+        self._wake.set()
+
+    def unwatch(self, key):
+        with self._lock:
+            watched = self._watched.pop(key, None)
+            self._rings.pop(key, None)
+        if watched:
+            watched.close()
+
+    def latest(self, key):
+        """Newest sample of key as {field: value}, or None."""
+        with self._lock:
+            ring = self._rings.get(key)
+            return ring.latest() if ring else None
+
+    def history(self, key, field, n=None):
+        with self._lock:
+            ring = self._rings.get(key)
+            return ring.history(field, n) if ring else []
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # --- Sampling thread ---
+
+    def _run(self):
+        next_round = time.monotonic()
+        while not self._stop.is_set():
+            with self._lock:
+                idle = not self._watched
+                if idle:
+                    self._wake.clear() # Under the lock: a watch() from now on sets it again
+            if idle:
+                # One last round so views drop the numbers of the last server, then sleep
+                self.sampled.emit()
+                self._wake.wait()
+                next_round = time.monotonic()
+                continue
+            self.sample_once()
+            self.sampled.emit()
+            # Fixed rate: a slow round doesn't push the next ones back
+            next_round += self.interval
+            delay = next_round - time.monotonic()
+            if delay < 0:
+                next_round, delay = time.monotonic(), 0
+            self._stop.wait(delay)
+
+    def sample_once(self):
+        with self._lock:
+            watched = list(self._watched.items())
+        for key, proc in watched:
+            try:
+                values = self._read(proc)
+            except (OSError, ValueError, IndexError):
+                # Gone (or pid reused and unreadable): the owner unwatches it on exit
+                continue
+            with self._lock:
+                ring = self._rings.get(key)
+                if ring is not None and self._watched.get(key) is proc:
+                    ring.append(values)
+
+    def _read(self, proc):
+        now = time.monotonic()
+        stat = os.pread(proc.stat, 2048, 0)
+        # The command name can contain spaces and parentheses; fields start after the last ")"
+        fields = stat[stat.rindex(b")") + 2:].split()
+        ticks = int(fields[11]) + int(fields[12]) # utime + stime
+        threads = int(fields[17])
+        rss = int(fields[21]) * self.PAGE_SIZE
+
+        status = os.pread(proc.status, 4096, 0)
+        swap = self._status_kb(status, b"VmSwap:") * 1024
+        vm_rss = self._status_kb(status, b"VmRSS:")
+        if vm_rss:
+            rss = vm_rss * 1024
+
+        read_bytes = write_bytes = 0
+        if proc.io is not None:
+            io = os.pread(proc.io, 1024, 0)
+            read_bytes = self._io_value(io, b"\nread_bytes:")
+            write_bytes = self._io_value(io, b"\nwrite_bytes:")
+
+        cpu = read_rate = write_rate = 0.0
+        if proc.last:
+            then, last_ticks, last_read, last_write = proc.last
+            elapsed = max(now - then, 1e-6)
+            # Percent of one core: a busy JVM on 4 cores can show 400
+            cpu = (ticks - last_ticks) / self.CLOCK_TICKS / elapsed * 100
+            read_rate = (read_bytes - last_read) / elapsed
+            write_rate = (write_bytes - last_write) / elapsed
+        proc.last = (now, ticks, read_bytes, write_bytes)
+        return (time.time(), cpu, rss, swap, threads, read_bytes, write_bytes, read_rate, write_rate)
+
+    @staticmethod
+    def _status_kb(data, label):
+        start = data.find(label)
+        if start < 0:
+            return 0
+        end = data.find(b"kB", start)
+        return int(data[start + len(label):end])
+
+    @staticmethod
+    def _io_value(data, label):
+        start = data.find(label)
+        if start < 0:
+            return 0
+        end = data.find(b"\n", start + 1)
+        return int(data[start + len(label):end if end > 0 else None])
+
+resource_sampler = ResourceSampler()
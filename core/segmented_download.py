@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core.jobs import JobCancelled
+
+class SegmentedDownload:
+    """
+    Pulls one Range-capable resource over several connections at once.
+
+    The .part file is preallocated to the full size and each segment writes
+    its own byte range in place. Per-segment progress is saved next to it
+    (<part>.segments) so an interrupted download resumes every segment where
+    it stopped. Use probe() first: servers that don't advertise
+    Accept-Ranges need the single-stream path.
+    """
+
+    def __init__(self, downloader, url, part_path, size, segments=4, progress_callback=None, attempts=3):
+        self.downloader = downloader
+        self.url = url
+        self.part_path = part_path
+        self.state_path = part_path + ".segments"
+        self.size = size
+        self.segments = max(1, segments)
+        self.progress_callback = progress_callback
+        self.attempts = attempts
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._failed = threading.Event()
+        self._ranges = []
+        self._downloaded = 0
+        self._start_bytes = 0
+        self._started = 0.0
+        self._last_report = 0.0
+        self._last_save = 0.0
+
+    @staticmethod
+    def probe(downloader, url):
+        """Total size if url supports byte ranges, otherwise None."""
+        try:
+            r = downloader._get_head(url)
+            if r.status_code >= 400:
+                return None
+            if r.headers.get("accept-ranges", "").lower() != "bytes":
+                return None
+            if r.headers.get("content-encoding"):
+                return None # Ranges would address the encoded bytes
+            size = int(r.headers.get("content-length", 0))
+            return size or None
+        except Exception:
+            return None
+
+    def run(self):
+        """Downloads into part_path. True once every byte is there."""
+        self._ranges = self._load_state() or self._plan()
+        if not self._ranges:
+            return False
+
+        # Preallocate once; later resumes keep the bytes already written
+        if not os.path.exists(self.part_path) or os.path.getsize(self.part_path) != self.size:
+            with open(self.part_path, "wb") as f:
+                f.truncate(self.size)
+
+        self._downloaded = self._start_bytes = sum(r[2] for r in self._ranges)
+        self._started = time.perf_counter()
+
+        pending = [r for r in self._ranges if r[2] < r[1] - r[0] + 1]
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+                results = list(pool.map(self._fetch_range, pending))
+        finally:
+            self._save_state() # A cancelled download resumes from here too
+        if not all(results):
+            return False
+
+        self._report(force=True)
+        try: os.remove(self.state_path)
+        except OSError: pass
+        return True
+
+    # --- Planning / state ---
+
+    def _plan(self):
+        step = -(-self.size // self.segments) # ceil
+        return [[start, min(start + step, self.size) - 1, 0] for start in range(0, self.size, step)]
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != self.url or state.get("size") != self.size:
+            return None
+        return state["ranges"]
+
+    def _save_state(self):
+        with self._save_lock:
+            with self._lock:
+                state = {"url": self.url, "size": self.size, "ranges": [list(r) for r in self._ranges]}
+            tmp = self.state_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_path)
+
+    # --- Workers ---
+
+    def _fetch_range(self, rng):
+        for attempt in range(self.attempts):
+            if self._failed.is_set():
+                return False
+            try:
+                self._stream_range(rng)
+                return True
+            except JobCancelled:
+                # From progress_callback (Job.report): not a network error, don't retry
+                self._failed.set()
+                raise
+            except Exception as e:
+                if attempt == self.attempts - 1:
+                    print(f"Segment {rng[0]}-{rng[1]} failed: {e}")
+                    self._failed.set()
+                    return False
+        return False
+
+    def _stream_range(self, rng):
+        start, end = rng[0], rng[1]
+        while rng[2] < end - start + 1:
+            offset = start + rng[2]
+            r = self.downloader._get(self.url, stream=True, headers={"Range": f"bytes={offset}-{end}"})
+            before = rng[2]
+            with r:
+                if r.status_code != 206:
+                    raise Exception(f"Expected 206 for a range request, got {r.status_code}")
+                with open(self.part_path, "r+b") as f:
+                    f.seek(offset)
+                    while True:
+                        if self._failed.is_set():
+                            return
+                        chunk = r.raw.read(256 * 1024)
+                        if not chunk:
+                            break
+                        # Never write past our own range even if the server sends extra
+                        chunk = chunk[:end + 1 - (start + rng[2])]
+                        f.write(chunk)
+                        with self._lock:
+                            rng[2] += len(chunk)
+                            self._downloaded += len(chunk)
+                        self._tick()
+                        if rng[2] >= end - start + 1:
+                            break
+            if rng[2] == before:
+                raise Exception("Server sent no data for the range")
+
+    def _tick(self):
+        now = time.perf_counter()
+        with self._lock:
+            save = now - self._last_save > 1.0
+            if save:
+                self._last_save = now
+        if save:
+            self._save_state()
+        self._report()
+
+    def _report(self, force=False):
+        if not self.progress_callback:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if not force and now - self._last_report < 0.1:
+                return
+            self._last_report = now
+            downloaded = self._downloaded
+        # Aggregate rate over all segments, bytes/second
+        elapsed = now - self._started
+        rate = (downloaded - self._start_bytes) / elapsed if elapsed else 0
+        self.progress_callback(int(downloaded * 100 / self.size), rate)
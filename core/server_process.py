@@ -1,14 +1,73 @@
-from PySide6.QtCore import QObject, Signal, QProcess, QByteArray
+from PySide6.QtCore import QObject, Signal, QProcess, QByteArray, QTimer
+import json
 import os
+import threading
+import time
+from core.config_manager import config_manager
+from core.line_framer import LineFramer
+from core.log_buffer import LogBuffer
+from core.log_spool import LogSpool
+from core.log_events import LogEventParser, PlayerJoined, PlayerLeft, ServerDone, ServerStopping
+from core.jar_store import jar_store
+from core.startup_metrics import StartupTimer, record_startup, startup_summary
+from core.status_ping import ping, server_port
+from core.resource_sampler import resource_sampler
+from core.metrics_store import metrics_store
+
+# Written by the loader installer (Forge/Fabric) next to the server files
+LAUNCH_FILE = "launch.json"
+
+def launch_args(server_dir, jar_name="server.jar"):
+    """
+    Arguments that follow the JVM memory flags: the ones from launch.json if
+    an installer wrote it, otherwise -jar <jar_name>. None when nothing
+    runnable is installed yet.
+    """
+    try:
+        with open(os.path.join(server_dir, LAUNCH_FILE), "r") as f:
+            launch = json.load(f)
+        if os.path.exists(os.path.join(server_dir, launch["requires"])):
+            return list(launch["args"])
+    except (OSError, ValueError, KeyError):
+        pass
+    if os.path.exists(os.path.join(server_dir, jar_name)):
+        return ["-jar", jar_name]
+    return None
+
+def installed_build_key(server_dir):
+    """Build key installed in a server folder, or None if unknown."""
+    try:
+        with open(os.path.join(server_dir, LAUNCH_FILE), "r") as f:
+            return json.load(f)["key"]
+    except (OSError, ValueError, KeyError):
+        pass
+    try:
+        ref = jar_store.current(server_dir)
+    except Exception as e:
+        print(f"Could not read jar store for {server_dir}: {e}")
+        return None
+    return ref.get("key") if ref else None
 
 class ServerProcess(QObject):
-    log_output = Signal(str)
-    status_changed = Signal(str) # STARTING, ONLINE, STOPPING, OFFLINE
+    """
+    One server's JVM. Status follows the server's lifecycle, not just the
+    process: STARTING (launch requested) -> LOADING (JVM running, world
+    loading) -> ONLINE (the "Done (...)!" line, or the server answering a
+    status ping) -> STOPPING / RESTARTING -> OFFLINE, or CRASHED when it
+    exits without being asked to.
+    """
+    log_output = Signal(str) # One block of newline-separated lines per flush
+    status_changed = Signal(str) # STARTING, LOADING, ONLINE, STOPPING, RESTARTING, OFFLINE, CRASHED
+    server_event = Signal(object) # Typed events from core.log_events, e.g. PlayerJoined
     finished = Signal()
+    ping_answered = Signal(bool) # From the ping thread
+
+    PING_MS = 2000
 
-    def __init__(self, server_directory, jar_name="server.jar", java_path="java", ram_min="1024M", ram_max="2048M"):
+    def __init__(self, server_directory, jar_name="server.jar", java_path="java", ram_min="1024M", ram_max="2048M", server_id=None):
         super().__init__()
         self.server_dir = server_directory
+        self.server_id = server_id # Key in the metrics store, None to keep no metrics
         self.jar_name = jar_name
         self.java_path = java_path
         self.ram_min = ram_min
@@ -18,11 +77,46 @@ class ServerProcess(QObject):
         self.process = QProcess()
         self.process.setProgram(self.java_path)
         self.process.setWorkingDirectory(self.server_dir)
+        # stderr is interleaved with stdout in the order the JVM wrote it
+        self.process.setProcessChannelMode(QProcess.MergedChannels)
+        self.framer = LineFramer()
+        # Output is parsed once here; consumers subscribe to events instead of matching text
+        self.events = LogEventParser()
+        self.events.subscribe(self.server_event.emit)
+        self.events.subscribe(self.track_players, PlayerJoined, PlayerLeft)
+        self.events.subscribe(self.on_startup_event) # Before readiness, which closes the timer
+        self.events.subscribe(self.on_lifecycle_event, ServerDone, ServerStopping)
+        self.players = set()
+
+        # Readiness fallback for servers whose "Done" line we don't recognize
+        self._ping_timer = QTimer(self)
+        self._ping_timer.setInterval(self.PING_MS)
+        self._ping_timer.timeout.connect(self.ping_server)
+        self._pinging = False
+        self.ping_answered.connect(self.on_ping_answered)
+
+        self.startup = None # StartupTimer of the current start
+        self.last_startup = None # Its record once ready
+        self._stop_requested = False
         
-        self.log_history = [] # Buffer for full logs
+        # Recent lines in memory; everything, across restarts, in .mcmanager/console
+        options = config_manager.get_console_options()
+        self.log_history = LogBuffer()
+        self.spool = LogSpool(
+            os.path.join(self.server_dir, ".mcmanager", "console"),
+            segment_bytes=options["spool_segment_mb"] * 1024 * 1024,
+            keep_segments=options["spool_keep_segments"],
+        )
         
+        # Lines reach the GUI in batches, one append per flush instead of per line
+        self.max_lines_per_frame = options["max_lines_per_frame"]
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(options["flush_ms"])
+        self._flush_timer.timeout.connect(self.flush_log)
+
         self.process.readyReadStandardOutput.connect(self.handle_stdout)
-        self.process.readyReadStandardError.connect(self.handle_stderr)
         self.process.stateChanged.connect(self.handle_state_change)
         self.process.finished.connect(self.handle_finished)
         
@@ -31,69 +125,84 @@ class ServerProcess(QObject):
     def get_current_status(self):
         return self.current_status
 
+    def set_status(self, status):
+        if status != self.current_status:
+            self.current_status = status
+            self.status_changed.emit(status)
+
     def start_server(self):
         self.is_restarting = False
         if self.process.state() != QProcess.NotRunning:
-            self.log_output.emit("Warning: Process is already running.")
+            self.log("Warning: Process is already running.")
             return
 
-        if not os.path.exists(os.path.join(self.server_dir, self.jar_name)):
-            error_msg = "Error: server.jar not found!"
-            self.log_output.emit(error_msg)
-            self.log_history.append(error_msg)
+        launch = launch_args(self.server_dir, self.jar_name)
+        if launch is None:
+            self.log("Error: server.jar not found!")
             return
         
         # Auto-Accept EULA
         try:
             with open(os.path.join(self.server_dir, "eula.txt"), "w") as f:
                 f.write("eula=true\n")
-            msg = "Enforced EULA acceptance."
-            self.log_output.emit(msg)
-            self.log_history.append(msg)
+            self.log("Enforced EULA acceptance.")
         except Exception as e:
-            msg = f"Warning: Could not write eula.txt: {e}"
-            self.log_output.emit(msg)
-            self.log_history.append(msg)
+            self.log(f"Warning: Could not write eula.txt: {e}")
 
         # Arguments
         args = [
             f"-Xms{self.ram_min}",
             f"-Xmx{self.ram_max}",
-            "-jar",
-            self.jar_name,
+            *launch,
             "nogui"
         ]
         self.process.setArguments(args)
         
-        msg = f"Starting server in {self.server_dir}..."
-        self.log_output.emit(msg)
-        self.log_history.append(msg)
+        self.log(f"Starting server in {self.server_dir}...")
+        self.framer.reset()
+        self.events.reset()
+        self.players.clear()
+        self.is_stopping = False
+        self._stop_requested = False
+        self.startup = StartupTimer(time.time())
+        self.set_status("STARTING")
         self.process.start()
-        self.current_status = "STARTING"    
-        self.status_changed.emit("STARTING")
 
     def stop_server(self):
-        self.log_output.emit("Stop button clicked.") # Debug log
+        self.log("Stop button clicked.") # Debug log
         self.is_restarting = False
         if self.process.state() != QProcess.NotRunning:
             # If already stopping (user clicked stop again), force kill
             if hasattr(self, 'is_stopping') and self.is_stopping:
-                self.log_output.emit("Force killing server...")
-                self.log_history.append("Force killing server...")
+                self.log("Force killing server...")
                 self.kill_server(restart=False)
                 self.is_stopping = False
                 return
 
+            self.request_stop()
+
+    def request_stop(self):
+        """Asks the server to save and exit ("stop"); that can take a while."""
+        self.is_restarting = False
+        if self.process.state() != QProcess.NotRunning:
             self.is_stopping = True
+            self._stop_requested = True
             self.write_command("stop")
-            self.current_status = "STOPPING"
-            self.status_changed.emit("STOPPING")
+            self.set_status("STOPPING")
+
+    def terminate_server(self):
+        """SIGTERM: the JVM still runs its shutdown hooks, unlike kill_server."""
+        self.is_restarting = False
+        if self.process.state() != QProcess.NotRunning:
+            self._stop_requested = True
+            self.process.terminate()
             
     def kill_server(self, restart=False):
         if not restart:
             self.is_restarting = False
         
         if self.process.state() != QProcess.NotRunning:
+            self._stop_requested = True
             self.process.kill()
 
     def restart_server(self):
@@ -101,15 +210,14 @@ class ServerProcess(QObject):
         
         state = self.process.state()
         if state == QProcess.Starting:
-            self.log_output.emit("Process is in startup, killing to restart...")
+            self.log("Process is in startup, killing to restart...")
             self.kill_server(restart=True)
             
         elif state == QProcess.Running:
+            self._stop_requested = True
             self.write_command("stop")
-            self.current_status = "RESTARTING"
-            self.status_changed.emit("RESTARTING")
-            self.log_output.emit("Server restart initiated...")
-            self.log_history.append("Server restart initiated...")
+            self.set_status("RESTARTING")
+            self.log("Server restart initiated...")
             
         else: # NotRunning
             self.is_restarting = False # Reset just in case
@@ -117,37 +225,129 @@ class ServerProcess(QObject):
 
     def write_command(self, cmd):
         if self.process.state() != QProcess.NotRunning:
+            if cmd.strip().lower() in ("stop", "end"):
+                self._stop_requested = True # Typed in the console too: an exit now is not a crash
             data = QByteArray(f"{cmd}\n".encode('utf-8'))
             self.process.write(data)
 
+    def log(self, text, ts=None):
+        """One line into the history and the console: process output and our own notes alike."""
+        self.log_history.append(text, ts)
+        self.spool.write(text, ts)
+        self._pending.append(text)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush_log(self):
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        self.spool.flush()
+        lines, self._pending = self._pending, []
+        dropped = len(lines) - self.max_lines_per_frame
+        if dropped > 0:
+            # Under a flood listeners only get the newest lines; the history has them all
+            # (the console view reads the history itself and only uses this as a tick)
+            lines = [f"... {dropped} lines skipped here, see .mcmanager/console ..."] + lines[dropped:]
+        self.log_output.emit("\n".join(lines))
+
     def handle_stdout(self):
         data = self.process.readAllStandardOutput()
-        text = str(data, encoding='utf-8', errors='replace').strip()
-        if text:
-            self.log_output.emit(text)
-            self.log_history.append(text)
+        for ts, line in self.framer.feed(data.data()):
+            self.log(line, ts)
+            self.events.feed(line, ts)
+
+    def track_players(self, event):
+        if isinstance(event, PlayerJoined):
+            self.players.add(event.player)
+        else:
+            self.players.discard(event.player)
+
+    # --- Lifecycle ---
+
+    def on_lifecycle_event(self, event):
+        if isinstance(event, ServerDone):
+            self.mark_ready("done")
+        elif self.current_status in ("LOADING", "ONLINE"):
+            # Display only: a server shutting itself down on an error logs this too,
+            # so whether the exit was asked for is up to write_command and friends
+            self.set_status("STOPPING")
+
+    def on_startup_event(self, event):
+        if self.startup:
+            self.startup.on_event(event)
 
-    def handle_stderr(self):
-        data = self.process.readAllStandardError()
-        text = str(data, encoding='utf-8', errors='replace').strip()
-        if text:
-            self.log_output.emit(f"STDERR: {text}")
+    def ping_server(self):
+        if self._pinging:
+            return
+        self._pinging = True
+        port = server_port(self.server_dir)
+        threading.Thread(target=lambda: self.ping_answered.emit(ping("127.0.0.1", port) is not None),
+                         name="status-ping", daemon=True).start()
+
+    def on_ping_answered(self, answered):
+        self._pinging = False
+        if answered:
+            self.mark_ready("ping")
+
+    def mark_ready(self, ready_by):
+        self._ping_timer.stop()
+        if self.current_status != "LOADING":
+            return
+        self.set_status("ONLINE")
+        if self.startup:
+            record = self.startup.finish(time.time(), ready_by, installed_build_key(self.server_dir))
+            self.startup = None
+            self.last_startup = record
+            record_startup(self.server_dir, record)
+            if self.server_id is not None:
+                metrics_store.record(self.server_id, "startup", record["time_to_ready"], record["ts"])
+            details = [f"{name} {record[key]:.1f}s" for name, key in (("spawn prep", "spawn_prep"), ("plugins", "plugin_load"))
+                       if record[key]]
+            self.log(f"Server ready in {record['time_to_ready']:.1f}s" + (f" ({', '.join(details)})" if details else "") + ".")
+
+            # First start on a new build: how it compares with the one before
+            summary = startup_summary(self.server_dir)
+            previous = [build for build in summary if build != record["build"]]
+            if previous and summary.get(record["build"], {}).get("starts") == 1:
+                before = summary[previous[-1]]
+                self.log(f"Previous build {previous[-1]} was ready in {before['median']:.1f}s (median of {before['starts']}).")
 
     def handle_state_change(self, state):
         if state == QProcess.Running:
-            self.current_status = "ONLINE"
-            self.status_changed.emit("ONLINE")
+            # The JVM is up; the world is still loading
+            if self.startup:
+                self.startup.spawned = time.time()
+            self.set_status("LOADING")
+            self._ping_timer.start()
+            resource_sampler.watch(self.server_dir, self.process.processId())
         elif state == QProcess.NotRunning:
-            self.current_status = "OFFLINE"
-            self.status_changed.emit("OFFLINE")
+            self._ping_timer.stop()
+            resource_sampler.unwatch(self.server_dir)
+            if self.current_status == "STARTING":
+                # Never got to run (java missing...): finished is not emitted
+                self.log(f"Could not start {self.java_path}. Is Java installed?")
+                self.set_status("OFFLINE")
 
-    def handle_finished(self):
-        self.log_output.emit("Server process ended.")
-        self.current_status = "OFFLINE"
-        self.status_changed.emit("OFFLINE")
+    def handle_finished(self, exit_code=0, exit_status=QProcess.NormalExit):
+        # Last line if the process died without a trailing newline
+        self.handle_stdout()
+        for ts, line in self.framer.flush():
+            self.log(line, ts)
+            self.events.feed(line, ts)
+        self.events.flush()
+        self.players.clear()
+        crashed = not self._stop_requested and (exit_status != QProcess.NormalExit or exit_code != 0)
+        self.startup = None
+        if crashed:
+            self.log(f"Server crashed (exit code {exit_code}).")
+        else:
+            self.log("Server process ended.")
+        self.flush_log()
+        self.set_status("CRASHED" if crashed else "OFFLINE")
         
         if self.is_restarting:
-            self.log_output.emit("Restarting server now...")
+            self.log("Restarting server now...")
             self.is_restarting = False
             self.start_server()
         else:
@@ -0,0 +1,97 @@
+import time
+from PySide6.QtCore import QObject, Signal, QTimer, QProcess
+from core.log_events import ServerStopping, SavingChunks, ChunksSaved
+
+class FleetShutdown(QObject):
+    """
+    Stops many servers at once, each on its own deadline: "stop" goes to all
+    of them together, so the fleet takes as long as its slowest save rather
+    than the sum of them. A server that shows no saving progress for
+    save_timeout seconds is terminated (SIGTERM), and killed if it is still
+    there terminate_timeout seconds later. Every progress line ("Saving
+    chunks for level ...") pushes its deadline back.
+    """
+    progress = Signal(object, str) # key, what that server is doing
+    finished = Signal()
+
+    TICK_MS = 250
+    KILL_WAIT = 5 # Seconds for a killed process to be reaped before giving up on it
+
+    def __init__(self, processes, save_timeout=60, terminate_timeout=15, parent=None):
+        super().__init__(parent)
+        self.processes = processes # {key: ServerProcess}
+        self.save_timeout = save_timeout
+        self.terminate_timeout = terminate_timeout
+        self.pending = {} # key -> {"phase", "deadline", "callback"}
+        self.started = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.TICK_MS)
+        self._timer.timeout.connect(self.check)
+
+    def start(self):
+        self.started = time.monotonic()
+        for key, process in self.processes.items():
+            if process.process.state() == QProcess.NotRunning:
+                continue
+            callback = lambda event, key=key: self.on_event(key, event)
+            process.events.subscribe(callback, ServerStopping, SavingChunks, ChunksSaved)
+            self.pending[key] = {"phase": "stop", "deadline": self.started + self.save_timeout, "callback": callback}
+            process.request_stop()
+            self.progress.emit(key, "Stopping...")
+        self._timer.start()
+        self.check()
+
+    def on_event(self, key, event):
+        state = self.pending.get(key)
+        if not state or state["phase"] != "stop":
+            return
+        # Still making progress: give it the full timeout again
+        state["deadline"] = time.monotonic() + self.save_timeout
+        if isinstance(event, SavingChunks):
+            self.progress.emit(key, f"Saving chunks for {event.level}...")
+        elif isinstance(event, ChunksSaved):
+            self.progress.emit(key, "Chunks saved, exiting...")
+        else:
+            self.progress.emit(key, "Stopping server...")
+
+    def check(self):
+        now = time.monotonic()
+        for key, state in list(self.pending.items()):
+            process = self.processes[key]
+            if process.process.state() == QProcess.NotRunning:
+                self._done(key, {"stop": "Stopped", "terminate": "Stopped (terminated)", "kill": "Killed"}[state["phase"]])
+            elif now >= state["deadline"]:
+                self.escalate(key)
+        if not self.pending:
+            self._timer.stop()
+            self.finished.emit()
+
+    def escalate(self, key):
+        state = self.pending[key]
+        process = self.processes[key]
+        if state["phase"] == "stop":
+            process.log(f"No progress for {self.save_timeout:g}s after stop, terminating...")
+            process.terminate_server()
+            state["phase"], state["deadline"] = "terminate", time.monotonic() + self.terminate_timeout
+            self.progress.emit(key, "Not responding, terminating...")
+        elif state["phase"] == "terminate":
+            process.log("Still running after terminate, killing...")
+            process.kill_server()
+            state["phase"], state["deadline"] = "kill", time.monotonic() + self.KILL_WAIT
+            self.progress.emit(key, "Killing...")
+        else:
+            self._done(key, "Did not exit")
+
+    def kill_now(self):
+        """Stop waiting: kill everything still running."""
+        for key, state in self.pending.items():
+            if state["phase"] != "kill":
+                self.processes[key].log("Killing without waiting for the save...")
+                self.processes[key].kill_server()
+                state["phase"], state["deadline"] = "kill", time.monotonic() + self.KILL_WAIT
+                self.progress.emit(key, "Killing...")
+
+    def _done(self, key, text):
+        state = self.pending.pop(key)
+        self.processes[key].events.unsubscribe(state["callback"])
+        self.progress.emit(key, f"{text} after {time.monotonic() - self.started:.1f}s")
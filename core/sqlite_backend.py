@@ -0,0 +1,216 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Columns we can filter/sort on server-side. Everything else lives in `data`.
+SORTABLE = ("id", "name", "jar_type", "version", "created_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS servers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    path TEXT,
+    jar_type TEXT COLLATE NOCASE,
+    version TEXT,
+    created_at REAL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_servers_name ON servers(name);
+CREATE INDEX IF NOT EXISTS idx_servers_type_version ON servers(jar_type, version);
+CREATE INDEX IF NOT EXISTS idx_servers_version ON servers(version);
+CREATE INDEX IF NOT EXISTS idx_servers_path ON servers(path);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class SqliteBackend:
+    """
+    Server registry stored in a WAL-mode SQLite file (servers.db).
+    Indexed columns are duplicated out of the record so lookups, filters
+    and sorting run in SQL; only matching rows get deserialized.
+
+    SQLite handles locking between processes. PRAGMA data_version tells us
+    when another connection committed, which is when the get() cache is dropped.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.RLock()
+        self._batch_depth = 0
+        self._records = {}
+        self._data_version = None
+
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- Migration ---
+
+    def import_json(self, json_path):
+        """
+        One-shot import of an existing servers.json. Only runs once per
+        database; servers.json itself is left untouched.
+        """
+        # Inside one IMMEDIATE transaction so two instances can't both import
+        with self.batch():
+            if self._meta("imported_from_json"):
+                return 0
+            records = []
+            if os.path.exists(json_path):
+                from core.json_store import JsonStore
+                # Goes through JsonStore so a pending journal is replayed too
+                records = JsonStore(json_path).load()
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO servers (id, name, path, jar_type, version, created_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._row(r) for r in records]
+            )
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_from_json', ?)", (json_path,))
+            return len(records)
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # --- Reads ---
+
+    def _read_data_version(self):
+        with self.lock:
+            return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_if_changed(self):
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._records = {}
+            self._data_version = version
+
+    def has_external_changes(self):
+        return self._read_data_version() != self._data_version
+
+    def transaction(self):
+        return self.batch()
+
+    def all(self, order_by="id", descending=False):
+        return self.find(order_by=order_by, descending=descending)
+
+    def get(self, server_id):
+        record = self._records.get(server_id)
+        if record is not None:
+            return record
+        with self.lock:
+            row = self.conn.execute("SELECT data FROM servers WHERE id = ?", (server_id,)).fetchone()
+        if not row:
+            return None
+        record = self._records[server_id] = json.loads(row[0])
+        return record
+
+    def find(self, jar_type=None, version=None, name=None, path=None, order_by="id", descending=False):
+        where, args = [], []
+        if jar_type is not None:
+            where.append("jar_type = ?")
+            args.append(jar_type)
+        if version is not None:
+            where.append("version = ?")
+            args.append(version)
+        if name is not None:
+            where.append("name = ?")
+            args.append(name)
+        if path is not None:
+            where.append("path = ?")
+            args.append(os.path.normcase(os.path.abspath(path)))
+
+        if order_by not in SORTABLE:
+            raise ValueError(f"Cannot sort servers by '{order_by}'")
+
+        sql = "SELECT data FROM servers"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+
+        with self.lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def max_id(self):
+        with self.lock:
+            row = self.conn.execute("SELECT MAX(id) FROM servers").fetchone()
+        return row[0]
+
+    # --- Writes ---
+
+    @staticmethod
+    def _row(record):
+        path = record.get('path')
+        return (
+            record['id'],
+            record.get('name', ''),
+            os.path.normcase(os.path.abspath(path)) if path else None,
+            record.get('jar_type'),
+            record.get('version'),
+            record.get('created_at'),
+            json.dumps(record),
+        )
+
+    def insert(self, record):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO servers (id, name, path, jar_type, version, created_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row(record)
+            )
+            self._records[record['id']] = record
+
+    def update(self, server_id, fields):
+        with self.lock, self.batch():
+            # Re-read inside the transaction, the cache may predate another writer
+            self._records.pop(server_id, None)
+            record = self.get(server_id)
+            if not record:
+                return None
+            record.update(fields)
+            self.conn.execute(
+                "UPDATE servers SET name = ?, path = ?, jar_type = ?, version = ?, created_at = ?, data = ? WHERE id = ?",
+                self._row(record)[1:] + (server_id,)
+            )
+            return record
+
+    def delete(self, server_id):
+        with self.lock:
+            self.conn.execute("DELETE FROM servers WHERE id = ?", (server_id,))
+            self._records.pop(server_id, None)
+
+    @contextmanager
+    def batch(self):
+        """One transaction for everything inside the block."""
+        with self.lock:
+            if self._batch_depth:
+                self._batch_depth += 1
+                try:
+                    yield
+                finally:
+                    self._batch_depth -= 1
+                return
+
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._batch_depth = 1
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            else:
+                self.conn.execute("COMMIT")
+            finally:
+                self._batch_depth = 0
+
+    def flush(self):
+        # Autocommit mode, nothing buffered
+        pass
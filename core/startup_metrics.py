@@ -0,0 +1,85 @@
+import json
+import os
+import statistics
+from core.log_events import PreparingLevel, SpawnProgress, SpawnPrepared, PluginLoaded, ServerDone
+
+# One JSON record per start, appended, in the server folder
+STARTUPS_FILE = os.path.join(".mcmanager", "startups.jsonl")
+
+class StartupTimer:
+    """
+    Timings of one server start, collected from its log events:
+    time_to_ready (start button to ready), spawn_prep (preparing the spawn
+    area, as the server reports it when it does) and plugin_load (sum of
+    the plugins' load/enable times).
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.spawned = None
+        self.spawn_start = None
+        self.spawn_prep = None
+        self.plugin_load = 0.0
+        self.done_seconds = None
+
+    def on_event(self, event):
+        if isinstance(event, (PreparingLevel, SpawnProgress)) and self.spawn_start is None:
+            self.spawn_start = event.ts
+        elif isinstance(event, SpawnPrepared):
+            self.spawn_prep = event.millis / 1000
+        elif isinstance(event, PluginLoaded):
+            self.plugin_load += event.seconds
+        elif isinstance(event, ServerDone):
+            self.done_seconds = event.seconds
+
+    def finish(self, ready, ready_by, build=None):
+        spawn_prep = self.spawn_prep
+        if spawn_prep is None and self.spawn_start is not None:
+            spawn_prep = ready - self.spawn_start
+        return {
+            "ts": self.started,
+            "build": build,
+            "ready_by": ready_by, # "done" line or status "ping"
+            "time_to_ready": round(ready - self.started, 3),
+            "jvm_spawn": round(self.spawned - self.started, 3) if self.spawned else None,
+            "spawn_prep": round(spawn_prep, 3) if spawn_prep is not None else None,
+            "plugin_load": round(self.plugin_load, 3),
+            "done_seconds": self.done_seconds,
+        }
+
+def record_startup(server_dir, record):
+    path = os.path.join(server_dir, STARTUPS_FILE)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        print(f"Could not record startup time in {path}: {e}")
+
+def startup_history(server_dir):
+    """All recorded starts, oldest first."""
+    records = []
+    try:
+        with open(os.path.join(server_dir, STARTUPS_FILE), "r") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    pass # A line cut short by a crash
+    except OSError:
+        pass
+    return records
+
+def startup_summary(server_dir):
+    """
+    {build key: {"starts", "median", "best", "last"}} of time_to_ready,
+    in the order the builds were first used: a regression after a jar
+    upgrade shows up as a jump between consecutive builds.
+    """
+    by_build = {}
+    for record in startup_history(server_dir):
+        by_build.setdefault(record.get("build"), []).append(record["time_to_ready"])
+    return {
+        build: {"starts": len(times), "median": statistics.median(times), "best": min(times), "last": times[-1]}
+        for build, times in by_build.items()
+    }
@@ -0,0 +1,65 @@
+import json
+import os
+import socket
+import struct
+
+def _varint(value):
+    out = b""
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out += bytes([byte | 0x80])
+        else:
+            return out + bytes([byte])
+
+def _read_varint(sock):
+    value = 0
+    for shift in range(0, 35, 7):
+        byte = sock.recv(1)
+        if not byte:
+            raise ConnectionError("Connection closed")
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return value
+    raise ValueError("VarInt too long")
+
+def _recv_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return data
+
+def ping(host="127.0.0.1", port=25565, timeout=1.5):
+    """
+    Server List Ping, what the multiplayer screen does. Returns the status
+    JSON (version, players, description) or None if the server doesn't
+    answer. A server only answers once it is ticking, i.e. ready.
+    """
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            host_bytes = host.encode("utf-8")
+            # Handshake (protocol -1: "just asking"), next state 1 = status
+            handshake = b"\x00" + _varint(0xFFFFFFFF) + _varint(len(host_bytes)) + host_bytes + struct.pack(">H", port) + b"\x01"
+            sock.sendall(_varint(len(handshake)) + handshake + b"\x01\x00")
+            _read_varint(sock) # Packet length
+            if _read_varint(sock) != 0x00:
+                return None
+            size = _read_varint(sock)
+            return json.loads(_recv_exactly(sock, size).decode("utf-8"))
+    except (OSError, ValueError, ConnectionError):
+        return None
+
+def server_port(server_dir, default=25565):
+    try:
+        with open(os.path.join(server_dir, "server.properties"), "r") as f:
+            for line in f:
+                if line.strip().startswith("server-port="):
+                    return int(line.split("=", 1)[1].strip())
+    except (OSError, ValueError):
+        pass
+    return default
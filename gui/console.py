@@ -1,10 +1,13 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                               QTextEdit, QLineEdit, QLabel, QTabWidget, QFrame, QSizePolicy)
-from PySide6.QtCore import Qt, Signal
-from PySide6.QtGui import QTextCursor
+                               QLineEdit, QLabel, QTabWidget, QFrame, QSizePolicy,
+                               QCheckBox, QComboBox, QDateTimeEdit, QSplitter)
+from PySide6.QtCore import Qt, Signal, QDateTime
+from gui.log_view import LogView
+from core.log_buffer import LogBuffer
 
 class ConsoleTab(QWidget):
     command_signal = Signal(str)
+    MAX_RESULTS = 10000
 
     def __init__(self):
         super().__init__()
@@ -34,11 +37,73 @@ class ConsoleTab(QWidget):
         
         layout.addLayout(tools_layout)
         
-        # Terminal
-        self.terminal = QTextEdit()
-        self.terminal.setReadOnly(True)
+        # Search over the whole history (see core.log_search), not just what is on screen
+        search_layout = QHBoxLayout()
+        search_layout.setContentsMargins(0, 0, 0, 0)
+        field_style = "background-color: #333; color: white; padding: 5px;"
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search history...")
+        self.search_input.setStyleSheet(field_style)
+        self.search_input.returnPressed.connect(self.run_search)
+        self.search_regex = QCheckBox("Regex")
+        self.search_level = QComboBox()
+        self.search_level.addItems(["Any level", "INFO", "WARN", "ERROR"])
+        self.search_thread = QLineEdit()
+        self.search_thread.setPlaceholderText("Thread")
+        self.search_thread.setFixedWidth(120)
+        self.search_thread.setStyleSheet(field_style)
+        self.search_thread.returnPressed.connect(self.run_search)
+        self.search_scope = QComboBox()
+        self.search_scope.addItems(["Console history", "logs/ folder"])
+        self.search_between = QCheckBox("Between")
+        self.search_from = QDateTimeEdit(QDateTime.currentDateTime().addSecs(-3600))
+        self.search_to = QDateTimeEdit(QDateTime.currentDateTime())
+        for edit in (self.search_from, self.search_to):
+            edit.setCalendarPopup(True)
+            edit.setDisplayFormat("yyyy-MM-dd HH:mm")
+            edit.setEnabled(False)
+            self.search_between.toggled.connect(edit.setEnabled)
+        self.btn_search = QPushButton("Search")
+        self.btn_search.clicked.connect(self.run_search)
+
+        for w in (self.search_input, self.search_regex, self.search_level, self.search_thread, self.search_scope,
+                  self.search_between, self.search_from, self.search_to, self.btn_search):
+            search_layout.addWidget(w)
+        search_layout.setStretch(0, 1)
+        layout.addLayout(search_layout)
+
+        # Terminal: only the visible lines are ever laid out
+        self.terminal = LogView()
         self.terminal.setStyleSheet("background-color: #000000; color: #CCCCCC; font-family: Consolas, monospace;")
-        layout.addWidget(self.terminal)
+
+        # Search hits, shown under the terminal while there are any
+        self.results_panel = QWidget()
+        results_layout = QVBoxLayout(self.results_panel)
+        results_layout.setContentsMargins(0, 0, 0, 0)
+        results_header = QHBoxLayout()
+        self.search_status = QLabel("")
+        self.search_status.setStyleSheet("color: #AAA;")
+        self.btn_close_search = QPushButton("Close")
+        self.btn_close_search.clicked.connect(self.close_search)
+        results_header.addWidget(self.search_status)
+        results_header.addStretch()
+        results_header.addWidget(self.btn_close_search)
+        results_layout.addLayout(results_header)
+        self.results = LogView(LogBuffer(max_lines=self.MAX_RESULTS))
+        self.results.setStyleSheet(self.terminal.styleSheet())
+        results_layout.addWidget(self.results)
+        self.results_panel.hide()
+
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.terminal)
+        splitter.addWidget(self.results_panel)
+        layout.addWidget(splitter)
+
+        self.spool = None # Set once the page has a ServerProcess
+        self.process = None # Then append_log goes through its log(), into the history and the spool
+        self.logs_dir = None
+        self.search_job = None
         
         # Input
         self.input_line = QLineEdit()
@@ -56,7 +121,100 @@ class ConsoleTab(QWidget):
             self.append_log(f"> {cmd}")
 
     def append_log(self, text):
-        self.terminal.append(text)
+        if self.process:
+            self.process.log(text)
+        else:
+            self.terminal.append(text)
+
+    def attach_process(self, process):
+        """Shows a server's history instead of this page's own lines, from now on written through it."""
+        if process.log_history is self.terminal.buffer:
+            return
+        own = self.terminal.buffer
+        if self.process is None:
+            # Download and installer output from before the process existed: keep it in its history
+            for index in range(own.first, own.total):
+                process.log(own.get(index), own.timestamp(index))
+            own.clear()
+        self.terminal.set_buffer(process.log_history)
+        self.spool = process.spool
+        self.process = process
+
+    def refresh_log(self, _block=None):
+        # The process already put the lines in the buffer, just pick them up
+        self.terminal.refresh()
+
+    def run_search(self):
+        from core.jobs import job_queue
+        from core.log_search import log_search
+        import re
+
+        query = self.search_input.text()
+        if not query:
+            self.close_search()
+            return
+        if self.search_regex.isChecked():
+            try:
+                re.compile(query)
+            except re.error as e:
+                self.search_status.setText(f"Invalid regex: {e}")
+                self.results_panel.show()
+                return
+        source = self.spool if self.search_scope.currentIndex() == 0 else self.logs_dir
+        if source is None:
+            self.search_status.setText("Nothing to search yet.")
+            self.results_panel.show()
+            return
+
+        options = dict(
+            regex=self.search_regex.isChecked(),
+            level=self.search_level.currentText() if self.search_level.currentIndex() > 0 else None,
+            thread=self.search_thread.text().strip() or None,
+            max_results=self.MAX_RESULTS,
+        )
+        if self.search_between.isChecked():
+            options["start"] = self.search_from.dateTime().toSecsSinceEpoch()
+            options["end"] = self.search_to.dateTime().toSecsSinceEpoch()
+
+        if self.search_job:
+            self.search_job.cancel()
+        self.results.buffer.clear()
+        self.results.refresh()
+        self.search_status.setText("Searching...")
+        self.results_panel.show()
+
+        # Hits stream in batches through job.message while the search goes on
+        job = job_queue.submit(lambda job: log_search.search(source, query, on_hits=lambda hits: job.log("\n".join(hits)),
+                                                             check=job.check, **options))
+        self.search_job = job
+        job.message.connect(lambda text, j=job: self.on_search_hits(j, text))
+        job.finished.connect(lambda hits, j=job: self.on_search_done(j, len(hits)))
+        job.failed.connect(lambda error, j=job: self.on_search_done(j, None, error))
+
+    def on_search_hits(self, job, text):
+        if job is not self.search_job:
+            return # A search that was replaced by a newer one
+        self.results.append(text)
+        self.search_status.setText(f"Searching... {len(self.results.buffer)} hits")
+
+    def on_search_done(self, job, count, error=None):
+        if job is not self.search_job:
+            return
+        self.search_job = None
+        if error:
+            self.search_status.setText(f"Search failed: {error}")
+        elif count >= self.MAX_RESULTS:
+            self.search_status.setText(f"First {count} hits, narrow the search to see more")
+        else:
+            self.search_status.setText(f"{count} hits")
+
+    def close_search(self):
+        if self.search_job:
+            self.search_job.cancel()
+            self.search_job = None
+        self.results.buffer.clear()
+        self.results.refresh()
+        self.results_panel.hide()
 
 class ServerPage(QWidget):
     def __init__(self, server_id, parent=None):
@@ -87,6 +245,17 @@ class ServerPage(QWidget):
         header.addWidget(self.title_lbl)
         header.addWidget(self.info_lbl)
         header.addStretch()
+
+        # Live JVM usage, from the resource sampler
+        from gui.resource_view import Sparkline
+        from core.resource_sampler import resource_sampler
+        self.resource_lbl = QLabel("")
+        self.resource_lbl.setStyleSheet("color: #AAA; font-size: 13px;")
+        self.cpu_spark = Sparkline()
+        self.cpu_spark.setToolTip("CPU, last 2 minutes")
+        header.addWidget(self.resource_lbl)
+        header.addWidget(self.cpu_spark)
+        resource_sampler.sampled.connect(self.refresh_resources)
         layout.addLayout(header)
         
         # Tabs
@@ -101,6 +270,8 @@ class ServerPage(QWidget):
         
         # Add Tabs first
         self.console_tab = ConsoleTab()
+        import os
+        self.console_tab.logs_dir = os.path.join(self.server_data['path'], "logs")
         self.tabs.addTab(self.console_tab, "Console")
         
         from gui.file_manager import FileManager
@@ -197,6 +368,13 @@ class ServerPage(QWidget):
         
         self.info_lbl.setText(f"IP: {lan_ip}:{port}")
 
+    def refresh_resources(self):
+        from gui.resource_view import describe
+        from core.resource_sampler import resource_sampler
+        path = self.server_data['path']
+        self.resource_lbl.setText(describe(resource_sampler.latest(path)))
+        self.cpu_spark.set_values(resource_sampler.history(path, "cpu", 120))
+
     def set_server_name(self, name):
         # Override handled in init now
         pass
@@ -212,17 +390,31 @@ class ServerPage(QWidget):
             self.network_tab.stop_process()
 
     def init_process(self):
-        from core.server_process import ServerProcess
-        import os
+        from core.jobs import job_queue
+        from core.server_process import launch_args
         
         path = self.server_data['path']
-        if not os.path.exists(os.path.join(path, "server.jar")):
+        if launch_args(path) is None:
             self.console_tab.append_log("WARNING: server.jar not found! Please download it.")
             self.console_tab.input_line.setEnabled(False)
-            self.console_tab.btn_start.setText("Download JAR")
-            self.console_tab.btn_start.clicked.connect(self.start_download)
+            self.show_download_button()
+
+            # Still downloading from an earlier visit to this page
+            job = job_queue.find(("install", self.server_id))
+            if job:
+                self.attach_download(job)
         else:
             self.setup_process()
+
+    def show_download_button(self):
+        try: self.console_tab.btn_start.clicked.disconnect()
+        except: pass
+        try: self.console_tab.btn_stop.clicked.disconnect()
+        except: pass
+        self.console_tab.btn_start.setText("Download JAR")
+        self.console_tab.btn_start.clicked.connect(self.start_download)
+        self.console_tab.btn_stop.setText("Stop")
+        self.set_buttons(start=True, stop=False)
             
     def setup_process(self):
         from core.server_process import ServerProcess
@@ -241,7 +433,8 @@ class ServerPage(QWidget):
                 jar_name="server.jar",
                 java_path=self.server_data.get('java_path', 'java'),
                 ram_min=self.server_data.get('ram_min', '2048M'),
-                ram_max=self.server_data.get('ram_max', '4096M')
+                ram_max=self.server_data.get('ram_max', '4096M'),
+                server_id=self.server_id
             )
             main_win.running_servers[self.server_id] = self.process
         
@@ -252,6 +445,8 @@ class ServerPage(QWidget):
         except: pass
         try: self.process.finished.disconnect()
         except: pass
+        # Lines still waiting for the next flush are already in the history loaded below
+        self.process.flush_log()
         
         # Connect UI Buttons
         try: self.console_tab.btn_start.clicked.disconnect() 
@@ -265,14 +460,10 @@ class ServerPage(QWidget):
         
         self.console_tab.command_signal.connect(self.process.write_command)
         
-        if hasattr(self.process, 'log_history') and self.process.log_history:
-            # Load full history. Since append_log appends, clearing first might be safer if we reuse widgets, 
-            # but console_tab is new here.
-            full_log = "\n".join(self.process.log_history)
-            self.console_tab.terminal.setPlainText(full_log)
-            self.console_tab.terminal.moveCursor(QTextCursor.End)
+        # The view reads the history in place: opening the page costs the same at any size
+        self.console_tab.attach_process(self.process)
         
-        self.process.log_output.connect(self.console_tab.append_log)
+        self.process.log_output.connect(self.console_tab.refresh_log)
         self.process.status_changed.connect(self.update_status)
         # self.process.finished.connect(self.handle_finished) # We handle finish via status change mostly
         
@@ -289,15 +480,16 @@ class ServerPage(QWidget):
             self.set_buttons(start=False, stop=True)
             self.console_tab.btn_stop.setText("Stop")
             
-        elif status == "OFFLINE":
+        elif status in ["OFFLINE", "CRASHED"]:
              self.console_tab.status_lbl.setStyleSheet("color: #FF5555; font-weight: bold; font-size: 18px; margin-left: 15px;")
              self.set_buttons(start=True, stop=False)
              self.console_tab.btn_stop.setText("Stop")
              
-        elif status == "STARTING":
-            self.console_tab.status_lbl.setText("RUNNING") # Override text
+        elif status in ["STARTING", "LOADING"]:
+            # Running, but not ready for players until ONLINE
             self.console_tab.status_lbl.setStyleSheet("color: #FFC107; font-weight: bold; font-size: 18px; margin-left: 15px;")
             self.set_buttons(start=False, stop=True) # stop allowed to kill
+            self.console_tab.btn_stop.setText("Stop")
             
         elif status in ["STOPPING", "RESTARTING"]:
             self.console_tab.status_lbl.setStyleSheet("color: #FFC107; font-weight: bold; font-size: 18px; margin-left: 15px;")
@@ -309,45 +501,83 @@ class ServerPage(QWidget):
         self.console_tab.btn_stop.setEnabled(stop)
              
     def start_download(self):
-        self.console_tab.append_log("Started Downloading... (UI will freeze briefly, threading WIP)")
-        from core.downloader import downloader
+        from core.jobs import job_queue
         import os
-        import shutil
-        import datetime
-        
+
         jar_type = self.server_data.get('jar_type', 'Paper')
         version = self.server_data.get('version', '1.20.4')
-        
-        url = downloader.get_download_url(jar_type, version)
-        
-        if not url:
-            self.console_tab.append_log(f"Error: Could not find download for {jar_type} {version}")
-            return
-
         target = os.path.join(self.server_data['path'], "server.jar")
-        
-        # Backup existing if any
-        if os.path.exists(target):
-            timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-            backup_name = f"server.jar.backup-{timestamp}"
-            try:
-                shutil.move(target, os.path.join(self.server_data['path'], backup_name))
-                self.console_tab.append_log(f"Backed up old jar to {backup_name}")
-            except Exception as e:
-                self.console_tab.append_log(f"Backup failed: {e}")
-
-        success = downloader.download_jar(url, target)
-        
-        if success:
-            self.console_tab.append_log("Download Complete!")
-            # Check EULA
-            eula_path = os.path.join(self.server_data['path'], "eula.txt")
-            if not os.path.exists(eula_path):
-                with open(eula_path, "w") as f:
-                    f.write("eula=true")
-                self.console_tab.append_log("Accepted EULA.")
-            
-            self.setup_process()
-            self.console_tab.input_line.setEnabled(True)
+
+        self.console_tab.append_log(f"Started Downloading {jar_type} {version}...")
+        job = job_queue.submit(self.download_jar_job, jar_type, version, target,
+                               self.server_data.get('java_path', 'java'), key=("install", self.server_id))
+        self.attach_download(job)
+
+    @staticmethod
+    def download_jar_job(job, jar_type, version, target, java_path="java"):
+        # Runs on a worker thread: no widgets in here
+        from core.downloader import downloader
+        # Previous builds stay in the shared jar store, no need for backup copies.
+        # Forge/Fabric installers log through the job into the console
+        build = downloader.install_jar(jar_type, version, target, progress_callback=job.report,
+                                       log=job.log, java_path=java_path)
+        if not build:
+            raise Exception(f"Could not get {jar_type} {version}")
+        return build
+
+    def attach_download(self, job):
+        self.download_job = job
+        job.attach(finished=self.on_download_finished, failed=self.on_download_failed, cancelled=self.on_download_cancelled,
+                   progress=self.on_download_progress, message=self.console_tab.append_log)
+
+        try: self.console_tab.btn_start.clicked.disconnect()
+        except: pass
+        try: self.console_tab.btn_stop.clicked.disconnect()
+        except: pass
+        self.console_tab.btn_start.setText("Pause")
+        self.console_tab.btn_start.clicked.connect(self.toggle_download_pause)
+        self.console_tab.btn_stop.setText("Cancel")
+        self.console_tab.btn_stop.clicked.connect(job.cancel)
+        self.set_buttons(start=True, stop=True)
+        self.console_tab.status_lbl.setText("DOWNLOADING")
+        self.console_tab.status_lbl.setStyleSheet("color: #FFC107; font-weight: bold; font-size: 18px; margin-left: 15px;")
+
+    def toggle_download_pause(self):
+        job = self.download_job
+        if job.state == "PAUSED":
+            job.resume()
+            self.console_tab.btn_start.setText("Pause")
         else:
-            self.console_tab.append_log("Download Failed.")
+            job.pause()
+            self.console_tab.btn_start.setText("Resume")
+            self.console_tab.status_lbl.setText("PAUSED")
+
+    def on_download_progress(self, percent, rate):
+        if self.download_job.state == "PAUSED":
+            return
+        self.console_tab.status_lbl.setText(f"DOWNLOADING {percent}% ({rate / 1e6:.1f} MB/s)")
+
+    def on_download_finished(self, build):
+        import os
+        # Process first, so these notes land in its history and spool
+        self.setup_process()
+        self.console_tab.append_log(f"Download Complete! ({build['key']})")
+        # Check EULA
+        eula_path = os.path.join(self.server_data['path'], "eula.txt")
+        if not os.path.exists(eula_path):
+            with open(eula_path, "w") as f:
+                f.write("eula=true")
+            self.console_tab.append_log("Accepted EULA.")
+        
+        self.console_tab.input_line.setEnabled(True)
+
+    def on_download_failed(self, error):
+        self.console_tab.append_log(f"Download Failed. {error}")
+        self.console_tab.status_lbl.setText("OFFLINE")
+        self.show_download_button()
+
+    def on_download_cancelled(self):
+        # The .part file stays behind, so downloading again resumes it
+        self.console_tab.append_log("Download cancelled.")
+        self.console_tab.status_lbl.setText("OFFLINE")
+        self.show_download_button()
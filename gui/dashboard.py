@@ -89,11 +89,26 @@ class ServerCard(QFrame):
         # Status
         status_lbl = QLabel(status)
         color = "#44ff44" if status == "ONLINE" else "#ff4444"
-        if status == "STARTING": color = "#FFC107"
+        if status in ("STARTING", "LOADING", "STOPPING", "RESTARTING"): color = "#FFC107"
         if status == "RUNNING": color = "#44ff44" # Green for Running
         
         status_lbl.setStyleSheet(f"color: {color}; font-weight: bold; border: none; background: transparent;")
-        layout.addWidget(status_lbl)
+        status_row = QHBoxLayout()
+        status_row.addWidget(status_lbl)
+
+        # CPU / RAM while running, filled in by Dashboard.update_resources
+        self.resource_lbl = QLabel("")
+        self.resource_lbl.setStyleSheet("color: #CCC; font-size: 12px; border: none; background: transparent;")
+        status_row.addStretch()
+        status_row.addWidget(self.resource_lbl)
+        layout.addLayout(status_row)
+
+    def set_resources(self, sample):
+        if not sample:
+            self.resource_lbl.setText("")
+            return
+        from gui.resource_view import format_bytes
+        self.resource_lbl.setText(f"CPU {sample['cpu']:.0f}% · RAM {format_bytes(sample['rss'])}")
 
     def on_delete(self):
         self.delete_clicked.emit(self.server_id)
@@ -106,6 +121,7 @@ class ServerCard(QFrame):
 
 class Dashboard(QWidget):
     create_server_clicked = Signal()
+    check_updates_clicked = Signal()
     server_selected = Signal(int)
     delete_requested = Signal(int)
 
@@ -149,8 +165,25 @@ class Dashboard(QWidget):
              if self.logo_pixmap.height() > 200:
                  self.logo_pixmap = self.logo_pixmap.scaledToHeight(200, Qt.SmoothTransformation)
 
+        updates_btn = QPushButton("Check for Updates")
+        updates_btn.setFixedSize(220, 45)
+        updates_btn.setStyleSheet("""
+            QPushButton {
+                background-color: transparent;
+                color: white;
+                border: 1px solid #007ACC;
+                border-radius: 4px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #005A9E;
+            }
+        """)
+        updates_btn.clicked.connect(self.check_updates_clicked.emit)
+
         header.addWidget(title)
         header.addStretch()
+        header.addWidget(updates_btn)
         header.addWidget(add_btn)
         
         self.main_layout.addLayout(header)
@@ -168,11 +201,13 @@ class Dashboard(QWidget):
         
         scroll.setWidget(self.grid_container)
         self.main_layout.addWidget(scroll)
+        self.cards = {} # server_id -> ServerCard
 
     def load_servers(self, servers, running_status=None):
         if running_status is None: running_status = {}
         
         # Clear existing
+        self.cards = {}
         while self.grid_layout.count():
             item = self.grid_layout.takeAt(0)
             if item.widget():
@@ -190,6 +225,7 @@ class Dashboard(QWidget):
             card = ServerCard(server, status)
             card.clicked.connect(self.server_selected.emit)
             card.delete_clicked.connect(self.delete_requested.emit)
+            self.cards[server['id']] = card
             
             row = index // columns
             col = index % columns
@@ -199,6 +235,11 @@ class Dashboard(QWidget):
         for col in range(columns):
             self.grid_layout.setColumnStretch(col, 1)
 
+    def update_resources(self, samples):
+        """samples: {server_id: resource sample or None}; servers not in it show nothing."""
+        for server_id, card in self.cards.items():
+            card.set_resources(samples.get(server_id))
+
     def paintEvent(self, event):
         opt = QStyleOption()
         opt.initFrom(self)
@@ -44,9 +44,12 @@ class TextEditorDialog(QDialog):
         layout.addLayout(btns)
         
     def save(self):
+        tmp = self.file_path + ".saving"
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
+            # New file swapped in, so a hardlinked file isn't changed for its other links too
+            with open(tmp, 'w', encoding='utf-8') as f:
                 f.write(self.editor.toPlainText())
+            os.replace(tmp, self.file_path)
             self.accept()
         except Exception as e:
              QMessageBox.critical(self, "Error", f"Could not save file: {e}")
@@ -139,10 +142,16 @@ class FileManager(QWidget):
         if file_path:
             filename = os.path.basename(file_path)
             dest = os.path.join(target_dir, filename)
+            # Copy next to it and swap in: writing into an existing file would also
+            # change every other hardlink to it (server jars come from the jar store)
+            tmp = dest + ".uploading"
             try:
-                shutil.copy2(file_path, dest)
+                shutil.copy2(file_path, tmp)
+                os.replace(tmp, dest)
                 QMessageBox.information(self, "Success", f"Uploaded {filename}")
             except Exception as e:
+                try: os.remove(tmp)
+                except OSError: pass
                 QMessageBox.critical(self, "Error", f"Failed to upload: {e}")
 
     def open_context_menu(self, position):
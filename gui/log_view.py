@@ -0,0 +1,117 @@
+from PySide6.QtWidgets import QTableView, QAbstractItemView, QApplication, QHeaderView
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex
+from PySide6.QtGui import QColor, QKeySequence
+from core.log_buffer import LogBuffer
+
+class LogModel(QAbstractListModel):
+    """
+    Rows over a LogBuffer, decoded only when the view asks for them.
+    sync() turns whatever the buffer gained or evicted since the last call
+    into one insert and one remove, however many lines that is.
+    """
+
+    WARN = QColor("#FFC107")
+    ERROR = QColor("#FF5555")
+
+    def __init__(self, buffer, parent=None):
+        super().__init__(parent)
+        self.buffer = buffer
+        self._first = buffer.first
+        self._total = buffer.total
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._total - self._first
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role not in (Qt.DisplayRole, Qt.ForegroundRole):
+            return None
+        try:
+            line = self.buffer.get(self._first + index.row())
+        except IndexError:
+            return None # Evicted since the last sync
+        if role == Qt.DisplayRole:
+            return line
+        if "/WARN]" in line:
+            return self.WARN
+        if "/ERROR]" in line or "Exception" in line:
+            return self.ERROR
+        return None
+
+    def sync(self):
+        """Returns how many rows were removed from the top."""
+        first, total = self.buffer.first, self.buffer.total
+        removed = 0
+        if first > self._first:
+            removed = min(first, self._total) - self._first
+            if removed > 0:
+                self.beginRemoveRows(QModelIndex(), 0, removed - 1)
+                self._first += removed
+                self.endRemoveRows()
+            if first > self._first:
+                # Everything we showed is gone and then some (e.g. cleared)
+                self._first = self._total = first
+        if total > self._total:
+            rows = self._total - self._first
+            self.beginInsertRows(QModelIndex(), rows, rows + total - self._total - 1)
+            self._total = total
+            self.endInsertRows()
+        return removed
+
+
+class LogView(QTableView):
+    """
+    Console output that only lays out and paints the visible lines, so it
+    stays fast however much history the buffer holds. Sticks to the bottom
+    while the user is at the bottom; scrolling up stops the follow.
+    """
+
+    def __init__(self, buffer=None, parent=None):
+        super().__init__(parent)
+        # Fixed row height: row positions are arithmetic, not a layout pass over every line
+        rows = self.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(self.fontMetrics().height() + 2)
+        rows.hide()
+        self.horizontalHeader().hide()
+        self.horizontalHeader().setStretchLastSection(True)
+        self.setShowGrid(False)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerItem)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setWordWrap(False)
+        self.set_buffer(buffer if buffer is not None else LogBuffer(max_lines=5000))
+
+    @property
+    def buffer(self):
+        return self.model().buffer
+
+    def set_buffer(self, buffer):
+        old = self.model()
+        self.setModel(LogModel(buffer, self))
+        if old is not None:
+            old.deleteLater()
+        self.scrollToBottom()
+
+    def append(self, text):
+        self.buffer.append(text)
+        self.refresh()
+
+    def refresh(self):
+        bar = self.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 1
+        removed = self.model().sync()
+        if at_bottom:
+            self.scrollToBottom()
+        elif removed:
+            # Keep the lines the user is reading in place as the top is trimmed
+            bar.setValue(max(0, bar.value() - removed))
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            rows = sorted(index.row() for index in self.selectedIndexes())
+            model = self.model()
+            text = "\n".join(model.data(model.index(row)) or "" for row in rows)
+            QApplication.clipboard().setText(text)
+            return
+        super().keyPressEvent(event)
@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QPushButton, QStackedWidget, QLabel, QFrame)
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QTimer
 
 from gui.theme import Theme
 
@@ -31,6 +31,20 @@ class MainWindow(QMainWindow):
         # Initial Page
         self.init_home_page()
 
+        # Version lists for the create wizard, fetched while the user looks around
+        from core.jobs import job_queue
+        from core.downloader import downloader
+        job_queue.submit(lambda job: downloader.prefetch_versions(), key="prefetch_versions")
+
+        # Pick up servers added/removed by other manager instances or scripts, and status changes
+        self.registry_timer = QTimer(self)
+        self.registry_timer.timeout.connect(self.check_registry_changes)
+        self.registry_timer.start(2000)
+
+        # CPU / RAM on the server cards and into the metrics store, once per sampling round
+        from core.resource_sampler import resource_sampler
+        resource_sampler.sampled.connect(self.on_resources_sampled)
+
 
     def init_home_page(self):
         from gui.dashboard import Dashboard
@@ -39,6 +53,7 @@ class MainWindow(QMainWindow):
 
         self.dashboard = Dashboard()
         self.dashboard.create_server_clicked.connect(self.open_wizard)
+        self.dashboard.check_updates_clicked.connect(self.open_upgrades)
         self.dashboard.server_selected.connect(self.open_server_page)
         self.dashboard.delete_requested.connect(self.handle_delete_server)
         
@@ -50,20 +65,36 @@ class MainWindow(QMainWindow):
         from core.database import db_manager
         servers = db_manager.get_all_servers()
         
-        # Build status map
-        status_map = {}
-        if hasattr(self, 'running_servers'):
-            from PySide6.QtCore import QProcess
-            for s_id, process in self.running_servers.items():
-                if process.process.state() == QProcess.Running:
-                    status_map[s_id] = "RUNNING"
-                elif process.process.state() == QProcess.Starting:
-                    status_map[s_id] = "RUNNING"
-                else:
-                    status_map[s_id] = "OFFLINE"
-        
+        # ONLINE only once a server is ready for players, LOADING before that
+        status_map = self.server_statuses()
+        self._shown_statuses = status_map
         self.dashboard.load_servers(servers, status_map)
 
+    def server_statuses(self):
+        return {s_id: process.get_current_status() for s_id, process in self.running_servers.items()}
+
+    def on_resources_sampled(self):
+        from core.resource_sampler import resource_sampler
+        from core.metrics_store import metrics_store
+        samples = {s_id: resource_sampler.latest(process.server_dir) for s_id, process in self.running_servers.items()}
+        for s_id, sample in samples.items():
+            if sample:
+                for metric in ("cpu", "rss", "threads"):
+                    metrics_store.record(s_id, metric, sample[metric], sample["ts"])
+                metrics_store.record(s_id, "players", len(self.running_servers[s_id].players), sample["ts"])
+        if self.content_area.currentWidget() is self.dashboard:
+            self.dashboard.update_resources(samples)
+
+    def check_registry_changes(self):
+        from core.database import db_manager
+        if self.content_area.currentWidget() is not self.dashboard:
+            return
+        try:
+            if db_manager.has_external_changes() or self.server_statuses() != self._shown_statuses:
+                self.refresh_dashboard()
+        except Exception as e:
+            print(f"Registry check failed: {e}")
+
     def open_wizard(self):
         from gui.wizard import CreateServerWizard
         wizard = CreateServerWizard(self)
@@ -71,6 +102,11 @@ class MainWindow(QMainWindow):
             # Refresh list
             self.refresh_dashboard()
             
+    def open_upgrades(self):
+        from gui.upgrade_dialog import FleetUpgradeDialog
+        FleetUpgradeDialog(self.running_servers, self).exec()
+        self.refresh_dashboard()
+
     def open_server_page(self, server_id):
         from gui.console import ServerPage
         from core.database import db_manager
@@ -100,11 +136,23 @@ class MainWindow(QMainWindow):
         self.refresh_dashboard()
 
     def closeEvent(self, event):
-        # Stop all servers
-        for s_id, process in self.running_servers.items():
-            if process:
-                process.kill_server()
+        # Running servers save and stop first (all at once); the window closes when they are done
+        from PySide6.QtCore import QProcess
+        running = {s_id: process for s_id, process in self.running_servers.items()
+                   if process and process.process.state() != QProcess.NotRunning}
+        if running and not getattr(self, "_servers_stopped", False):
+            event.ignore()
+            self.shutdown_servers(running)
+            return
         
+        # Stop background downloads
+        from core.jobs import job_queue
+        job_queue.shutdown()
+        from core.resource_sampler import resource_sampler
+        resource_sampler.stop()
+        from core.metrics_store import metrics_store
+        metrics_store.close()
+
         # Stop Playit
         if self.playit_manager:
             self.playit_manager.stop()
@@ -112,6 +160,25 @@ class MainWindow(QMainWindow):
             
         event.accept()
 
+    def shutdown_servers(self, running):
+        from core.shutdown import FleetShutdown
+        from core.config_manager import config_manager
+        from core.database import db_manager
+        from gui.shutdown_dialog import ShutdownDialog
+        if getattr(self, "fleet_shutdown", None):
+            return # Already stopping; closing again doesn't restart the deadlines
+
+        names = {s_id: (db_manager.get_server(s_id) or {}).get("name", s_id) for s_id in running}
+        self.fleet_shutdown = FleetShutdown(running, parent=self, **config_manager.get_shutdown_options())
+        self.fleet_shutdown.finished.connect(self.on_servers_stopped)
+        self.shutdown_dialog = ShutdownDialog(self.fleet_shutdown, names, self)
+        self.shutdown_dialog.open()
+        self.fleet_shutdown.start()
+
+    def on_servers_stopped(self):
+        self._servers_stopped = True
+        self.close()
+
     def handle_delete_server(self, server_id):
         from gui.dialogs import ModernMessageBox
         from core.database import db_manager
@@ -136,6 +203,12 @@ class MainWindow(QMainWindow):
             del self.running_servers[server_id]
             
         # 2. Delete Files
+        try:
+            from core.jar_store import jar_store
+            jar_store.release(server['path'])
+        except Exception as e:
+            print(f"Could not release jar for {server['path']}: {e}")
+
         try:
             if os.path.exists(server['path']):
                 shutil.rmtree(server['path'])
@@ -143,8 +216,10 @@ class MainWindow(QMainWindow):
             ModernMessageBox.show_error(self, "Error", f"Failed to delete files: {e}")
             return
 
-        # 3. Delete from DB
+        # 3. Delete from DB (and its metrics: the id may be given out again)
         db_manager.delete_server(server_id)
+        from core.metrics_store import metrics_store
+        metrics_store.delete(server_id)
         
         # 4. Refresh
         self.refresh_dashboard()
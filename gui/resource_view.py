@@ -0,0 +1,42 @@
+from PySide6.QtWidgets import QWidget
+from PySide6.QtGui import QPainter, QPen, QColor, QPolygonF
+from PySide6.QtCore import QPointF
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit in ("B", "KB") else f"{size:.1f} {unit}"
+        size /= 1024
+
+def describe(sample):
+    """One-line summary of a resource_sampler sample, '' for none."""
+    if not sample:
+        return ""
+    text = f"CPU {sample['cpu']:.0f}% · RAM {format_bytes(sample['rss'])} · {sample['threads']:.0f} threads"
+    if sample["read_rate"] or sample["write_rate"]:
+        text += f" · disk {format_bytes(sample['read_rate'])}/s in, {format_bytes(sample['write_rate'])}/s out"
+    return text
+
+class Sparkline(QWidget):
+    """Tiny line chart of the last values, scaled to their own maximum."""
+
+    def __init__(self, color="#00bcd4", parent=None):
+        super().__init__(parent)
+        self.color = QColor(color)
+        self.values = []
+        self.setFixedSize(120, 24)
+
+    def set_values(self, values):
+        self.values = values
+        self.update()
+
+    def paintEvent(self, event):
+        if len(self.values) < 2:
+            return
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setPen(QPen(self.color, 1.5))
+        top = max(max(self.values), 1e-9)
+        w, h = self.width() - 2, self.height() - 2
+        step = w / (len(self.values) - 1)
+        p.drawPolyline(QPolygonF([QPointF(1 + i * step, 1 + h - v / top * h) for i, v in enumerate(self.values)]))
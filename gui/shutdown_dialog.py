@@ -0,0 +1,51 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView)
+
+class ShutdownDialog(QDialog):
+    """What each server is doing while FleetShutdown stops them; Kill Now stops waiting."""
+
+    def __init__(self, shutdown, names, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Stopping Servers")
+        self.resize(520, 300)
+        self.setStyleSheet("background-color: #252526; color: white;")
+        self.shutdown = shutdown
+        self.rows = {}
+
+        layout = QVBoxLayout(self)
+        self.status_lbl = QLabel(f"Saving and stopping {len(shutdown.processes)} server(s) before closing...")
+        layout.addWidget(self.status_lbl)
+
+        self.table = QTableWidget(0, 2)
+        self.table.setHorizontalHeaderLabels(["Server", "Status"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setStyleSheet("background-color: #1e1e1e; border: 1px solid #555;")
+        for key in shutdown.processes:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            self.table.setItem(row, 0, QTableWidgetItem(str(names.get(key, key))))
+            self.table.setItem(row, 1, QTableWidgetItem("Waiting..."))
+            self.rows[key] = row
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        self.btn_kill = QPushButton("Kill Now")
+        self.btn_kill.setStyleSheet("background-color: #8B0000; color: white; padding: 6px 14px;")
+        self.btn_kill.clicked.connect(self.shutdown.kill_now)
+        buttons.addWidget(self.btn_kill)
+        layout.addLayout(buttons)
+
+        shutdown.progress.connect(self.on_progress)
+        shutdown.finished.connect(self.accept)
+
+    def on_progress(self, key, text):
+        row = self.rows.get(key)
+        if row is not None:
+            self.table.item(row, 1).setText(text)
+
+    def reject(self):
+        # Escape / the close button would leave the servers half stopped; Kill Now is explicit
+        pass
@@ -0,0 +1,139 @@
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QPlainTextEdit)
+from PySide6.QtCore import Qt
+from core.database import db_manager
+
+class FleetUpgradeDialog(QDialog):
+    """Lists current vs. latest build for every server and upgrades the checked ones."""
+
+    COLUMNS = ["Server", "Software", "Version", "Installed", "Available", "Status"]
+
+    def __init__(self, running_servers, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Check for Updates")
+        self.resize(820, 480)
+        self.setStyleSheet("background-color: #252526; color: white;")
+        self.running_servers = running_servers
+        self.plan = []
+        self.job = None
+
+        layout = QVBoxLayout(self)
+
+        self.status_lbl = QLabel("Checking for updates...")
+        layout.addWidget(self.status_lbl)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setStyleSheet("background-color: #1e1e1e; border: 1px solid #555;")
+        layout.addWidget(self.table)
+
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setMaximumHeight(110)
+        self.log_view.setStyleSheet("background-color: #1e1e1e; font-family: Consolas, monospace; font-size: 12px;")
+        layout.addWidget(self.log_view)
+
+        buttons = QHBoxLayout()
+        self.btn_refresh = QPushButton("Check Again")
+        self.btn_refresh.clicked.connect(self.check)
+        self.btn_apply = QPushButton("Upgrade Selected")
+        self.btn_apply.clicked.connect(self.apply)
+        btn_close = QPushButton("Close")
+        btn_close.clicked.connect(self.reject)
+        buttons.addWidget(self.btn_refresh)
+        buttons.addStretch()
+        buttons.addWidget(self.btn_apply)
+        buttons.addWidget(btn_close)
+        layout.addLayout(buttons)
+
+        self.check()
+
+    def is_busy(self, server_id):
+        # GUI thread only: running_servers belongs to the main window
+        from core.jobs import job_queue
+        process = self.running_servers.get(server_id)
+        if process and process.get_current_status() not in ("OFFLINE", "CRASHED"):
+            return True
+        return job_queue.find(("install", server_id)) is not None
+
+    # --- Planning ---
+
+    def check(self):
+        from core.jobs import job_queue
+        from core.fleet_upgrade import fleet_upgrader
+
+        servers = db_manager.get_all_servers()
+        self.set_busy(True, f"Resolving latest builds for {len(servers)} server(s)...")
+        self.job = job_queue.submit(lambda job: fleet_upgrader.plan(servers, job.report), key="fleet_plan")
+        self.job.attach(finished=self.on_planned, failed=self.on_failed, progress=self.on_progress)
+
+    def on_planned(self, plan):
+        self.plan = plan
+        self.table.setRowCount(len(plan))
+        for row, entry in enumerate(plan):
+            available = entry["available"]["build"] if entry["available"] else "-"
+            installed = entry["current"].rsplit("/", 1)[-1] if entry["current"] else "unknown"
+            values = [entry["name"], entry["jar_type"], entry["version"], installed, available, entry["action"]]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if col == 0 and entry["action"] == "upgrade":
+                    item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                    busy = self.is_busy(entry["id"])
+                    item.setCheckState(Qt.Unchecked if busy else Qt.Checked)
+                    if busy:
+                        item.setToolTip("Running: stop it to upgrade")
+                self.table.setItem(row, col, item)
+
+        upgrades = sum(1 for e in plan if e["action"] == "upgrade")
+        self.set_busy(False, f"{upgrades} of {len(plan)} server(s) can be upgraded.")
+        self.btn_apply.setEnabled(upgrades > 0)
+
+    # --- Applying ---
+
+    def apply(self):
+        from core.jobs import job_queue
+        from core.fleet_upgrade import fleet_upgrader
+
+        selected = []
+        for row, entry in enumerate(self.plan):
+            item = self.table.item(row, 0)
+            if entry["action"] == "upgrade" and item.checkState() == Qt.Checked:
+                selected.append(entry)
+        if not selected:
+            return
+
+        # Which servers are running is decided here, not on the job's thread; installs
+        # started later are still caught since the job queue can be asked from any thread
+        running = {e["id"] for e in selected if self.is_busy(e["id"])}
+        is_busy = lambda server_id: server_id in running or job_queue.find(("install", server_id)) is not None
+
+        self.set_busy(True, f"Upgrading {len(selected)} server(s)...")
+        self.job = job_queue.submit(
+            lambda job: fleet_upgrader.apply(selected, is_busy, job.report, job.log), key="fleet_upgrade")
+        # The upgrade keeps going in the background if the dialog is closed
+        self.job.attach(finished=self.on_applied, failed=self.on_failed, progress=self.on_progress,
+                        message=self.log_view.appendPlainText)
+
+    def on_applied(self, results):
+        for row, entry in enumerate(self.plan):
+            if entry["id"] in results:
+                self.table.item(row, 5).setText(results[entry["id"]])
+        upgraded = sum(1 for r in results.values() if r == "upgraded")
+        self.set_busy(False, f"Upgraded {upgraded} of {len(results)} server(s).")
+
+    # --- Shared ---
+
+    def on_failed(self, error):
+        self.set_busy(False, f"Failed: {error}")
+
+    def on_progress(self, percent, rate):
+        self.status_lbl.setText(f"{self.busy_text} {percent}%")
+
+    def set_busy(self, busy, text):
+        self.busy_text = text
+        self.status_lbl.setText(text)
+        self.btn_refresh.setEnabled(not busy)
+        self.btn_apply.setEnabled(not busy)
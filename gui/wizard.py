@@ -34,6 +34,11 @@ class CreateServerWizard(QDialog):
         
         layout.addLayout(form_layout)
         
+        # Warm every loader's version list at once so switching is instant
+        from core.jobs import job_queue
+        from core.downloader import downloader
+        job_queue.submit(lambda job: downloader.prefetch_versions(), key="prefetch_versions")
+
         # Initial populate
         self.update_versions(self.type_combo.currentText())
 
@@ -43,22 +48,42 @@ class CreateServerWizard(QDialog):
         layout.addWidget(buttons)
 
     def update_versions(self, loader_type):
+        from core.jobs import job_queue
         from core.downloader import downloader
-        # This acts on the UI thread, might freeze slightly if checking net.
-        # Ideally run in background, but for now catch errors.
+
+        self.versions_job = None
+        cached = downloader.peek_versions(loader_type)
+        if cached is not None:
+            self.version_combo.clear()
+            self.version_combo.addItems(cached)
+            self.version_combo.setEnabled(True)
+            return
+
+        # Fetched on a worker thread; the combo shows a placeholder meanwhile
         self.version_combo.clear()
         self.version_combo.addItem("Fetching...")
-        
-        # processEvents to show "Fetching..."?
-        # A proper async way is better, but doing sync in stub for simplicity:
-        try:
-            # We will use a separate QTimer or just do it (fast enough usually)
-            versions = downloader.get_versions(loader_type)
-            self.version_combo.clear()
-            self.version_combo.addItems(versions)
-        except:
-             self.version_combo.clear()
-             self.version_combo.addItems(["Error Fetching"])
+        self.version_combo.setEnabled(False)
+
+        job = job_queue.submit(lambda job, t: downloader.get_versions(t), loader_type,
+                               key=("versions", loader_type.lower()))
+        self.versions_job = job
+        job.attach(finished=lambda versions, j=job: self.on_versions_fetched(j, versions),
+                   failed=lambda error, j=job: self.on_versions_failed(j, error))
+
+    def on_versions_fetched(self, job, versions):
+        # Ignore answers for a loader the user already switched away from
+        if job is not self.versions_job:
+            return
+        self.version_combo.clear()
+        self.version_combo.addItems(versions)
+        self.version_combo.setEnabled(True)
+
+    def on_versions_failed(self, job, error):
+        if job is not self.versions_job:
+            return
+        self.version_combo.clear()
+        self.version_combo.addItems(["Error Fetching"])
+        self.version_combo.setEnabled(True)
 
     def get_data(self):
         return {
@@ -73,6 +98,10 @@ class CreateServerWizard(QDialog):
             QMessageBox.warning(self, "Invalid Input", "Server name cannot be empty.")
             return
 
+        if not self.version_combo.isEnabled():
+            QMessageBox.warning(self, "Please Wait", "Still fetching the version list.")
+            return
+
         # Prepare path
         safe_name = "".join([c for c in name if c.isalpha() or c.isdigit() or c==' ']).strip()
         server_path = os.path.join(config_manager.get_data_path(), safe_name)
@@ -66,6 +66,22 @@ def main():
         QMessageBox.critical(None, "Error", f"Failed to initialize database: {e}")
         sys.exit(1)
 
+    # Drop server jars nothing has used for a while
+    try:
+        from core.jar_store import jar_store
+        jar_store.gc()
+    except Exception as e:
+        print(f"Jar store cleanup failed: {e}")
+
+    # Serve cached metadata and jars to other instances on the LAN
+    port = config_manager.get_mirror_serve_port()
+    if port:
+        try:
+            from core.mirror_server import MirrorServer
+            MirrorServer(host=config_manager.get_mirror_serve_host(), port=port).start()
+        except Exception as e:
+            print(f"Could not start the mirror server: {e}")
+
     from gui.main_window import MainWindow
     window = MainWindow()
     window.show()